@@ -10,7 +10,11 @@ Dependencies:
 * argparse
 """
     
+import json
 import os
+import sys
+import time
+from contextlib import nullcontext
 from pathlib import Path
 
 import argparse
@@ -19,18 +23,88 @@ from lunapyutils import (
     print_script_message,
     select_list_options
 )
-from pyfilehandlers.file_handler import FileHandler
 
-from waypoint_handlers.waypoint_mod_handler import WaypointModHandler
-from waypoint_handlers.waypoint_handler_lunar import LunarWaypointHandler
-from waypoint_handlers.waypoint_handler_xaeros import XaerosWaypointHandler
-from waypoint_handlers.standard_world_waypoints import StandardWorldWaypoints
+from waypoint_handlers.handler_registry import (
+    CAPABILITY_SINGLE_FILE,
+    get_handler_registry
+)
+from waypoint_handlers.world_search_index import (
+    AMBIGUITY_POLICIES,
+    AmbiguousWorldError,
+    WorldSearchIndex
+)
+from waypoint_handlers.world_ref import WorldRef
+from waypoint_handlers.near_duplicate_policies import (
+    DEFAULT_NEAR_DUPLICATE_RADIUS,
+    NEAR_DUPLICATE_POLICIES
+)
+from waypoint_handlers.world_fingerprint import WorldFingerprint, stat_signature
+from waypoint_handlers.reporting import (
+    DEFAULT_REPORTER_KIND,
+    REPORTER_KINDS,
+    BufferedReporter,
+    ReportEvent,
+    create_reporter,
+    get_reporter,
+    set_reporter
+)
+from waypoint_handlers.tracing import (
+    add_trace_events,
+    drain_trace_events,
+    is_tracing,
+    set_tracing,
+    traced,
+    write_trace
+)
+from waypoint_handlers.waypoint_serializers import (
+    DEFAULT_SERIALIZATION_FORMAT,
+    SERIALIZATION_FORMATS,
+    get_standard_format,
+    set_standard_format
+)
+from waypoint_handlers.backup_store import (
+    BACKUP_MODES,
+    DEFAULT_KEEP_RUNS,
+    get_backup_mode,
+    get_backup_store,
+    get_run_id,
+    new_run_id,
+    set_backup_mode,
+    set_run_id
+)
+
 
+from typing import TYPE_CHECKING
 
-MOD_CLASSES : dict[str, WaypointModHandler] = {
-    'lunar client'      : None,
-    'xaero\'s minimap'  : None
-}
+# the handler modules, and the dependencies they bring in, are only
+# imported once a handler is needed, so that the script starts quickly
+# when it does not convert anything, e.g. for --help or --list-backups
+if TYPE_CHECKING:
+    import asyncio
+    import cProfile
+    from waypoint_handlers.near_duplicates import NearDuplicateFilter
+    from waypoint_handlers.waypoint_mod_handler import WaypointModHandler
+
+
+# the handler of each mod, created on first use by `get_mod_handler`
+_mod_handlers : dict[str, 'WaypointModHandler'] = {}
+
+# how the handlers are created, set by `setup_classes`
+_convert_here : bool = False
+_io_workers : int | None = None
+
+# the exit codes of the script, so that scheduled runs can tell why a
+# conversion did not happen
+EXIT_SUCCESS : int = 0
+EXIT_CONVERSION_FAILED : int = 1
+EXIT_USAGE_ERROR : int = 2
+EXIT_WORLD_NOT_FOUND : int = 3
+EXIT_AMBIGUOUS_WORLD : int = 4
+
+# set in each batch worker process, guards writes to mods that keep all
+# worlds in a single file so that parallel conversions do not clobber
+# each other
+_target_write_lock = None
 
 
 
@@ -71,10 +145,11 @@ def get_mod_names(mod_options : tuple[str]) -> tuple[str]:
 def get_world_file_name(
         world_name : str, 
         mod_name : str,
-    ) -> str | None:
+        ambiguity : str = 'prompt'
+    ) -> WorldRef | None:
     """
-    Gets the file system name of the world as it appears for the given
-    mod.
+    Resolves the world as it appears on the file system for the given
+    mod, so that it is only searched for once.
     
     Parameters
     ----------
@@ -82,15 +157,26 @@ def get_world_file_name(
         the name of the world to search for
     mod_name : str
         the name of the mod to check
+    ambiguity : str, default='prompt'
+        how a name matching several worlds is settled, one of
+        `AMBIGUITY_POLICIES`
 
     Returns
     -------
-    str
-        the name of the world on the file system for the mod,
+    WorldRef
+        the world on the file system for the mod,
         None if the world is not on the file system
+
+    Raises
+    ------
+    AmbiguousWorldError
+        if several worlds match and `ambiguity` is 'error'
     """
 
-    return MOD_CLASSES[mod_name].get_world_name(search_name=world_name)
+    return get_mod_handler(mod_name).get_world(
+        search_name=world_name,
+        ambiguity=ambiguity
+    )
 
 
 
@@ -98,25 +184,60 @@ def get_world_file_name(
 #####                         Conversion                           #####
 ########################################################################
 
+def get_conversion_options(
+        merge : bool,
+        near_duplicates : 'NearDuplicateFilter | None',
+        standard_format : str
+    ) -> dict:
+    """
+    Gets the options of a conversion that change what it writes. They
+    are kept in the conversion's fingerprint, so that converting a pair
+    of worlds again with other options is never skipped.
+
+    Parameters
+    ----------
+    merge : bool
+        whether the waypoints of both worlds are merged both ways
+    near_duplicates : NearDuplicateFilter | None
+        the policy applied to near duplicate waypoints, if any
+    standard_format : str
+        the format the standardized waypoints are written in
+
+    Returns
+    -------
+    dict
+        the options, by name
+    """
+
+    return {
+        'merge' : merge,
+        'near_duplicates' : near_duplicates.policy if near_duplicates else None,
+        'near_duplicate_radius' : near_duplicates.radius if near_duplicates else None,
+        'standard_format' : standard_format
+    }
+
+
+@traced
 def convert_waypoints(
-        from_mod : str, 
-        to_mod : str, 
-        from_mod_world_name : str,
-        to_mod_world_name : str
+        from_mod_world : WorldRef,
+        to_mod_world : WorldRef,
+        near_duplicates : 'NearDuplicateFilter | None' = None
     ) -> bool:
     """
     Converts the waypoints from one mod to another.
+    Pairs of worlds whose waypoints did not change since they were last
+    converted are skipped, without reading or writing any waypoints when
+    none of their files were written to.
     
     Parameters
     ----------
-    from_mod : str
-        the mod to convert from
-    to_mod : str
-        the mod to convert to
-    from_mod_world_name : str
-        the name of the world for the mod to convert from
-    to_mod_world_name : str
-        the name of the world for the mod to convert to
+    from_mod_world : WorldRef
+        the world of the mod to convert from
+    to_mod_world : WorldRef
+        the world of the mod to convert to
+    near_duplicates : NearDuplicateFilter, optional
+        the policy applied to converted waypoints that are near another
+        waypoint of the world they are added to, none by default
 
     Returns
     -------
@@ -125,86 +246,284 @@ def convert_waypoints(
         False,  otherwise
     """
 
-    from_mod_handler = MOD_CLASSES[from_mod]
-    to_mod_handler = MOD_CLASSES[to_mod]
+    from waypoint_handlers.standard_world_waypoints import StandardWorldWaypoints
 
-    create_backups(
-        from_mod_handler=from_mod_handler,
-        from_mod_world_name=from_mod_world_name,
-        to_mod_handler=to_mod_handler,
-        to_mod_world_name=to_mod_world_name
+    from_mod_handler = get_mod_handler(from_mod_world.mod_name)
+    to_mod_handler = get_mod_handler(to_mod_world.mod_name)
+
+    # every world of a single file mod shares that file, so only one
+    # batch worker may back it up or write to it at a time
+    target_lock = (
+        _target_write_lock
+        if _target_write_lock is not None
+        and get_handler_registry().has_capability(
+            to_mod_world.mod_name, CAPABILITY_SINGLE_FILE
+        )
+        else nullcontext()
     )
-    
-    world_name, world_type = get_world_info(from_mod, from_mod_world_name)
 
-    # TODO v2
-    # get waypoints from both mods, combine into one dict, save this dict
-    # to the standard yaml, then save to to_mod
-    # rather than only converting the from_mod into the standard yaml
-    
+    standard_file = StandardWorldWaypoints(
+        world_name=from_mod_world.name,
+        world_type=from_mod_world.world_type,
+        mod_name=from_mod_world.mod_name
+    )
 
-    # TODO v2 end
+    fingerprint = standard_file.read_fingerprint(to_mod_world)
+    options = get_conversion_options(
+        merge=False,
+        near_duplicates=near_duplicates,
+        standard_format=standard_file.serializer.format_name
+    )
 
-    standard_file = StandardWorldWaypoints(
-        world_name=world_name,
-        world_type=world_type,
-        mod_name=from_mod
+    source_files = stat_signature(
+        from_mod_handler.get_world_files(world=from_mod_world)
+    )
+    target_files = stat_signature(
+        to_mod_handler.get_world_files(world=to_mod_world)
     )
+
+    # neither world was written to since they were last converted
+    if fingerprint is not None \
+    and fingerprint.matches_files(
+        source_files, target_files, to_mod_world.location, options
+    ):
+        print_script_message(
+            f'No changes in "{from_mod_world.name}" since the last conversion, skipping...'
+        )
+        return True
     
-    standardized_waypoints = from_mod_handler.convert_from_mod_to_standard(
-        world_name=from_mod_world_name
+    standardized_waypoints = from_mod_handler.convert_from_mod_to_table(
+        world=from_mod_world
     )
+    source_hash = standardized_waypoints.content_hash()
+
+    with target_lock:
+        target_hash = to_mod_handler.hash_world_data(world=to_mod_world)
+
+    # the files were written to, e.g. for other worlds stored in the same
+    # file, but the waypoints of both worlds are the same as before
+    if fingerprint is not None \
+    and fingerprint.matches_content(
+        source_hash, target_hash, to_mod_world.location, options
+    ):
+        standard_file.write_fingerprint(
+            to_mod_world,
+            WorldFingerprint(
+                source_files, source_hash, target_files, target_hash,
+                to_mod_world.location, options
+            )
+        )
+        print_script_message(
+            f'No changes in "{from_mod_world.name}" since the last conversion, skipping...'
+        )
+        return True
+
+    with target_lock:
+        create_backups(
+            from_mod_handler=from_mod_handler,
+            from_mod_world=from_mod_world,
+            to_mod_handler=to_mod_handler,
+            to_mod_world=to_mod_world
+        )
 
     standard_file.write_waypoints(given_waypoints=standardized_waypoints)
 
-    to_mod_handler.create_backup(world_name=to_mod_world_name)
+    with target_lock:
+        to_mod_handler.create_backup(world=to_mod_world)
 
-    conversion_successful = to_mod_handler.convert_from_standard_to_mod(
-        standard_data=standardized_waypoints,
-        world_name=to_mod_world_name
-    )
+        waypoints_to_add = standardized_waypoints
+
+        if near_duplicates is not None:
+            waypoints_to_add = near_duplicates.apply(
+                waypoints=standardized_waypoints,
+                existing_waypoints=to_mod_handler.convert_from_mod_to_table(
+                    world=to_mod_world
+                )
+            )
+
+        conversion_successful = to_mod_handler.convert_from_standard_to_mod(
+            standard_data=waypoints_to_add,
+            world=to_mod_world
+        ) and to_mod_handler.commit()
+
+        if conversion_successful:
+            target_files = stat_signature(
+                to_mod_handler.get_world_files(world=to_mod_world)
+            )
+            target_hash = to_mod_handler.hash_world_data(world=to_mod_world)
+
+    if conversion_successful:
+        standard_file.write_fingerprint(
+            to_mod_world,
+            WorldFingerprint(
+                source_files, source_hash, target_files, target_hash,
+                to_mod_world.location, options
+            )
+        )
 
     return conversion_successful
 
 
-def get_world_info(mod_name : str, mod_world_name : str) -> tuple[str, bool]:
+@traced
+def merge_world_waypoints(
+        from_mod_world : WorldRef,
+        to_mod_world : WorldRef,
+        near_duplicates : 'NearDuplicateFilter | None' = None
+    ) -> bool:
     """
-    Gets the world name and type.
+    Merges the waypoints of two worlds both ways, so that each world
+    ends up with every waypoint that either of them has. Waypoints are
+    the same when they share a dimension and name, ignoring case and
+    whitespace; for those, the waypoint of `from_mod_world` is kept.
+    The merged waypoints are saved as the standardized waypoints of
+    `from_mod_world`. Like `convert_waypoints`, pairs of worlds that did
+    not change since they were last merged are skipped.
 
     Parameters
     ----------
-    mod_name : str
-        the name of the mod to use to get the data
-    mod_world_name : str
-        the name of the world to get the data of
+    from_mod_world : WorldRef
+        the world of the first mod, whose waypoints take precedence
+    to_mod_world : WorldRef
+        the world of the second mod
+    near_duplicates : NearDuplicateFilter, optional
+        the policy applied to the waypoints each world is given that are
+        near one of its own waypoints, none by default
 
     Returns
     -------
-    tuple[str, str]
-        the name of the world and the world type
+    bool
+        True,   if the merge was successful,
+        False,  otherwise
     """
 
-    world_name : str = None
-    world_type : str = None
+    from waypoint_handlers.standard_world_waypoints import StandardWorldWaypoints
+    from waypoint_handlers.waypoint_merge import WaypointMerger
+
+    from_mod_handler = get_mod_handler(from_mod_world.mod_name)
+    to_mod_handler = get_mod_handler(to_mod_world.mod_name)
+
+    # both worlds are written to, so the lock is needed when either of
+    # them is in a single file mod
+    registry = get_handler_registry()
+    world_lock = (
+        _target_write_lock
+        if _target_write_lock is not None
+        and any(
+            registry.has_capability(world.mod_name, CAPABILITY_SINGLE_FILE)
+            for world in (from_mod_world, to_mod_world)
+        )
+        else nullcontext()
+    )
 
-    match mod_name:
-        
-        case 'lunar client':
-            world_name = LunarWaypointHandler.parse_world_name(mod_world_name)
-            world_type = LunarWaypointHandler.get_world_type(mod_world_name)
-            
-        case 'xaero\'s minimap':
-            world_name = XaerosWaypointHandler.parse_world_name(mod_world_name)
-            world_type = XaerosWaypointHandler.get_world_type(mod_world_name)
+    standard_file = StandardWorldWaypoints(
+        world_name=from_mod_world.name,
+        world_type=from_mod_world.world_type,
+        mod_name=from_mod_world.mod_name
+    )
+
+    # a conversion of the same worlds is recorded with other options, so
+    # it is not mistaken for a merge, which also writes to this world
+    fingerprint = standard_file.read_fingerprint(to_mod_world)
+    options = get_conversion_options(
+        merge=True,
+        near_duplicates=near_duplicates,
+        standard_format=standard_file.serializer.format_name
+    )
+
+    def read_world_state() -> tuple:
+        return (
+            stat_signature(from_mod_handler.get_world_files(world=from_mod_world)),
+            stat_signature(to_mod_handler.get_world_files(world=to_mod_world))
+        )
+
+    with world_lock:
+        source_files, target_files = read_world_state()
+
+    # neither world was written to since they were last merged
+    if fingerprint is not None \
+    and fingerprint.matches_files(
+        source_files, target_files, to_mod_world.location, options
+    ):
+        print_script_message(
+            f'No changes in "{from_mod_world.name}" since the last merge, skipping...'
+        )
+        return True
+
+    with world_lock:
+        source_waypoints = from_mod_handler.convert_from_mod_to_table(
+            world=from_mod_world
+        )
+        target_waypoints = to_mod_handler.convert_from_mod_to_table(
+            world=to_mod_world
+        )
+
+    # a single pass over each world, looking every waypoint up in the
+    # index of the waypoints merged so far
+    merger = WaypointMerger()
+    merger.add(source_waypoints)
+    merger.add(target_waypoints)
+
+    source_additions = merger.missing_from(source_waypoints)
+    target_additions = merger.missing_from(target_waypoints)
+
+    if near_duplicates is not None:
+        source_additions = near_duplicates.apply(source_additions, source_waypoints)
+        target_additions = near_duplicates.apply(target_additions, target_waypoints)
+
+    standard_file.write_waypoints(given_waypoints=merger.table)
+
+    if not source_additions and not target_additions:
+        print_script_message(
+            f'"{from_mod_world.name}" already has the same waypoints in both mods'
+        )
+        merge_successful = True
+
+    else:
+        with world_lock:
+            create_backups(
+                from_mod_handler=from_mod_handler,
+                from_mod_world=from_mod_world,
+                to_mod_handler=to_mod_handler,
+                to_mod_world=to_mod_world
+            )
+
+            merge_successful = all(
+                not additions
+                or handler.convert_from_standard_to_mod(
+                    standard_data=additions,
+                    world=world
+                ) and handler.commit()
+                for handler, world, additions in (
+                    (from_mod_handler, from_mod_world, source_additions),
+                    (to_mod_handler, to_mod_world, target_additions)
+                )
+            )
+
+            if merge_successful:
+                source_files, target_files = read_world_state()
+
+    if merge_successful:
+        standard_file.write_fingerprint(
+            to_mod_world,
+            WorldFingerprint(
+                source_files,
+                merger.table.content_hash(),
+                target_files,
+                merger.table.content_hash(),
+                to_mod_world.location,
+                options
+            )
+        )
 
-    return world_name, world_type
+    return merge_successful
 
 
+@traced
 def create_backups(
-    from_mod_handler : WaypointModHandler,
-    from_mod_world_name : str,
-    to_mod_handler : WaypointModHandler,
-    to_mod_world_name : str
+    from_mod_handler : 'WaypointModHandler',
+    from_mod_world : WorldRef,
+    to_mod_handler : 'WaypointModHandler',
+    to_mod_world : WorldRef
 ) -> bool:
     """
     Creates backups of the waypoint files.
@@ -216,66 +535,839 @@ def create_backups(
         False,  otherwise
     """
 
-    return  (from_mod_handler.create_backup(world_name=from_mod_world_name) 
-    and     to_mod_handler.create_backup(world_name=to_mod_world_name))
+    return  (from_mod_handler.create_backup(world=from_mod_world) 
+    and     to_mod_handler.create_backup(world=to_mod_world))
+
+
+@traced
+def prune_backups(keep_runs : int) -> None:
+    """
+    Removes all but the newest runs of backups, along with the stored
+    file contents that only those runs used.
+
+    Parameters
+    ----------
+    keep_runs : int
+        the number of newest runs of backups to keep
+    """
+
+    removed_files = get_backup_store().prune(keep_runs=keep_runs)
+
+    if removed_files:
+        print_script_message(f'Removed {removed_files} old backup files.')
+
+
+def print_backups() -> None:
+    """
+    Prints the backups of every run, listing the files backed up for
+    each world without unpacking any of them.
+    """
+
+    backup_store = get_backup_store()
+    runs = backup_store.list_runs()
+
+    if not runs:
+        print_script_message('No backups found.')
+        return
+
+    for run_id in runs:
+
+        print_script_message(f'Run {run_id}:')
+
+        for manifest in backup_store.list_manifests(run_id):
+
+            print_script_message(
+                f'  {manifest['mod_name']} - {manifest['world_name']}'
+            )
+
+            for relative_path, file_data in manifest['files'].items():
+                print_script_message(
+                    f'    {relative_path} ({file_data['size']:,} bytes)'
+                )
 
 
 
 ########################################################################
-#####                            Driver                            #####
+#####                       Batch Conversion                       #####
 ########################################################################
 
-def run_driver(convert_here : bool) -> None:
+@traced
+def pair_worlds(
+        from_mod : str,
+        to_mod : str
+    ) -> tuple[list[tuple[WorldRef, WorldRef]], list[WorldRef]]:
+    """
+    Pairs every world that the mod to convert from has waypoints for
+    with the same world in the mod to convert to. Worlds are the same
+    world if their parsed names, ignoring case, and world types match.
+
+    Parameters
+    ----------
+    from_mod : str
+        the mod to convert from
+    to_mod : str
+        the mod to convert to
+
+    Returns
+    -------
+    tuple[list[tuple[WorldRef, WorldRef]], list[WorldRef]]
+        the paired worlds, as (from_mod world, to_mod world), and the
+        from_mod worlds that have no matching world in to_mod
+    """
+
+    from_mod_handler = get_mod_handler(from_mod)
+    to_mod_handler = get_mod_handler(to_mod)
+
+    to_mod_worlds : dict[tuple[str, str], WorldRef] = {}
+
+    for to_mod_world_name in to_mod_handler.get_worlds_with_waypoints():
+        to_mod_world = to_mod_handler.make_world_ref(to_mod_world_name)
+        to_mod_worlds.setdefault(
+            (to_mod_world.name, to_mod_world.world_type),
+            to_mod_world
+        )
+
+    # resolves names that only differ in case, without prompting
+    to_mod_name_index = WorldSearchIndex(
+        world_name for world_name, _ in to_mod_worlds
+    )
+
+    pairs : list[tuple[WorldRef, WorldRef]] = []
+    unpaired : list[WorldRef] = []
+
+    for from_mod_world_name in from_mod_handler.get_worlds_with_waypoints():
+
+        from_mod_world = from_mod_handler.make_world_ref(from_mod_world_name)
+        world_type = from_mod_world.world_type
+        to_mod_world = to_mod_worlds.get((from_mod_world.name, world_type))
+
+        if to_mod_world is None:
+            for matching_name in to_mod_name_index.exact_matches(from_mod_world.name):
+                to_mod_world = to_mod_worlds.get((matching_name, world_type))
+                if to_mod_world is not None:
+                    break
+
+        if to_mod_world is None:
+            unpaired.append(from_mod_world)
+        else:
+            pairs.append((from_mod_world, to_mod_world))
+
+    return pairs, unpaired
+
+
+def _init_batch_worker(
+        convert_here : bool,
+        write_lock,
+        backup_mode : str,
+        io_workers : int | None,
+        standard_format : str = DEFAULT_SERIALIZATION_FORMAT,
+        tracing : bool = False,
+        run_id : str | None = None
+    ) -> None:
+    """
+    Sets up the mod handlers of a batch worker process.
+
+    Parameters
+    ----------
+    convert_here : bool
+        True,   if the user wishes to convert files within this dir
+        False,  otherwise
+    write_lock : multiprocessing.Lock
+        lock shared by all workers, held while writing to a mod that
+        stores every world in a single file
+    backup_mode : str
+        how the backups are stored, one of `BACKUP_MODES`
+    io_workers : int | None
+        the number of dimension files each worker handles at the same
+        time, None for the mod handler's default
+    standard_format : str, default='yaml'
+        the format the standardized waypoints are written in, one of
+        `SERIALIZATION_FORMATS`
+    tracing : bool, default=False
+        True,   to record the spans of the worker's conversions
+        False,  otherwise
+    run_id : str, optional
+        the run of backups of the main process, which the worker's
+        backups are stored under, a new run if not given
+    """
+
+    global _target_write_lock
+    _target_write_lock = write_lock
+
+    set_backup_mode(backup_mode)
+    set_run_id(run_id or new_run_id())
+    set_standard_format(standard_format)
+    set_tracing(tracing)
+
+    # the events are reported by the main process, so that the output
+    # of several workers is not interleaved
+    set_reporter(BufferedReporter())
+
+    setup_classes(convert_here, io_workers)
+
+
+def _convert_world_pair(
+        from_mod_world : WorldRef,
+        to_mod_world : WorldRef,
+        merge : bool = False,
+        near_duplicates : 'NearDuplicateFilter | None' = None
+    ) -> tuple[bool, str | None, list[dict], list[ReportEvent]]:
+    """
+    Converts, or merges, a single pair of worlds inside a batch worker
+    process. Errors are caught and returned so that one failing world
+    does not stop the rest of the batch.
+
+    Returns
+    -------
+    tuple[bool, str | None, list[dict], list[ReportEvent]]
+        whether the conversion was successful, the error message if an
+        error was raised, the trace events the conversion recorded,
+        which are written by the main process, and the events it
+        reported, which are reported again by the main process
     """
-    Runs the convertion functionality of the script.
+
+    convert = merge_world_waypoints if merge else convert_waypoints
+    error = None
+
+    try:
+        conversion_successful = convert(
+            from_mod_world=from_mod_world,
+            to_mod_world=to_mod_world,
+            near_duplicates=near_duplicates
+        )
+
+    except Exception as e:
+        conversion_successful, error = False, f'{type(e).__name__}: {e}'
+
+    return conversion_successful, error, drain_trace_events(), get_reporter().drain()
+
+
+def convert_all_worlds(
+        from_mod : str,
+        to_mod : str,
+        convert_here : bool,
+        max_workers : int | None = None,
+        io_workers : int | None = None,
+        merge : bool = False,
+        near_duplicates : 'NearDuplicateFilter | None' = None
+    ) -> dict[str, list]:
+    """
+    Converts the waypoints of every world that the mod to convert from
+    has waypoints for, each on a separate worker process.
 
     Parameters
     ----------
+    from_mod : str
+        the mod to convert from
+    to_mod : str
+        the mod to convert to
     convert_here : bool
         True,   if the user wishes to convert files within this dir
         False,  otherwise
+    max_workers : int, optional
+        the number of worker processes, defaults to the number of CPUs
+    io_workers : int, optional
+        the number of dimension files each worker handles at the same
+        time, defaults to the mod handler's default
+    merge : bool, default=False
+        True,   to merge the waypoints of each pair of worlds both ways,
+                see `merge_world_waypoints`
+        False,  to convert them from one mod to the other
+    near_duplicates : NearDuplicateFilter, optional
+        the policy applied to converted waypoints that are near another
+        waypoint of the world they are added to, none by default
+
+    Returns
+    -------
+    dict[str, list]
+        the file system names of the worlds, split into 'successful',
+        'unsuccessful', 'failed' (with the error message) and 'unpaired'
+    """
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    import multiprocessing
+
+    pairs, unpaired = pair_worlds(from_mod=from_mod, to_mod=to_mod)
+
+    results = {
+        'successful'   : [],
+        'unsuccessful' : [],
+        'failed'       : [],
+        'unpaired'     : [world.file_name for world in unpaired]
+    }
+
+    if not pairs:
+        return results
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_batch_worker,
+        initargs=(
+            convert_here,
+            multiprocessing.Lock(),
+            get_backup_mode(),
+            io_workers,
+            get_standard_format(),
+            is_tracing(),
+            get_run_id()
+        )
+    ) as executor:
+
+        futures = {
+            executor.submit(
+                _convert_world_pair,
+                from_mod_world,
+                to_mod_world,
+                merge,
+                near_duplicates
+            ) : from_mod_world.file_name
+            for from_mod_world, to_mod_world in pairs
+        }
+
+        for future in as_completed(futures):
+
+            world_name = futures[future]
+
+            try:
+                conversion_successful, error, trace_events, events = future.result()
+                add_trace_events(trace_events)
+                get_reporter().emit_all(events)
+                get_reporter().flush()
+
+            # a crashed worker process still should not end the batch
+            except Exception as e:
+                conversion_successful, error = False, f'{type(e).__name__}: {e}'
+
+            if error:
+                results['failed'].append((world_name, error))
+            elif conversion_successful:
+                results['successful'].append(world_name)
+            else:
+                results['unsuccessful'].append(world_name)
+
+    return results
+
+
+def print_batch_summary(results : dict[str, list]) -> None:
+    """
+    Prints the summary report of a batch conversion.
+
+    Parameters
+    ----------
+    results : dict[str, list]
+        the results returned by `convert_all_worlds`
+    """
+
+    print_script_message('Batch conversion summary:')
+    print_script_message(f'  {len(results['successful'])} successful')
+    print_script_message(f'  {len(results['unsuccessful'])} unsuccessful')
+    print_script_message(f'  {len(results['failed'])} failed')
+    print_script_message(f'  {len(results['unpaired'])} without a matching world')
+
+    for world_name in sorted(results['unsuccessful']):
+        print_script_message(f'Unsuccessful: {world_name}')
+
+    for world_name, error in sorted(results['failed']):
+        print_script_message(f'Failed: {world_name} ({error})')
+
+    for world_name in sorted(results['unpaired']):
+        print_script_message(f'No matching world: {world_name}')
+
+
+
+########################################################################
+#####                       Async Conversion                       #####
+########################################################################
+
+async def convert_waypoints_async(
+        from_mod_world : WorldRef,
+        to_mod_world : WorldRef,
+        timeout : float | None = None,
+        target_lock : 'asyncio.Lock | None' = None,
+        near_duplicates : 'NearDuplicateFilter | None' = None
+    ) -> bool:
+    """
+    Async variant of `convert_waypoints`, for use from an event loop.
+    The source is read while the target is hashed, and both backups are
+    created while the standardized waypoints are written.
+
+    Parameters
+    ----------
+    from_mod_world : WorldRef
+        the world of the mod to convert from
+    to_mod_world : WorldRef
+        the world of the mod to convert to
+    timeout : float, optional
+        seconds after which the conversion is cancelled, raising
+        `TimeoutError`. Files being written when it is cancelled are
+        still replaced whole, never partially.
+    target_lock : asyncio.Lock, optional
+        lock held while reading or writing the target, needed when
+        converting several worlds into a mod that keeps every world in
+        a single file
+    near_duplicates : NearDuplicateFilter, optional
+        the policy applied to converted waypoints that are near another
+        waypoint of the world they are added to, none by default
+
+    Returns
+    -------
+    bool
+        True,   if the conversion was successful,
+        False,  otherwise
+    """
+
+    # imported here, since only the async conversions need it
+    import asyncio
+
+    async with asyncio.timeout(timeout):
+        return await _convert_waypoints_async(
+            from_mod_world=from_mod_world,
+            to_mod_world=to_mod_world,
+            target_lock=target_lock or nullcontext(),
+            near_duplicates=near_duplicates
+        )
+
+
+async def _convert_waypoints_async(
+        from_mod_world : WorldRef,
+        to_mod_world : WorldRef,
+        target_lock : 'asyncio.Lock | nullcontext',
+        near_duplicates : 'NearDuplicateFilter | None'
+    ) -> bool:
     """
+    Converts the waypoints from one mod to another, see
+    `convert_waypoints_async`.
+    """
+
+    import asyncio
+
+    from waypoint_handlers.standard_world_waypoints import StandardWorldWaypoints
+
+    from_mod_handler = get_mod_handler(from_mod_world.mod_name)
+    to_mod_handler = get_mod_handler(to_mod_world.mod_name)
 
-    from_mod, to_mod = get_mod_names(mod_options=(
-        'lunar client',
-        'xaero\'s minimap'
+    standard_file = StandardWorldWaypoints(
+        world_name=from_mod_world.name,
+        world_type=from_mod_world.world_type,
+        mod_name=from_mod_world.mod_name
+    )
+
+    def read_fingerprint_state() -> tuple:
+        return (
+            standard_file.read_fingerprint(to_mod_world),
+            stat_signature(from_mod_handler.get_world_files(world=from_mod_world)),
+            stat_signature(to_mod_handler.get_world_files(world=to_mod_world))
+        )
+
+    fingerprint, source_files, target_files = \
+        await asyncio.to_thread(read_fingerprint_state)
+    options = get_conversion_options(
+        merge=False,
+        near_duplicates=near_duplicates,
+        standard_format=standard_file.serializer.format_name
+    )
+
+    # neither world was written to since they were last converted
+    if fingerprint is not None \
+    and fingerprint.matches_files(
+        source_files, target_files, to_mod_world.location, options
+    ):
+        print_script_message(
+            f'No changes in "{from_mod_world.name}" since the last conversion, skipping...'
+        )
+        return True
+
+    async def hash_target() -> str:
+        async with target_lock:
+            return await to_mod_handler.hash_world_data_async(world=to_mod_world)
+
+    standardized_waypoints, target_hash = await asyncio.gather(
+        from_mod_handler.convert_from_mod_to_table_async(world=from_mod_world),
+        hash_target()
+    )
+    source_hash = standardized_waypoints.content_hash()
+
+    # the files were written to, but the waypoints are the same as before
+    if fingerprint is not None \
+    and fingerprint.matches_content(
+        source_hash, target_hash, to_mod_world.location, options
+    ):
+        await asyncio.to_thread(
+            standard_file.write_fingerprint,
+            to_mod_world,
+            WorldFingerprint(
+                source_files, source_hash, target_files, target_hash,
+                to_mod_world.location, options
+            )
+        )
+        print_script_message(
+            f'No changes in "{from_mod_world.name}" since the last conversion, skipping...'
+        )
+        return True
+
+    async with target_lock:
+
+        await asyncio.gather(
+            from_mod_handler.create_backup_async(world=from_mod_world),
+            to_mod_handler.create_backup_async(world=to_mod_world),
+            asyncio.to_thread(
+                standard_file.write_waypoints,
+                given_waypoints=standardized_waypoints
+            )
+        )
+
+        waypoints_to_add = standardized_waypoints
+
+        if near_duplicates is not None:
+            waypoints_to_add = await asyncio.to_thread(
+                near_duplicates.apply,
+                waypoints=standardized_waypoints,
+                existing_waypoints=await to_mod_handler.convert_from_mod_to_table_async(
+                    world=to_mod_world
+                )
+            )
+
+        conversion_successful = \
+            await to_mod_handler.convert_from_standard_to_mod_async(
+                standard_data=waypoints_to_add,
+                world=to_mod_world
+            ) and await to_mod_handler.commit_async()
+
+        if conversion_successful:
+            target_files, target_hash = await asyncio.gather(
+                asyncio.to_thread(
+                    lambda: stat_signature(
+                        to_mod_handler.get_world_files(world=to_mod_world)
+                    )
+                ),
+                to_mod_handler.hash_world_data_async(world=to_mod_world)
+            )
+
+    if conversion_successful:
+        await asyncio.to_thread(
+            standard_file.write_fingerprint,
+            to_mod_world,
+            WorldFingerprint(
+                source_files, source_hash, target_files, target_hash,
+                to_mod_world.location, options
+            )
+        )
+
+    return conversion_successful
+
+
+async def convert_all_worlds_async(
+        from_mod : str,
+        to_mod : str,
+        max_concurrency : int | None = None,
+        timeout : float | None = None,
+        near_duplicates : 'NearDuplicateFilter | None' = None
+    ) -> dict[str, list]:
+    """
+    Async variant of `convert_all_worlds`, converting the worlds
+    concurrently on the running event loop instead of on worker
+    processes. The mod handlers must already be set up, and should be
+    closed with `close_mod_handlers` once they are no longer needed.
+
+    Parameters
+    ----------
+    from_mod : str
+        the mod to convert from
+    to_mod : str
+        the mod to convert to
+    max_concurrency : int, optional
+        the number of worlds converted at once, unlimited by default
+    timeout : float, optional
+        seconds after which a single world's conversion is cancelled and
+        counted as failed
+    near_duplicates : NearDuplicateFilter, optional
+        the policy applied to converted waypoints that are near another
+        waypoint of the world they are added to, none by default
+
+    Returns
+    -------
+    dict[str, list]
+        the file system names of the worlds, split into 'successful',
+        'unsuccessful', 'failed' (with the error message) and 'unpaired'
+    """
+
+    import asyncio
+
+    pairs, unpaired = await asyncio.to_thread(
+        pair_worlds, from_mod=from_mod, to_mod=to_mod
+    )
+
+    results = {
+        'successful'   : [],
+        'unsuccessful' : [],
+        'failed'       : [],
+        'unpaired'     : [world.file_name for world in unpaired]
+    }
+
+    # every world of a single file mod shares that file, so only one
+    # conversion may read or write it at a time
+    target_lock = asyncio.Lock() \
+        if get_handler_registry().has_capability(to_mod, CAPABILITY_SINGLE_FILE) \
+        else None
+
+    concurrency_limit = asyncio.Semaphore(max_concurrency) \
+        if max_concurrency else nullcontext()
+
+    async def convert_pair(
+            from_mod_world : WorldRef,
+            to_mod_world : WorldRef
+        ) -> None:
+
+        world_name = from_mod_world.file_name
+
+        async with concurrency_limit:
+            try:
+                conversion_successful = await convert_waypoints_async(
+                    from_mod_world=from_mod_world,
+                    to_mod_world=to_mod_world,
+                    timeout=timeout,
+                    target_lock=target_lock,
+                    near_duplicates=near_duplicates
+                )
+
+            # cancelling the batch itself still propagates, as
+            # CancelledError is not an Exception
+            except Exception as e:
+                results['failed'].append((world_name, f'{type(e).__name__}: {e}'))
+                return
+
+            finally:
+                get_reporter().flush()
+
+        if conversion_successful:
+            results['successful'].append(world_name)
+        else:
+            results['unsuccessful'].append(world_name)
+
+    await asyncio.gather(*(
+        convert_pair(from_mod_world, to_mod_world)
+        for from_mod_world, to_mod_world in pairs
     ))
 
+    return results
+
+
+
+########################################################################
+#####                            Driver                            #####
+########################################################################
+
+@traced
+def run_driver(
+        convert_here : bool,
+        from_mod : str | None = None,
+        to_mod : str | None = None,
+        source_world : str | None = None,
+        target_world : str | None = None,
+        ambiguity : str = 'prompt',
+        merge : bool = False,
+        near_duplicates : 'NearDuplicateFilter | None' = None
+    ) -> dict:
+    """
+    Runs the convertion functionality of the script. The mods and world
+    names that are not given are asked for.
+
+    Parameters
+    ----------
+    convert_here : bool
+        True,   if the user wishes to convert files within this dir
+        False,  otherwise
+    from_mod : str, optional
+        the mod to convert from
+    to_mod : str, optional
+        the mod to convert to
+    source_world : str, optional
+        the name of the world to convert from
+    target_world : str, optional
+        the name of the world to convert to, defaults to `source_world`
+    ambiguity : str, default='prompt'
+        how a name matching several worlds is settled, one of
+        `AMBIGUITY_POLICIES`
+    merge : bool, default=False
+        True,   to merge the waypoints of both worlds both ways
+        False,  to convert them from one mod to the other
+    near_duplicates : NearDuplicateFilter, optional
+        the policy applied to converted waypoints that are near another
+        waypoint of the world they are added to, none by default
+
+    Returns
+    -------
+    dict
+        the result of the run, as printed by `print_result_line`
+    """
+
+    if from_mod is None or to_mod is None:
+        from_mod, to_mod = get_mod_names(
+            mod_options=get_handler_registry().get_mod_names()
+        )
+
+    result = {
+        'mode' : 'single',
+        'merge' : merge,
+        'from_mod' : from_mod,
+        'to_mod' : to_mod
+    }
+
     # TODO v2 - user chooses from dropdown list, rather than getting the
     # name of the world, for each mod
 
-    world_name = get_world_name()
+    # the worlds are resolved against the directories the handlers
+    # use, so those are set before searching
+    if convert_here:
+        get_mod_handler(from_mod).convert_here()
+        get_mod_handler(to_mod).convert_here()
+
+    if source_world is None:
+        source_world = get_world_name()
+
+    target_world = target_world or source_world
 
-    world_name_in_from_mod = get_world_file_name(world_name, from_mod)
-    world_name_in_to_mod   = get_world_file_name(world_name, to_mod)
+    try:
+        world_in_from_mod = get_world_file_name(source_world, from_mod, ambiguity)
+        world_in_to_mod   = get_world_file_name(target_world, to_mod, ambiguity)
 
-    if not world_name_in_from_mod or not world_name_in_to_mod:
+    except AmbiguousWorldError as e:
+        print_script_message(str(e))
+        return result | {
+            'status' : 'ambiguous_world',
+            'exit_code' : EXIT_AMBIGUOUS_WORLD,
+            'search_name' : e.search_name,
+            'matches' : e.matches
+        }
+
+    if not world_in_from_mod or not world_in_to_mod:
         print_script_message(
             f'Given world not in {from_mod}'
-        ) if not world_name_in_from_mod \
+        ) if not world_in_from_mod \
         else print_script_message(
             f'Given world not in {to_mod}'
         )
-        return
+        return result | {
+            'status' : 'world_not_found',
+            'exit_code' : EXIT_WORLD_NOT_FOUND,
+            'search_name' : target_world if world_in_from_mod else source_world
+        }
     
     # TODO v2 end
-    
-    if convert_here:
-        MOD_CLASSES[from_mod].convert_here()
-        MOD_CLASSES[to_mod].convert_here()
 
-    if convert_waypoints(
+    result |= {
+        'source_world' : world_in_from_mod.file_name,
+        'target_world' : world_in_to_mod.file_name
+    }
+
+    convert = merge_world_waypoints if merge else convert_waypoints
+
+    try:
+        conversion_successful = convert(
+            from_mod_world=world_in_from_mod,
+            to_mod_world=world_in_to_mod,
+            near_duplicates=near_duplicates
+        )
+
+    # the events of the conversion are shown before its outcome
+    finally:
+        get_reporter().flush()
+
+    if conversion_successful:
+        print_script_message(f'{'Merge' if merge else 'Conversion'} successful!')
+        return result | {'status' : 'success', 'exit_code' : EXIT_SUCCESS}
+
+    print_script_message(f'{'Merge' if merge else 'Conversion'} unsuccessful.')
+    return result | {'status' : 'failed', 'exit_code' : EXIT_CONVERSION_FAILED}
+
+
+@traced
+def run_batch_driver(
+        convert_here : bool,
+        max_workers : int | None,
+        io_workers : int | None = None,
+        from_mod : str | None = None,
+        to_mod : str | None = None,
+        merge : bool = False,
+        near_duplicates : 'NearDuplicateFilter | None' = None
+    ) -> dict:
+    """
+    Runs the convertion functionality of the script for every world
+    that the mod to convert from has waypoints for.
+
+    Parameters
+    ----------
+    convert_here : bool
+        True,   if the user wishes to convert files within this dir
+        False,  otherwise
+    max_workers : int | None
+        the number of worker processes, None to use the number of CPUs
+    io_workers : int | None
+        the number of dimension files each worker handles at the same
+        time, None for the mod handler's default
+    from_mod : str, optional
+        the mod to convert from, asked for if not given
+    to_mod : str, optional
+        the mod to convert to, asked for if not given
+    merge : bool, default=False
+        True,   to merge the waypoints of each pair of worlds both ways
+        False,  to convert them from one mod to the other
+    near_duplicates : NearDuplicateFilter, optional
+        the policy applied to converted waypoints that are near another
+        waypoint of the world they are added to, none by default
+
+    Returns
+    -------
+    dict
+        the result of the run, as printed by `print_result_line`
+    """
+
+    if from_mod is None or to_mod is None:
+        from_mod, to_mod = get_mod_names(
+            mod_options=get_handler_registry().get_mod_names()
+        )
+
+    results = convert_all_worlds(
         from_mod=from_mod,
-        from_mod_world_name=world_name_in_from_mod,
         to_mod=to_mod,
-        to_mod_world_name=world_name_in_to_mod
-    ):
-        print_script_message('Conversion successful!')
+        convert_here=convert_here,
+        max_workers=max_workers,
+        io_workers=io_workers,
+        merge=merge,
+        near_duplicates=near_duplicates
+    )
 
-    else:
-        print_script_message('Conversion unsuccessful.')
+    print_batch_summary(results)
+
+    conversion_failed = results['unsuccessful'] or results['failed']
+
+    return {
+        'mode' : 'batch',
+        'merge' : merge,
+        'from_mod' : from_mod,
+        'to_mod' : to_mod,
+        'status' : 'failed' if conversion_failed else 'success',
+        'exit_code' : EXIT_CONVERSION_FAILED if conversion_failed else EXIT_SUCCESS,
+        'successful' : len(results['successful']),
+        'unsuccessful' : sorted(results['unsuccessful']),
+        'failed' : sorted(world_name for world_name, _ in results['failed']),
+        'unpaired' : len(results['unpaired'])
+    }
+
+
+def print_result_line(result : dict) -> None:
+    """
+    Prints the result of a run as a single line of JSON, the last line
+    the script prints, for scripts that run the converter to read.
 
-    return
+    Parameters
+    ----------
+    result : dict
+        the result of the run, holding at least its 'status' and
+        'exit_code'
+    """
+
+    print(json.dumps(result, ensure_ascii=False), flush=True)
 
 
 
@@ -302,57 +1394,442 @@ def init_parser() -> argparse.Namespace:
         action='store_true'
     ) 
 
+    parser.add_argument(
+        '--from',
+        dest='from_mod',
+        metavar='MOD',
+        help='the mod to convert from, asked for if not given'
+    )
+
+    parser.add_argument(
+        '--to',
+        dest='to_mod',
+        metavar='MOD',
+        help='the mod to convert to, asked for if not given'
+    )
+
+    parser.add_argument(
+        '--world',
+        help='the name of the world to convert, in both mods'
+    )
+
+    parser.add_argument(
+        '--source-world',
+        help='the name of the world to convert from, overrides --world'
+    )
+
+    parser.add_argument(
+        '--target-world',
+        help='the name of the world to convert to, overrides --world'
+    )
+
+    parser.add_argument(
+        '--ambiguity',
+        choices=[policy for policy in AMBIGUITY_POLICIES if policy != 'prompt'],
+        default=None,
+        help='what to do when a world name matches several worlds: fail '
+             '(error), take the one the mod lists first (first), or take '
+             'the best match (best). Asks when run from a terminal, '
+             'otherwise defaults to error'
+    )
+
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help='print the result as a single line of JSON at the end'
+    )
+
+    parser.add_argument(
+        '--merge',
+        action='store_true',
+        help='merge the waypoints of both mods, so that each ends up '
+             'with the waypoints of the other, instead of only '
+             'converting from one mod to the other'
+    )
+
+    parser.add_argument(
+        '--near-duplicates',
+        choices=NEAR_DUPLICATE_POLICIES,
+        default=None,
+        help='what to do with converted waypoints that are near another '
+             'waypoint under a different name: leave them out (skip), '
+             'combine them into one, keeping the world\'s own waypoints '
+             'as they are (merge), or only list them (report)'
+    )
+
+    parser.add_argument(
+        '--near-duplicate-radius',
+        type=float,
+        default=DEFAULT_NEAR_DUPLICATE_RADIUS,
+        help='how close, in blocks, waypoints are for --near-duplicates '
+             f'(defaults to {DEFAULT_NEAR_DUPLICATE_RADIUS:g})'
+    )
+
+    parser.add_argument(
+        '--all-worlds',
+        action='store_true',
+        help='convert every world that the mod to convert from has '
+             'waypoints for'
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='number of worker processes used by --all-worlds '
+             '(defaults to the number of CPUs)'
+    )
+
+    parser.add_argument(
+        '--io-workers',
+        type=int,
+        default=None,
+        help='number of dimension files of a world read, written, and '
+             'backed up at the same time, for mods that keep each '
+             'dimension in its own file (defaults to 4)'
+    )
+
+    parser.add_argument(
+        '--backup-mode',
+        choices=BACKUP_MODES,
+        default='store',
+        help='store backups as deduplicated files (store), or as one '
+             'compressed archive per world (archive)'
+    )
+
+    parser.add_argument(
+        '--standard-format',
+        choices=SERIALIZATION_FORMATS,
+        default=DEFAULT_SERIALIZATION_FORMAT,
+        help='the format the standardized waypoints are saved in: '
+             'readable YAML (yaml), or the faster JSON Lines (jsonl) '
+             'or compact binary (binary)'
+    )
+
+    parser.add_argument(
+        '--list-backups',
+        action='store_true',
+        help='list the backups of the chosen --backup-mode and exit'
+    )
+
+    parser.add_argument(
+        '--keep-backups',
+        type=int,
+        default=DEFAULT_KEEP_RUNS,
+        help='number of most recent runs of backups to keep '
+             f'(defaults to {DEFAULT_KEEP_RUNS})'
+    )
+
+    parser.add_argument(
+        '--progress',
+        choices=REPORTER_KINDS,
+        default=DEFAULT_REPORTER_KIND,
+        help='how the events of a conversion, like skipped waypoints, '
+             'are shown: as console messages (console), as a line of '
+             'JSON per event on stderr (ndjson), or not at all (null)'
+    )
+
+    parser.add_argument(
+        '--trace',
+        type=Path,
+        metavar='FILE',
+        help='record how long each step of the conversion takes, and '
+             'write it to FILE as a Chrome trace, which can be opened in '
+             'chrome://tracing or https://ui.perfetto.dev'
+    )
+
+    parser.add_argument(
+        '--profile',
+        type=Path,
+        nargs='?',
+        const=Path('convert_waypoints.pstats'),
+        metavar='FILE',
+        help='profile the conversion with cProfile, and write its stats '
+             'to FILE (defaults to convert_waypoints.pstats), which can '
+             'be read with python -m pstats'
+    )
+
     return parser.parse_args()
     
 
-def setup_classes(convert_here : bool) -> None:
+def setup_classes(
+        convert_here : bool,
+        io_workers : int | None = None
+    ) -> None:
+    """
+    Sets how the mod handlers are created. The handlers themselves, and
+    the modules they are in, are only loaded by `get_mod_handler` once
+    they are needed.
 
-    if convert_here:
+    Parameters
+    ----------
+    convert_here : bool
+        True,   if the user wishes to convert files within this dir
+        False,  otherwise
+    io_workers : int, optional
+        the number of dimension files handled at the same time, for mods
+        that keep each dimension in its own file
+    """
 
-        dir_path = os.path.join(
-            os.getcwd(),
-            'minecraft-waypoint-converter',
-            'data',
-            'convert-here'
-        )
+    global _convert_here, _io_workers
 
-        MOD_CLASSES['lunar client'] = LunarWaypointHandler(
-            different_file_path=os.path.join(
-                dir_path,
-                'lunar client',
-                'waypoints.json'
-            )
-        )
-        MOD_CLASSES['xaero\'s minimap'] = XaerosWaypointHandler(
-            different_directory_path=os.path.join(
-                dir_path,
-                'xaero\'s minimap'
-            )
+    _convert_here = convert_here
+    _io_workers = io_workers
+
+    close_mod_handlers()
+
+
+def get_mod_handler(mod_name : str) -> 'WaypointModHandler':
+    """
+    Gets the handler of a mod, importing and creating it the first time
+    it is needed.
+
+    Parameters
+    ----------
+    mod_name : str
+        the name of the mod
+
+    Returns
+    -------
+    WaypointModHandler
+        the handler of the mod
+    """
+
+    if mod_name not in _mod_handlers:
+        _mod_handlers[mod_name] = get_handler_registry().create_handler(
+            mod_name,
+            convert_here=_convert_here,
+            io_workers=_io_workers
         )
 
+    return _mod_handlers[mod_name]
 
-def main() -> None:
-    
-    os.system('cls' if os.name == 'nt' else 'clear')
+
+def close_mod_handlers() -> None:
+    """
+    Closes the mod handlers created so far, releasing the threads they
+    hold. Handlers needed after this are created again by
+    `get_mod_handler`.
+    """
+
+    for mod_handler in _mod_handlers.values():
+        mod_handler.close()
+
+    _mod_handlers.clear()
+
+
+def main() -> int:
+    """
+    Runs the script from the command line.
+
+    Returns
+    -------
+    int
+        the exit code of the script, one of the `EXIT_` constants
+    """
     
     args = init_parser()
 
+    interactive = sys.stdin.isatty()
+    start_time = time.perf_counter()
+
+    if interactive and sys.stdout.isatty() and not args.json:
+        os.system('cls' if os.name == 'nt' else 'clear')
+
+    # the handlers take the backup store when they are created
+    set_backup_mode(args.backup_mode)
+
+    # every backup of this invocation, including those of batch workers,
+    # is stored as a single run
+    set_run_id(new_run_id())
+    set_standard_format(args.standard_format)
+
+    if args.list_backups:
+        print_backups()
+        return EXIT_SUCCESS
+
+    usage_error = validate_arguments(args, interactive)
+
+    if usage_error:
+        print_script_message(usage_error)
+
+        if args.json:
+            print_result_line({
+                'status' : 'usage_error',
+                'exit_code' : EXIT_USAGE_ERROR,
+                'error' : usage_error
+            })
+
+        return EXIT_USAGE_ERROR
+
     if args.convert_here:
         print_script_message('Running script using mode: convert-here')
     else:
         print_script_message('Running script using mode: standard')
         
-    setup_classes(args.convert_here)
+    setup_classes(args.convert_here, args.io_workers)
+
+    near_duplicates = None
+
+    if args.near_duplicates:
+        # imported here, since only conversions filtering near duplicates
+        # need it
+        from waypoint_handlers.near_duplicates import NearDuplicateFilter
+
+        near_duplicates = NearDuplicateFilter(
+            policy=args.near_duplicates,
+            radius=args.near_duplicate_radius
+        )
+
+    set_tracing(args.trace is not None)
+    set_reporter(create_reporter(args.progress))
+
+    profiler = None
+
+    if args.profile is not None:
+        # imported here, since only profiled runs need it
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        if args.all_worlds:
+            result = run_batch_driver(
+                convert_here=args.convert_here,
+                max_workers=args.workers,
+                io_workers=args.io_workers,
+                from_mod=args.from_mod,
+                to_mod=args.to_mod,
+                merge=args.merge,
+                near_duplicates=near_duplicates
+            )
 
-    # default functionality of script
-    run_driver(args.convert_here)
+        # default functionality of script
+        else:
+            result = run_driver(
+                convert_here=args.convert_here,
+                from_mod=args.from_mod,
+                to_mod=args.to_mod,
+                source_world=args.source_world or args.world,
+                target_world=args.target_world or args.world,
+                ambiguity=args.ambiguity or ('prompt' if interactive else 'error'),
+                merge=args.merge,
+                near_duplicates=near_duplicates
+            )
+
+        # only once every conversion is done, since backups that are
+        # being created are not yet protected from removal
+        prune_backups(args.keep_backups)
+
+    # the trace and profile are written even if the conversion failed,
+    # since that is when they are needed most
+    finally:
+        close_mod_handlers()
+        get_reporter().close()
+
+        if profiler is not None:
+            profiler.disable()
+            save_profile(profiler, args.profile)
+
+        if args.trace is not None:
+            if write_trace(args.trace):
+                print_script_message(f'Trace written to {args.trace}')
+            else:
+                print_script_message(f'Failure writing the trace to {args.trace}')
+
+    if args.json:
+        result['events'] = dict(get_reporter().counters)
+        result['elapsed_ms'] = round((time.perf_counter() - start_time) * 1000, 1)
+        print_result_line(result)
     
-    return
+    return result['exit_code']
 
 
+def save_profile(profiler : 'cProfile.Profile', file_path : Path) -> None:
+    """
+    Writes the stats of a profiled run to a file, and prints the
+    functions the run spent the most time in.
+
+    Parameters
+    ----------
+    profiler : cProfile.Profile
+        the profiler the run was profiled with
+    file_path : pathlib.Path
+        the file to write the stats to
+    """
+
+    # imported here, since only profiled runs need it
+    import pstats
+
+    try:
+        profiler.dump_stats(file_path)
+
+    except OSError:
+        print_script_message(f'Failure writing the profile to {file_path}')
+        return
+
+    print_script_message(f'Profile written to {file_path}, the slowest calls were:')
+
+    pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
+
+
+def validate_arguments(args : argparse.Namespace, interactive : bool) -> str | None:
+    """
+    Checks that the command line arguments name known mods, and that
+    everything that can not be asked for is given.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        the parsed command line arguments
+    interactive : bool
+        True,   if the user can be asked for what is missing
+        False,  otherwise
+
+    Returns
+    -------
+    str
+        the problem with the arguments,
+        None if there is none
+    """
+
+    mod_names = get_handler_registry().get_mod_names()
+
+    for mod_name in (args.from_mod, args.to_mod):
+        if mod_name is not None and mod_name not in mod_names:
+            return f'Unknown mod "{mod_name}", expected one of: {', '.join(mod_names)}'
+
+    if args.from_mod is not None and args.from_mod == args.to_mod:
+        return 'The mods to export from and import to can not be the same mod.'
+
+    if args.near_duplicate_radius <= 0:
+        return '--near-duplicate-radius must be greater than 0.'
+
+    # keeping no backups would remove the ones this run just created
+    for option, value in (
+        ('--workers', args.workers),
+        ('--io-workers', args.io_workers),
+        ('--keep-backups', args.keep_backups)
+    ):
+        if value is not None and value < 1:
+            return f'{option} must be at least 1.'
+
+    if interactive:
+        return None
+
+    if args.from_mod is None or args.to_mod is None:
+        return '--from and --to are required when not run from a terminal.'
+
+    if not args.all_worlds and not (args.source_world or args.world):
+        return '--world or --source-world is required when not run from a terminal.'
+
+    return None
+
 
 def testing():
 
+    from pyfilehandlers.file_handler import FileHandler
+
     servers_file = FileHandler(
         Path(
             os.getenv('APPDATA'),
@@ -372,5 +1849,4 @@ def testing():
 
 if __name__ == "__main__":
 
-    testing()
-    # main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,328 @@
+"""backup_archive.py
+
+Contains a class that backs up the waypoint files of each world into a
+compressed archive, streaming the files rather than loading them.
+"""
+
+import os
+import shutil
+import zipfile
+from pathlib import Path
+
+from lunapyutils import print_script_message
+
+from .backup_store import DEFAULT_KEEP_RUNS, safe_file_name
+
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+
+
+class BackupArchive:
+    """
+    A class that backs up the waypoint files of each world into its own
+    LZMA compressed zip archive, one archive per world per run.
+
+    Files are streamed into the archive in small chunks, so memory use
+    does not grow with the size of the waypoint files, and an archive's
+    contents can be listed from its central directory without
+    decompressing anything.
+
+    The backups have the following layout:
+
+    ```
+    backups/
+        archives/
+            RUN_ID/
+                MOD_NAME/
+                    WORLD_NAME.zip
+    ```
+
+
+    Attributes
+    ----------
+    store_path : pathlib.Path
+        The directory the backups are stored in.
+
+    archives_path : pathlib.Path
+        The directory the archives of every run are stored in.
+    """
+
+    def __init__(self, store_path : Path = None) -> None:
+        """
+        Initializes a BackupArchive instance.
+
+
+        Parameters
+        ----------
+        store_path : pathlib.Path, optional
+            The directory the backups are stored in. If not provided,
+            defaults to `minecraft-waypoint-converter/data/backups`.
+        """
+
+        self.store_path : Path = Path(store_path or Path(
+            os.getcwd(),
+            'minecraft-waypoint-converter',
+            'data',
+            'backups'
+        ))
+
+        self.archives_path : Path = Path(self.store_path, 'archives')
+
+
+
+    ####################################################################
+    #####                     Creating Backups                     #####
+    ####################################################################
+
+    def back_up_files(
+            self,
+            run_id : str,
+            mod_name : str,
+            world_name : str,
+            files : dict[str, Path],
+            io_executor : 'Executor | None' = None
+        ) -> bool:
+        """
+        Backs up the waypoint files of a world into the world's archive
+        for the run, replacing the archive if it already exists.
+
+
+        Parameters
+        ----------
+        run_id : str
+            The run the backup belongs to.
+
+        mod_name : str
+            The name of the mod the files belong to.
+
+        world_name : str
+            The file system name of the world the files belong to.
+
+        files : dict[str, pathlib.Path]
+            The files to back up, keyed by the path to store them under.
+
+        io_executor : concurrent.futures.Executor, optional
+            Unused, since an archive is written as a single stream. Taken
+            so both backup modes can be called the same way.
+
+
+        Returns
+        -------
+        bool
+            True,   if every file was backed up.
+            False,  otherwise.
+        """
+
+        archive_path = self.get_archive_path(run_id, mod_name, world_name)
+        temp_path = archive_path.with_name(f'{archive_path.name}.{os.getpid()}.tmp')
+
+        try:
+            archive_path.parent.mkdir(parents=True, exist_ok=True)
+
+            with zipfile.ZipFile(
+                temp_path,
+                'w',
+                compression=zipfile.ZIP_LZMA
+            ) as archive:
+
+                # ZipFile.write copies the file in chunks
+                for relative_path, file_path in files.items():
+                    archive.write(file_path, arcname=relative_path)
+
+            os.replace(temp_path, archive_path)
+
+        except (OSError, zipfile.BadZipFile) as e:
+            print_script_message(f'Error creating {mod_name} backup archive: {e}')
+
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+            return False
+
+        return True
+
+
+
+    ####################################################################
+    #####                     Reading Backups                      #####
+    ####################################################################
+
+    def list_runs(self) -> list[str]:
+        """
+        Gets the runs that have backups in the store, oldest first.
+
+
+        Returns
+        -------
+        list[str]
+            The run ids.
+        """
+
+        try:
+            with os.scandir(self.archives_path) as entries:
+                return sorted(entry.name for entry in entries if entry.is_dir())
+
+        except FileNotFoundError:
+            return []
+
+
+    def list_manifests(self, run_id : str) -> list[dict]:
+        """
+        Gets the contents of every world's archive in a run, in the same
+        format as the manifests of `BackupStore`.
+
+
+        Parameters
+        ----------
+        run_id : str
+            The run to get the contents of.
+
+
+        Returns
+        -------
+        list[dict]
+            The contents of each archive of the run.
+        """
+
+        manifests = []
+
+        for archive_path in sorted(Path(self.archives_path, run_id).glob('*/*.zip')):
+
+            try:
+                files = self.list_archive(archive_path)
+            except (OSError, zipfile.BadZipFile):
+                continue
+
+            manifests.append({
+                'run_id' : run_id,
+                'mod_name' : archive_path.parent.name,
+                'world_name' : archive_path.stem,
+                'files' : files
+            })
+
+        return manifests
+
+
+    @staticmethod
+    def list_archive(archive_path : Path) -> dict[str, dict]:
+        """
+        Lists the files in an archive from its central directory, without
+        decompressing any of them.
+
+
+        Parameters
+        ----------
+        archive_path : pathlib.Path
+            The archive to list.
+
+
+        Returns
+        -------
+        dict[str, dict]
+            The size and compressed size of each file, keyed by its path
+            in the archive.
+        """
+
+        with zipfile.ZipFile(archive_path) as archive:
+            return {
+                info.filename : {
+                    'size' : info.file_size,
+                    'compressed_size' : info.compress_size
+                }
+                for info in archive.infolist()
+            }
+
+
+    def restore_file(
+            self,
+            archive_path : Path,
+            relative_path : str,
+            destination : Path
+        ) -> None:
+        """
+        Streams a single file back out of an archive.
+
+
+        Parameters
+        ----------
+        archive_path : pathlib.Path
+            The archive holding the file.
+
+        relative_path : str
+            The path of the file in the archive.
+
+        destination : pathlib.Path
+            The path to write the file to.
+        """
+
+        destination = Path(destination)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+
+        with zipfile.ZipFile(archive_path) as archive, \
+            archive.open(relative_path) as source, \
+            open(destination, 'wb') as target:
+
+            shutil.copyfileobj(source, target)
+
+
+
+    ####################################################################
+    #####                        Retention                         #####
+    ####################################################################
+
+    def prune(self, keep_runs : int = DEFAULT_KEEP_RUNS) -> int:
+        """
+        Removes the archives of all but the newest runs.
+
+
+        Parameters
+        ----------
+        keep_runs : int, default=DEFAULT_KEEP_RUNS
+            The number of newest runs to keep.
+
+
+        Returns
+        -------
+        int
+            The number of archives removed.
+        """
+
+        runs = self.list_runs()
+        removed_archives = 0
+
+        for run_id in runs[:max(len(runs) - max(keep_runs, 0), 0)]:
+
+            run_path = Path(self.archives_path, run_id)
+            removed_archives += sum(1 for _ in run_path.glob('*/*.zip'))
+            shutil.rmtree(run_path, ignore_errors=True)
+
+        return removed_archives
+
+
+
+    ####################################################################
+    #####                      Other Methods                       #####
+    ####################################################################
+
+    def get_archive_path(
+            self,
+            run_id : str,
+            mod_name : str,
+            world_name : str
+        ) -> Path:
+        """
+        Gets the path of the archive of a world's backup.
+        """
+
+        return Path(
+            self.archives_path,
+            run_id,
+            safe_file_name(mod_name),
+            f'{safe_file_name(world_name)}.zip'
+        )
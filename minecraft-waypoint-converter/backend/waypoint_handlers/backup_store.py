@@ -0,0 +1,630 @@
+"""backup_store.py
+
+Contains a class that stores backups of waypoint files by their
+contents, so that unchanged files are only ever stored once.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from lunapyutils import print_script_message
+
+
+from typing import Iterable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+
+MANIFEST_VERSION : int = 1
+
+# how many runs of backups are kept when the store is pruned
+DEFAULT_KEEP_RUNS : int = 20
+
+# how many seconds a blob is kept after it was last stored or reused,
+# even if no manifest refers to it, since a run that is still creating
+# its backups only refers to its blobs once their manifest is written
+DEFAULT_BLOB_GRACE_PERIOD : float = 24 * 60 * 60
+
+# 'store' keeps deduplicated blobs, 'archive' one compressed zip per world
+BACKUP_MODES : tuple[str, str] = ('store', 'archive')
+
+_CHUNK_SIZE : int = 1024 * 1024
+
+# characters that can not be used in file names on Windows
+_UNSAFE_NAME_CHARACTERS = re.compile(r'[<>:"/\\|?*]')
+
+
+
+class BackupStore:
+    """
+    A class that stores backups of waypoint files by their contents.
+
+    Each distinct file content is stored once, as a blob named after its
+    hash, under `objects/`. A backup only records which blob each file
+    had, in a manifest per world under `runs/RUN_ID/MOD_NAME/`, so backing
+    up a file that did not change since a previous backup stores nothing
+    but the manifest. New blobs are copied with `os.copy_file_range`
+    where available, which lets the file system share the data blocks.
+
+    Blobs are copied rather than hardlinked, since the mods rewrite their
+    waypoint files in place, which would also change a hardlinked blob.
+
+    The store has the following layout:
+
+    ```
+    backups/
+        objects/
+            HASH[:2]/
+                HASH
+        runs/
+            RUN_ID/
+                MOD_NAME/
+                    WORLD_NAME.json
+    ```
+
+    and each manifest has the following format:
+
+    ```
+    {
+        "version" : int,
+        "run_id" : str,
+        "mod_name" : str,
+        "world_name" : str,
+        "created" : str (ISO 8601),
+        "files" : {
+            "RELATIVE_PATH" : {
+                "hash" : str,
+                "size" : int
+            },
+            ...
+        }
+    }
+    ```
+
+
+    Attributes
+    ----------
+    store_path : pathlib.Path
+        The directory the backups are stored in.
+    """
+
+    def __init__(self, store_path : Path = None) -> None:
+        """
+        Initializes a BackupStore instance.
+
+
+        Parameters
+        ----------
+        store_path : pathlib.Path, optional
+            The directory the backups are stored in. If not provided,
+            defaults to `minecraft-waypoint-converter/data/backups`.
+        """
+
+        self.store_path : Path = Path(store_path or Path(
+            os.getcwd(),
+            'minecraft-waypoint-converter',
+            'data',
+            'backups'
+        ))
+
+        self.objects_path : Path = Path(self.store_path, 'objects')
+        self.runs_path : Path = Path(self.store_path, 'runs')
+
+
+
+    ####################################################################
+    #####                     Creating Backups                     #####
+    ####################################################################
+
+    def back_up_files(
+            self,
+            run_id : str,
+            mod_name : str,
+            world_name : str,
+            files : dict[str, Path],
+            io_executor : 'Executor | None' = None
+        ) -> bool:
+        """
+        Backs up the waypoint files of a world, storing the contents of
+        each file that is not in the store yet.
+
+
+        Parameters
+        ----------
+        run_id : str
+            The run the backup belongs to.
+
+        mod_name : str
+            The name of the mod the files belong to.
+
+        world_name : str
+            The file system name of the world the files belong to.
+
+        files : dict[str, pathlib.Path]
+            The files to back up, keyed by the path to record them under.
+
+        io_executor : concurrent.futures.Executor, optional
+            The executor to store the files on, all at the same time.
+            If not provided, the files are stored one after another.
+
+
+        Returns
+        -------
+        bool
+            True,   if every file was backed up.
+            False,  otherwise.
+        """
+
+        manifest_files : dict[str, dict] = {}
+
+        try:
+            if io_executor is None or len(files) <= 1:
+                blobs = map(self.add_blob, files.values())
+            else:
+                blobs = io_executor.map(self.add_blob, files.values())
+
+            # the manifest is only written once every blob is stored
+            for relative_path, (file_hash, file_size) in zip(files, blobs):
+
+                manifest_files[relative_path] = {
+                    'hash' : file_hash,
+                    'size' : file_size
+                }
+
+            self._write_json(
+                self.get_manifest_path(run_id, mod_name, world_name),
+                {
+                    'version' : MANIFEST_VERSION,
+                    'run_id' : run_id,
+                    'mod_name' : mod_name,
+                    'world_name' : world_name,
+                    'created' : datetime.now().isoformat(timespec='seconds'),
+                    'files' : manifest_files
+                }
+            )
+
+        except OSError as e:
+            print_script_message(f'Error creating {mod_name} backup: {e}')
+            return False
+
+        return True
+
+
+    def add_blob(self, file_path : Path) -> tuple[str, int]:
+        """
+        Stores the contents of a file, unless a blob with the same
+        contents is already stored.
+
+
+        Parameters
+        ----------
+        file_path : pathlib.Path
+            The file to store.
+
+
+        Returns
+        -------
+        tuple[str, int]
+            The hash and size of the stored contents.
+        """
+
+        file_hash, file_size = self._hash_file(file_path)
+        blob_path = self.get_blob_path(file_hash)
+
+        # reusing a blob renews it, so that a prune run by another
+        # process does not remove it before this run's manifest is written
+        try:
+            os.utime(blob_path)
+            return file_hash, file_size
+
+        # not stored yet, or removed by a prune in the meantime
+        except FileNotFoundError:
+            pass
+
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # files with the same contents may be stored by several threads
+        # at once, each needing its own temporary file
+        temp_path = blob_path.with_name(
+            f'{blob_path.name}.{os.getpid()}.{threading.get_ident()}.tmp'
+        )
+
+        try:
+            _copy_file(file_path, temp_path)
+
+            # the file may have been written to since it was hashed, so
+            # the blob is named after what was actually copied
+            copied_hash, copied_size = self._hash_file(temp_path)
+
+            if copied_hash != file_hash:
+                file_hash, file_size = copied_hash, copied_size
+                blob_path = self.get_blob_path(file_hash)
+                blob_path.parent.mkdir(parents=True, exist_ok=True)
+
+            os.replace(temp_path, blob_path)
+
+        finally:
+            if temp_path.exists():
+                os.remove(temp_path)
+
+        return file_hash, file_size
+
+
+
+    ####################################################################
+    #####                     Reading Backups                      #####
+    ####################################################################
+
+    def list_runs(self) -> list[str]:
+        """
+        Gets the runs that have backups in the store, oldest first.
+
+
+        Returns
+        -------
+        list[str]
+            The run ids.
+        """
+
+        try:
+            with os.scandir(self.runs_path) as entries:
+                return sorted(entry.name for entry in entries if entry.is_dir())
+
+        except FileNotFoundError:
+            return []
+
+
+    def list_manifests(self, run_id : str) -> list[dict]:
+        """
+        Gets the manifests of every world backed up in a run.
+
+
+        Parameters
+        ----------
+        run_id : str
+            The run to get the manifests of.
+
+
+        Returns
+        -------
+        list[dict]
+            The manifests of the run.
+        """
+
+        manifests = []
+
+        for manifest_path in sorted(Path(self.runs_path, run_id).glob('*/*.json')):
+
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+
+            except (OSError, ValueError):
+                continue
+
+            if manifest.get('version') == MANIFEST_VERSION:
+                manifests.append(manifest)
+
+        return manifests
+
+
+    def restore_file(self, file_hash : str, destination : Path) -> None:
+        """
+        Copies a stored blob back out of the store.
+
+
+        Parameters
+        ----------
+        file_hash : str
+            The hash of the blob, as recorded in a manifest.
+
+        destination : pathlib.Path
+            The path to copy the blob to.
+        """
+
+        destination = Path(destination)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+
+        _copy_file(self.get_blob_path(file_hash), destination)
+
+
+
+    ####################################################################
+    #####                        Retention                         #####
+    ####################################################################
+
+    def prune(
+            self,
+            keep_runs : int = DEFAULT_KEEP_RUNS,
+            grace_period : float = DEFAULT_BLOB_GRACE_PERIOD
+        ) -> int:
+        """
+        Removes all but the newest runs of backups, then removes the
+        blobs that no remaining run refers to.
+
+        Other runs may be creating backups at the same time, and only
+        refer to the blobs they store or reuse once their manifests are
+        written. Blobs stored or reused within the grace period are
+        therefore kept until a later prune.
+
+
+        Parameters
+        ----------
+        keep_runs : int, default=DEFAULT_KEEP_RUNS
+            The number of newest runs to keep.
+
+        grace_period : float, default=DEFAULT_BLOB_GRACE_PERIOD
+            How many seconds a blob that no run refers to is kept after
+            it was last stored or reused.
+
+
+        Returns
+        -------
+        int
+            The number of blobs removed.
+        """
+
+        runs = self.list_runs()
+        expired_runs = runs[:max(len(runs) - max(keep_runs, 0), 0)]
+
+        for run_id in expired_runs:
+            shutil.rmtree(Path(self.runs_path, run_id), ignore_errors=True)
+
+        referenced_hashes = {
+            file_data['hash']
+            for run_id in runs[len(expired_runs):]
+            for manifest in self.list_manifests(run_id)
+            for file_data in manifest['files'].values()
+        }
+
+        removed_blobs = 0
+        oldest_kept_time = time.time() - grace_period
+
+        for blob_path in self._iter_blobs():
+
+            if blob_path.name in referenced_hashes:
+                continue
+
+            try:
+                if blob_path.stat().st_mtime >= oldest_kept_time:
+                    continue
+
+                os.remove(blob_path)
+                removed_blobs += 1
+            except OSError:
+                continue
+
+            # only succeeds once the directory is empty
+            try:
+                os.rmdir(blob_path.parent)
+            except OSError:
+                pass
+
+        return removed_blobs
+
+
+
+    ####################################################################
+    #####                      Other Methods                       #####
+    ####################################################################
+
+    def get_blob_path(self, file_hash : str) -> Path:
+        """
+        Gets the path of the blob holding the contents with the given hash.
+        """
+
+        return Path(self.objects_path, file_hash[:2], file_hash)
+
+
+    def get_manifest_path(
+            self,
+            run_id : str,
+            mod_name : str,
+            world_name : str
+        ) -> Path:
+        """
+        Gets the path of the manifest of a world's backup.
+        """
+
+        return Path(
+            self.runs_path,
+            run_id,
+            safe_file_name(mod_name),
+            f'{safe_file_name(world_name)}.json'
+        )
+
+
+    def _iter_blobs(self) -> Iterable[Path]:
+        """
+        Iterates over every blob in the store.
+        """
+
+        if not self.objects_path.is_dir():
+            return
+
+        for blob_path in self.objects_path.glob('*/*'):
+            if blob_path.is_file() and not blob_path.name.endswith('.tmp'):
+                yield blob_path
+
+
+    @staticmethod
+    def _hash_file(file_path : Path) -> tuple[str, int]:
+        """
+        Hashes the contents of a file.
+
+
+        Returns
+        -------
+        tuple[str, int]
+            The hex digest and the size of the contents.
+        """
+
+        digest = hashlib.sha256()
+        file_size = 0
+
+        with open(file_path, 'rb') as f:
+            while chunk := f.read(_CHUNK_SIZE):
+                digest.update(chunk)
+                file_size += len(chunk)
+
+        return digest.hexdigest(), file_size
+
+
+    @staticmethod
+    def _write_json(file_path : Path, data : dict) -> None:
+        """
+        Writes a JSON file, replacing it atomically.
+        """
+
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = file_path.with_name(f'{file_path.name}.{os.getpid()}.tmp')
+
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4)
+
+        os.replace(temp_path, file_path)
+
+
+
+def _copy_file(source_path : Path, destination_path : Path) -> None:
+    """
+    Copies a file, through `os.copy_file_range` when the platform has it,
+    so that file systems supporting it can copy without moving the data
+    through memory. Falls back to `shutil.copyfile` otherwise.
+    """
+
+    if not hasattr(os, 'copy_file_range'):
+        shutil.copyfile(source_path, destination_path)
+        return
+
+    with open(source_path, 'rb') as source, open(destination_path, 'wb') as destination:
+
+        try:
+            while os.copy_file_range(
+                source.fileno(), destination.fileno(), _CHUNK_SIZE * 64
+            ):
+                pass
+            return
+
+        # e.g. copying across file systems on older kernels
+        except OSError:
+            source.seek(0)
+            destination.seek(0)
+            destination.truncate()
+
+        shutil.copyfileobj(source, destination, _CHUNK_SIZE)
+
+
+def safe_file_name(name : str) -> str:
+    """
+    Replaces the characters of `name` that can not be in a file name.
+    """
+
+    return _UNSAFE_NAME_CHARACTERS.sub('_', name)
+
+
+
+_shared_store : 'BackupStore | BackupArchive | None' = None
+_backup_mode : str | None = None
+_run_id : str | None = None
+
+
+def set_backup_mode(mode : str) -> None:
+    """
+    Chooses how the backups of this process are stored. Must be called
+    before the mod handlers are created.
+
+
+    Parameters
+    ----------
+    mode : str
+        One of `BACKUP_MODES`.
+    """
+
+    global _shared_store, _backup_mode
+
+    match mode:
+
+        case 'store':
+            _shared_store = BackupStore()
+
+        case 'archive':
+            # imported here, since the archive module uses this one
+            from .backup_archive import BackupArchive
+            _shared_store = BackupArchive()
+
+        case _:
+            raise ValueError(f'Unknown backup mode: {mode}')
+
+    _backup_mode = mode
+
+
+def get_backup_mode() -> str:
+    """
+    Gets how the backups of this process are stored, one of `BACKUP_MODES`.
+    """
+
+    if _backup_mode is None:
+        set_backup_mode('store')
+
+    return _backup_mode
+
+
+def get_backup_store() -> 'BackupStore | BackupArchive':
+    """
+    Gets the backup store shared by all mod handlers of this process,
+    a `BackupStore` unless another mode was set with `set_backup_mode`.
+
+
+    Returns
+    -------
+    BackupStore | BackupArchive
+        The shared backup store.
+    """
+
+    if _shared_store is None:
+        set_backup_mode('store')
+
+    return _shared_store
+
+
+def new_run_id() -> str:
+    """
+    Creates the id of a new run of backups. Ids sort in the order the
+    runs were created, and two runs started in the same second, or by
+    two processes at once, still get different ids.
+    """
+
+    return f'{datetime.now().strftime('%Y.%m.%d-%H.%M.%S.%f')}-{os.getpid()}'
+
+
+def set_run_id(run_id : str) -> None:
+    """
+    Chooses the run that the backups of this process are stored under,
+    so that every backup of a single invocation, including those of its
+    batch workers, is a single run.
+    """
+
+    global _run_id
+
+    _run_id = run_id
+
+
+def get_run_id() -> str:
+    """
+    Gets the run that the backups of this process are stored under, a
+    new run unless one was set with `set_run_id`.
+    """
+
+    if _run_id is None:
+        set_run_id(new_run_id())
+
+    return _run_id
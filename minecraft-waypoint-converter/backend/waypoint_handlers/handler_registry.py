@@ -0,0 +1,344 @@
+"""handler_registry.py
+
+Contains a class that keeps track of the waypoint mod handlers that are
+available, importing each one only once a conversion needs it.
+"""
+
+import importlib
+from dataclasses import dataclass, field
+
+
+from typing import Iterable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .waypoint_mod_handler import WaypointModHandler
+
+
+# the entry point group other packages register waypoint mod handlers in
+ENTRY_POINT_GROUP : str = 'minecraft_waypoint_converter.handlers'
+
+# the mod keeps every world in a single file, so conversions into it can
+# not write to it at the same time
+CAPABILITY_SINGLE_FILE : str = 'single_file'
+
+# the mod keeps each dimension in its own file, which can be read and
+# written in parallel
+CAPABILITY_DIMENSION_FILES : str = 'dimension_files'
+
+
+
+@dataclass(frozen=True, slots=True)
+class HandlerSpec:
+    """
+    The registration of a waypoint mod handler, which is enough to list
+    the mod and to know what it supports without importing its handler.
+
+
+    Attributes
+    ----------
+    mod_name : str
+        The name of the mod, as shown to the user.
+
+    target : str
+        Where the handler class is, as `MODULE:CLASS`.
+
+    capabilities : frozenset[str]
+        What the mod supports, from the `CAPABILITY_` constants.
+    """
+
+    mod_name : str
+    target : str
+    capabilities : frozenset[str] = field(default_factory=frozenset)
+
+
+
+class HandlerRegistry:
+    """
+    A class that keeps track of the waypoint mod handlers that are
+    available, by the name of their mod.
+
+    Handlers are registered by where their class is rather than by the
+    class itself, so a handler's module, and the dependencies it brings
+    in, are only imported once a conversion needs the handler. Besides
+    the handlers registered with `register`, other packages can provide
+    handlers through the `ENTRY_POINT_GROUP` entry point group:
+
+    ```
+    [project.entry-points."minecraft_waypoint_converter.handlers"]
+    "journeymap" = "journeymap_handler:JourneyMapWaypointHandler [dimension_files]"
+    ```
+
+    where the name of the entry point is the name of the mod, and its
+    extras are the mod's capabilities.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty HandlerRegistry instance.
+        """
+
+        self._specs : dict[str, HandlerSpec] = {}
+        self._handler_classes : dict[str, type['WaypointModHandler']] = {}
+        self._entry_points_loaded : bool = False
+
+
+
+    ####################################################################
+    #####                   Registering Handlers                   #####
+    ####################################################################
+
+    def register(
+            self,
+            mod_name : str,
+            target : str,
+            capabilities : Iterable[str] = ()
+        ) -> None:
+        """
+        Registers the handler of a mod, replacing any handler already
+        registered for the mod.
+
+
+        Parameters
+        ----------
+        mod_name : str
+            The name of the mod.
+
+        target : str
+            Where the handler class is, as `MODULE:CLASS`.
+
+        capabilities : Iterable[str], optional
+            What the mod supports, from the `CAPABILITY_` constants.
+        """
+
+        if ':' not in target:
+            raise ValueError(
+                f'Handler of {mod_name} must be given as MODULE:CLASS, not {target}'
+            )
+
+        self._specs[mod_name] = HandlerSpec(
+            mod_name=mod_name,
+            target=target,
+            capabilities=frozenset(capabilities)
+        )
+        self._handler_classes.pop(mod_name, None)
+
+
+    def load_entry_points(self) -> None:
+        """
+        Registers the handlers that installed packages provide through
+        the `ENTRY_POINT_GROUP` entry point group. Handlers registered
+        with `register` take precedence over those of entry points.
+        Only the entry points are read, none of their modules imported.
+        """
+
+        if self._entry_points_loaded:
+            return
+
+        self._entry_points_loaded = True
+
+        # imported here, since reading the installed packages is only
+        # needed once the mods are listed or looked up
+        from importlib.metadata import entry_points
+
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+
+            if entry_point.name in self._specs:
+                continue
+
+            self.register(
+                mod_name=entry_point.name,
+                target=f'{entry_point.module}:{entry_point.attr}',
+                capabilities=entry_point.extras
+            )
+
+
+
+    ####################################################################
+    #####                     Reading Handlers                     #####
+    ####################################################################
+
+    def get_mod_names(self) -> tuple[str, ...]:
+        """
+        Gets the names of the mods that have a handler, in the order
+        they were registered.
+        """
+
+        self.load_entry_points()
+
+        return tuple(self._specs)
+
+
+    def get_spec(self, mod_name : str) -> HandlerSpec:
+        """
+        Gets the registration of the handler of a mod.
+
+
+        Parameters
+        ----------
+        mod_name : str
+            The name of the mod.
+
+
+        Returns
+        -------
+        HandlerSpec
+            The registration of the mod's handler.
+
+
+        Raises
+        ------
+        KeyError
+            If no handler is registered for the mod.
+        """
+
+        if mod_name not in self._specs:
+            self.load_entry_points()
+
+        try:
+            return self._specs[mod_name]
+
+        except KeyError:
+            raise KeyError(f'No waypoint handler registered for {mod_name}') from None
+
+
+    def has_capability(self, mod_name : str, capability : str) -> bool:
+        """
+        Checks whether a mod supports something, without importing its
+        handler.
+        """
+
+        return capability in self.get_spec(mod_name).capabilities
+
+
+    def load_handler_class(self, mod_name : str) -> type['WaypointModHandler']:
+        """
+        Gets the handler class of a mod, importing its module the first
+        time it is needed.
+
+
+        Parameters
+        ----------
+        mod_name : str
+            The name of the mod.
+
+
+        Returns
+        -------
+        type[WaypointModHandler]
+            The handler class of the mod.
+
+
+        Raises
+        ------
+        KeyError
+            If no handler is registered for the mod.
+
+        TypeError
+            If the registered class is not a handler of the mod.
+        """
+
+        if mod_name in self._handler_classes:
+            return self._handler_classes[mod_name]
+
+        # imported here, since this module is imported by the script
+        # before any handler is needed
+        from .waypoint_mod_handler import WaypointModHandler
+
+        module_name, _, class_name = self.get_spec(mod_name).target.partition(':')
+        handler_class = getattr(importlib.import_module(module_name), class_name)
+
+        if not (
+            isinstance(handler_class, type)
+            and issubclass(handler_class, WaypointModHandler)
+        ):
+            raise TypeError(f'{module_name}:{class_name} is not a WaypointModHandler')
+
+        if handler_class.mod_name != mod_name:
+            raise TypeError(
+                f'{module_name}:{class_name} handles {handler_class.mod_name}, '
+                f'not {mod_name}'
+            )
+
+        self._handler_classes[mod_name] = handler_class
+
+        return handler_class
+
+
+    def create_handler(
+            self,
+            mod_name : str,
+            convert_here : bool = False,
+            **options
+        ) -> 'WaypointModHandler':
+        """
+        Imports and creates the handler of a mod.
+
+
+        Parameters
+        ----------
+        mod_name : str
+            The name of the mod.
+
+        convert_here : bool, default=False
+            True,   if the handler should use the predefined directory
+                    `minecraft-waypoint-converter/data/convert-here`
+            False,  otherwise
+
+        **options
+            Options for the handler, see `WaypointModHandler.create`.
+
+
+        Returns
+        -------
+        WaypointModHandler
+            The created handler.
+        """
+
+        return self.load_handler_class(mod_name).create(
+            convert_here=convert_here,
+            **options
+        )
+
+
+
+def _register_builtin_handlers(registry : HandlerRegistry) -> None:
+    """
+    Registers the handlers of the mods supported out of the box.
+    """
+
+    registry.register(
+        mod_name='lunar client',
+        target=f'{__package__}.waypoint_handler_lunar:LunarWaypointHandler',
+        capabilities=(CAPABILITY_SINGLE_FILE,)
+    )
+
+    registry.register(
+        mod_name='xaero\'s minimap',
+        target=f'{__package__}.waypoint_handler_xaeros:XaerosWaypointHandler',
+        capabilities=(CAPABILITY_DIMENSION_FILES,)
+    )
+
+
+
+_shared_registry : HandlerRegistry | None = None
+
+
+def get_handler_registry() -> HandlerRegistry:
+    """
+    Gets the handler registry of this process, with the handlers of the
+    mods supported out of the box already registered.
+
+
+    Returns
+    -------
+    HandlerRegistry
+        The shared handler registry.
+    """
+
+    global _shared_registry
+
+    if _shared_registry is None:
+        _shared_registry = HandlerRegistry()
+        _register_builtin_handlers(_shared_registry)
+
+    return _shared_registry
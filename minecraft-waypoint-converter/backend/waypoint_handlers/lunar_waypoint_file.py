@@ -0,0 +1,940 @@
+"""lunar_waypoint_file.py
+
+Contains a class that reads and writes single worlds in Lunar Client's
+waypoint file, without parsing or serializing the waypoints of every
+other world in the file.
+"""
+
+import errno
+import json
+import mmap
+import os
+import re
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+from .tracing import span, traced
+
+
+from typing import Iterator
+
+
+
+# unrolled, so that the regex engine runs through a string as one
+# character class instead of one alternation per character
+_STRING_PATTERN : bytes = rb'"[^"\\]*+(?:\\.[^"\\]*+)*+"'
+
+# how deeply nested an object or array can be for `_NESTED_VALUE` to
+# skip it, which covers every world in Lunar Client's file
+_NESTED_VALUE_DEPTH : int = 6
+
+
+def _nested_value_pattern(depth : int) -> bytes:
+    """
+    Builds a pattern matching an object or array nested at most `depth`
+    levels deep, so that the regex engine skips a whole world at once.
+    Possessive quantifiers keep it from backtracking.
+    """
+
+    pattern = rb'[{\[](?:[^{}\[\]"]++|' + _STRING_PATTERN + rb')*+[}\]]'
+
+    for _ in range(depth - 1):
+        pattern = (
+            rb'[{\[](?:[^{}\[\]"]++|' + _STRING_PATTERN + rb'|' + pattern
+            + rb')*+[}\]]'
+        )
+
+    return pattern
+
+
+_NESTED_VALUE = re.compile(_nested_value_pattern(_NESTED_VALUE_DEPTH), re.DOTALL)
+
+# a JSON string, or a bracket that opens or closes an object or array,
+# for values nested deeper than `_NESTED_VALUE` can skip
+_TOKEN = re.compile(_STRING_PATTERN + rb'|[{}\[\]]', re.DOTALL)
+_STRING = re.compile(_STRING_PATTERN, re.DOTALL)
+_SCALAR = re.compile(rb'[^,}\]\s]*')
+_WHITESPACE = re.compile(rb'\s*')
+_INDENT = re.compile(rb'[ \t]*')
+
+_UTF8_BOM : bytes = b'\xef\xbb\xbf'
+
+# the bracket that closes each bracket that opens an object or array
+_CLOSING_BRACKETS : dict[bytes, bytes] = {b'{' : b'}', b'[' : b']'}
+
+# how many bytes are copied at once when the file system can not copy
+# between the files itself
+_COPY_CHUNK_SIZE : int = 1024 * 1024
+
+
+
+class LunarWaypointFile:
+    """
+    A class that reads and writes single worlds in Lunar Client's
+    waypoint file.
+
+    The file is scanned once for where the value of each world starts
+    and ends, without parsing its values. A world's waypoints are then
+    parsed from that span of the file alone, so the time and memory a
+    conversion takes scale with the world being converted rather than
+    with every world in the file. The file is memory-mapped while it is
+    read, and scanned again when it is changed on disk.
+
+    In an indented file, such as the one Lunar Client writes, each world
+    starts and ends on a line of its own, so the worlds are found by
+    searching for those lines, which is faster than parsing the file.
+    The span of a world is checked against its brackets before it is
+    used, and the file is scanned from its brackets instead if they do
+    not match. A file written on a single line is always scanned from
+    its brackets, which takes about as long as parsing it, but without
+    holding every world in memory.
+
+    Worlds are written the same way: only the changed worlds are
+    serialized and spliced into their spans, while the rest of the file
+    is copied as it is, by the file system where it can.
+
+
+    Attributes
+    ----------
+    file_path : pathlib.Path
+        The path of the waypoint file.
+    """
+
+    def __init__(self, file_path : Path) -> None:
+        """
+        Initializes a LunarWaypointFile instance. The file is not read
+        until it is needed.
+
+
+        Parameters
+        ----------
+        file_path : pathlib.Path
+            The path of the waypoint file.
+        """
+
+        self.file_path : Path = Path(file_path)
+
+        self._signature : tuple[int, int] | None = None
+        self._world_spans : dict[str, tuple[int, int]] = {}
+
+        # where the object holding the worlds starts, and the indent of
+        # the file, None if it is written on a single line
+        self._waypoints_start : int = 0
+        self._indent : str | None = None
+
+        # whether the spans were found from the layout of the file, and
+        # are checked against the brackets of a world before it is used
+        self._scanned_by_layout : bool = False
+
+
+
+    ####################################################################
+    #####                      Reading Worlds                      #####
+    ####################################################################
+
+    @property
+    def signature(self) -> tuple[int, int] | None:
+        """
+        The modification time and size of the file when it was last
+        scanned, None if it was not scanned yet.
+        """
+
+        return self._signature
+
+
+    def get_world_keys(self) -> list[str]:
+        """
+        Gets the keys of the worlds in the file, such as `sp:worldName`,
+        in the order they are in the file, without parsing their
+        waypoints.
+
+
+        Raises
+        ------
+        FileNotFoundError
+            If the file does not exist.
+        """
+
+        self.refresh()
+
+        return list(self._world_spans)
+
+
+    def has_world(self, world_key : str) -> bool:
+        """
+        Checks whether the file has waypoints for a world.
+        """
+
+        self.refresh()
+
+        return world_key in self._world_spans
+
+
+    @traced
+    def read_world_waypoints(self, world_key : str) -> dict:
+        """
+        Parses the waypoints of a single world.
+
+
+        Parameters
+        ----------
+        world_key : str
+            The key of the world, such as `sp:worldName`.
+
+
+        Returns
+        -------
+        dict
+            The world's waypoints, keyed by waypoint name.
+
+
+        Raises
+        ------
+        KeyError
+            If the file has no waypoints for the world.
+        """
+
+        self.refresh()
+
+        with self._map_file() as buffer:
+
+            # the waypoints of a world are held under the "" key of the
+            # world's object, which is the only part parsed
+            members, _, _ = self._scan_world(buffer, world_key)
+
+            if '' not in members:
+                return {}
+
+            waypoints_start, waypoints_end = members['']
+
+            return json.loads(buffer[waypoints_start:waypoints_end])
+
+
+    def refresh(self) -> None:
+        """
+        Scans the file again if it was changed on disk since it was
+        last scanned.
+
+
+        Raises
+        ------
+        FileNotFoundError
+            If the file does not exist.
+
+        ValueError
+            If the file is not a Lunar Client waypoint file.
+        """
+
+        file_stat = os.stat(self.file_path)
+        signature = (file_stat.st_mtime_ns, file_stat.st_size)
+
+        if signature == self._signature:
+            return
+
+        with (
+            span('LunarWaypointFile.scan', size=file_stat.st_size),
+            self._map_file() as buffer
+        ):
+            self._scan(buffer, by_layout=True)
+
+        self._signature = signature
+
+
+    def _scan(self, buffer : bytes | mmap.mmap, by_layout : bool) -> None:
+        """
+        Finds where the value of each world starts and ends. If
+        `by_layout`, the worlds of an indented file are found from the
+        lines they start and end on, and otherwise from the brackets of
+        the file.
+
+
+        Raises
+        ------
+        ValueError
+            If the file is not a Lunar Client waypoint file.
+        """
+
+        indent = _detect_indent(buffer)
+        start = _skip_whitespace(buffer, 0)
+        layout_scan = None
+
+        if by_layout and indent:
+            layout_scan = _scan_worlds_by_layout(buffer, start, indent)
+
+        if layout_scan is not None:
+            world_spans, waypoints_start = layout_scan
+
+        else:
+            members, _ = _scan_object(buffer, start)
+
+            if 'waypoints' not in members:
+                raise ValueError(f'{self.file_path} has no waypoints')
+
+            waypoints_start = members['waypoints'][0]
+            world_spans, _ = _scan_object(buffer, waypoints_start)
+
+        self._world_spans = world_spans
+        self._waypoints_start = waypoints_start
+        self._indent = indent
+        self._scanned_by_layout = layout_scan is not None
+
+
+    def _scan_world(
+            self,
+            buffer : bytes | mmap.mmap,
+            world_key : str
+        ) -> tuple[dict[str, tuple[int, int]], int, int]:
+        """
+        Finds where the value of each member of a world's object starts
+        and ends. If the world's span was found from the layout of the
+        file and does not hold exactly the world's object, the file is
+        scanned again from its brackets.
+
+
+        Returns
+        -------
+        tuple[dict[str, tuple[int, int]], int, int]
+            The start and end of each member's value, by key, and the
+            start and end of the world's value.
+
+
+        Raises
+        ------
+        KeyError
+            If the file has no waypoints for the world.
+
+        ValueError
+            If the world's value is not an object.
+        """
+
+        start, end = self._world_spans[world_key]
+
+        try:
+            members, world_end = _scan_object(buffer, start)
+
+        except ValueError:
+            if not self._scanned_by_layout:
+                raise
+
+            world_end = None
+
+        if world_end != end and self._scanned_by_layout:
+            self._scan(buffer, by_layout=False)
+
+            start, end = self._world_spans[world_key]
+            members, _ = _scan_object(buffer, start)
+
+        return members, start, end
+
+
+
+
+    ####################################################################
+    #####                      Writing Worlds                      #####
+    ####################################################################
+
+    @traced
+    def write_worlds(
+            self,
+            world_waypoints : dict[str, dict],
+            output_path : Path | None = None
+        ) -> None:
+        """
+        Writes the waypoints of some worlds, replacing their waypoints
+        in the file, or adding the worlds after the last world in the
+        file. Every other byte of the file is copied as it is.
+
+        The file is written through a temporary file renamed over it, so
+        a partially written file is never left behind.
+
+
+        Parameters
+        ----------
+        world_waypoints : dict[str, dict]
+            The waypoints of each world, keyed by world key and then by
+            waypoint name.
+
+        output_path : pathlib.Path, optional
+            The file to write to, if not the file read from.
+
+
+        Raises
+        ------
+        OSError
+            If the file could not be written.
+
+        ValueError
+            If the file is not a Lunar Client waypoint file.
+        """
+
+        self.refresh()
+
+        output_path = Path(output_path or self.file_path)
+
+        # named uniquely, since handlers in the same process can write
+        # the same file
+        temp_path = output_path.with_name(
+            f'{output_path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp'
+        )
+
+        with self._map_file() as buffer:
+            edits, new_worlds = self._get_edits(buffer, world_waypoints)
+
+        try:
+            with (
+                open(self.file_path, 'rb') as source,
+                open(temp_path, 'wb', buffering=0) as destination
+            ):
+                # kept unbuffered, so that what is written and what the
+                # file system copies end up in order
+                position = 0
+
+                for start, end, data in edits:
+                    _copy_range(source, destination, position, start)
+                    _write_all(destination, data)
+                    position = end
+
+                _copy_range(
+                    source, destination,
+                    position, os.fstat(source.fileno()).st_size
+                )
+
+            os.replace(temp_path, output_path)
+
+        except OSError:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+        # the spans are moved by the lengths of the edits, instead of
+        # scanning the written file again
+        if output_path.resolve() == self.file_path.resolve():
+            self._apply_edits(edits, new_worlds)
+
+
+    def _get_edits(
+            self,
+            buffer : bytes | mmap.mmap,
+            world_waypoints : dict[str, dict]
+        ) -> tuple[list[tuple[int, int, bytes]], dict[str, tuple[int, int]]]:
+        """
+        Gets the spans of the file to replace, and what to replace them
+        with, to write the waypoints of some worlds.
+
+
+        Returns
+        -------
+        tuple[list[tuple[int, int, bytes]], dict[str, tuple[int, int]]]
+            The start and end of each span to replace, with the bytes
+            that replace it, in the order of the file. And, for worlds
+            that are not in the file yet, where their value is in the
+            bytes added after the last world.
+        """
+
+        edits = []
+        new_members = []
+
+        for world_key, waypoints in world_waypoints.items():
+
+            if world_key not in self._world_spans:
+                new_members.append((world_key, waypoints))
+                continue
+
+            members, world_start, world_end = self._scan_world(buffer, world_key)
+
+            # only the waypoints are replaced, keeping anything else the
+            # world holds as it is written
+            if '' in members:
+                start, end = members['']
+                edits.append((start, end, self._dump(
+                    waypoints, _line_indent(buffer, start)
+                )))
+
+            else:
+                world = json.loads(buffer[world_start:world_end])
+                world[''] = waypoints
+                edits.append((world_start, world_end, self._dump(
+                    world, _line_indent(buffer, world_start)
+                )))
+
+        new_worlds = {}
+
+        if new_members:
+            insert_edit, new_worlds = self._get_insert_edit(buffer, new_members)
+            edits.append(insert_edit)
+
+        edits.sort(key=lambda edit : edit[0])
+
+        return edits, new_worlds
+
+
+    def _get_insert_edit(
+            self,
+            buffer : bytes | mmap.mmap,
+            new_members : list[tuple[str, dict]]
+        ) -> tuple[tuple[int, int, bytes], dict[str, tuple[int, int]]]:
+        """
+        Gets the bytes that add new worlds after the last world in the
+        file, and where the value of each new world is in those bytes.
+        """
+
+        if self._world_spans:
+            _, last_start, position = self._scan_world(
+                buffer, next(reversed(self._world_spans))
+            )
+            member_indent = _line_indent(buffer, last_start)
+            opening = closing = ''
+            separator = ','
+
+        # the first worlds go inside the empty object
+        else:
+            position = self._waypoints_start + 1
+            outer_indent = _line_indent(buffer, self._waypoints_start)
+            member_indent = outer_indent + (self._indent or '')
+            opening = separator = ''
+            closing = '' if self._indent is None else f'\n{outer_indent}'
+
+        if self._indent is not None:
+            separator += f'\n{member_indent}'
+            key_separator = ': '
+
+        else:
+            key_separator = ':'
+
+        parts = [opening.encode('utf-8')]
+        offset = len(parts[0])
+        new_worlds = {}
+
+        for world_key, waypoints in new_members:
+
+            prefix = (
+                separator
+                + json.dumps(world_key, ensure_ascii=False)
+                + key_separator
+            ).encode('utf-8')
+            value = self._dump({'' : waypoints}, member_indent)
+
+            new_worlds[world_key] = (
+                offset + len(prefix),
+                offset + len(prefix) + len(value)
+            )
+            parts.extend((prefix, value))
+            offset += len(prefix) + len(value)
+
+            # every world after the first is separated from the last
+            separator = ',' + separator.lstrip(',')
+
+        parts.append(closing.encode('utf-8'))
+
+        return (position, position, b''.join(parts)), new_worlds
+
+
+    def _apply_edits(
+            self,
+            edits : list[tuple[int, int, bytes]],
+            new_worlds : dict[str, tuple[int, int]]
+        ) -> None:
+        """
+        Moves the spans of the worlds by the edits written to the file,
+        and adds the spans of the new worlds.
+        """
+
+        def move(position : int) -> int:
+
+            # edits that end before a position move it by how much they
+            # changed the length of the file, edits that only insert at
+            # the end of a world come after it
+            return position + sum(
+                len(data) - (end - start)
+                for start, end, data in edits
+                if start < position and end <= position
+            )
+
+        self._world_spans = {
+            world_key : (move(start), move(end))
+            for world_key, (start, end) in self._world_spans.items()
+        }
+
+        for start, end, data in edits:
+            if start == end and new_worlds:
+                inserted_at = move(start)
+
+                for world_key, (value_start, value_end) in new_worlds.items():
+                    self._world_spans[world_key] = (
+                        inserted_at + value_start,
+                        inserted_at + value_end
+                    )
+
+        file_stat = os.stat(self.file_path)
+        self._signature = (file_stat.st_mtime_ns, file_stat.st_size)
+
+
+    def _dump(self, value : dict, line_indent : str) -> bytes:
+        """
+        Serializes a value to be written in the file, in the same layout
+        as the rest of the file, starting on a line indented by
+        `line_indent`.
+        """
+
+        if self._indent is None:
+            return json.dumps(
+                value, ensure_ascii=False, separators=(',', ':')
+            ).encode('utf-8')
+
+        # strings never hold a raw line break, so each one starts a line
+        return json.dumps(
+            value, ensure_ascii=False, indent=self._indent
+        ).replace('\n', f'\n{line_indent}').encode('utf-8')
+
+
+    @contextmanager
+    def _map_file(self) -> Iterator[bytes | mmap.mmap]:
+        """
+        Maps the file into memory for as long as it is read. The map is
+        closed afterwards, since on Windows a mapped file can not be
+        replaced.
+        """
+
+        with open(self.file_path, 'rb') as f:
+
+            # an empty file can not be mapped
+            if os.fstat(f.fileno()).st_size == 0:
+                yield b''
+                return
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                yield buffer
+
+
+
+########################################################################
+#####                         JSON Scanning                        #####
+########################################################################
+
+def _skip_whitespace(buffer : bytes | mmap.mmap, position : int) -> int:
+    """
+    Gets the position of the first character at or after `position`
+    that is not whitespace, skipping a byte order mark at the start.
+    """
+
+    if position == 0 and buffer[:3] == _UTF8_BOM:
+        position = 3
+
+    return _WHITESPACE.match(buffer, position).end()
+
+
+def _detect_indent(buffer : bytes | mmap.mmap) -> str | None:
+    """
+    Gets the indent of one level of the file, from its second line.
+    None if the file is written on a single line.
+    """
+
+    line_break = buffer.find(b'\n')
+
+    if line_break < 0:
+        return None
+
+    return _INDENT.match(buffer, line_break + 1).group().decode('utf-8')
+
+
+def _line_indent(buffer : bytes | mmap.mmap, position : int) -> str:
+    """
+    Gets the indent of the line `position` is on.
+    """
+
+    line_start = buffer.rfind(b'\n', 0, position) + 1
+
+    return _INDENT.match(buffer, line_start).group().decode('utf-8')
+
+
+def _skip_value(buffer : bytes | mmap.mmap, position : int) -> int:
+    """
+    Gets the position right after the JSON value that starts at
+    `position`, without parsing it.
+    """
+
+    first = buffer[position:position + 1]
+
+    if first == b'"':
+        return _STRING.match(buffer, position).end()
+
+    if first not in (b'{', b'['):
+        return _SCALAR.match(buffer, position).end()
+
+    nested_match = _NESTED_VALUE.match(buffer, position)
+
+    if nested_match is not None:
+        return nested_match.end()
+
+    depth = 0
+
+    for token in _TOKEN.finditer(buffer, position):
+
+        bracket = token.group()
+
+        if bracket in (b'{', b'['):
+            depth += 1
+
+        elif bracket in (b'}', b']'):
+            depth -= 1
+
+            if depth == 0:
+                return token.end()
+
+    raise ValueError(f'Unterminated JSON value at byte {position}')
+
+
+def _scan_object(
+        buffer : bytes | mmap.mmap,
+        position : int
+    ) -> tuple[dict[str, tuple[int, int]], int]:
+    """
+    Finds where the value of each member of the JSON object that starts
+    at `position` starts and ends, without parsing the values.
+
+
+    Returns
+    -------
+    tuple[dict[str, tuple[int, int]], int]
+        The start and end of each member's value, by key, and the
+        position right after the object.
+    """
+
+    if buffer[position:position + 1] != b'{':
+        raise ValueError(f'Expected a JSON object at byte {position}')
+
+    members = {}
+    position = _skip_whitespace(buffer, position + 1)
+
+    if buffer[position:position + 1] == b'}':
+        return members, position + 1
+
+    while True:
+
+        key_match = _STRING.match(buffer, position)
+
+        if key_match is None:
+            raise ValueError(f'Expected a key at byte {position}')
+
+        key = json.loads(key_match.group())
+        position = _skip_whitespace(buffer, key_match.end())
+
+        if buffer[position:position + 1] != b':':
+            raise ValueError(f'Expected ":" at byte {position}')
+
+        value_start = _skip_whitespace(buffer, position + 1)
+        value_end = _skip_value(buffer, value_start)
+        members[key] = (value_start, value_end)
+
+        position = _skip_whitespace(buffer, value_end)
+        separator = buffer[position:position + 1]
+
+        if separator == b'}':
+            return members, position + 1
+
+        if separator != b',':
+            raise ValueError(f'Expected "," or "}}" at byte {position}')
+
+        position = _skip_whitespace(buffer, position + 1)
+
+
+def _scan_object_by_layout(
+        buffer : bytes | mmap.mmap,
+        position : int,
+        indent : str,
+        until_key : str | None = None
+    ) -> tuple[dict[str, tuple[int, int]], int] | None:
+    """
+    Finds where the value of each member of the JSON object that starts
+    at `position` starts and ends, like `_scan_object`, but from the
+    layout of an indented file rather than from its brackets: each
+    member starts a line indented one level more than the object, and a
+    value that spans lines ends on the next line indented that much.
+    Those lines are found by searching for them, so the values that span
+    lines are never read.
+
+
+    Parameters
+    ----------
+    until_key : str, optional
+        If given, the scan stops at the member with this key, which is
+        left out of the members.
+
+
+    Returns
+    -------
+    tuple[dict[str, tuple[int, int]], int] | None
+        The start and end of each member's value, by key, and the
+        position right after the object, or where the value of
+        `until_key` starts. None, if the object is not laid out that
+        way, or has no `until_key` member.
+    """
+
+    if buffer[position:position + 1] != b'{':
+        return None
+
+    member_prefix = ('\n' + _line_indent(buffer, position) + indent).encode('utf-8')
+    member_line = re.compile(re.escape(member_prefix) + rb'(?=[^ \t])')
+
+    members = {}
+    position = _skip_whitespace(buffer, position + 1)
+
+    if buffer[position:position + 1] == b'}':
+        return members, position + 1
+
+    while True:
+
+        if buffer[position - len(member_prefix):position] != member_prefix:
+            return None
+
+        key_match = _STRING.match(buffer, position)
+
+        if key_match is None:
+            return None
+
+        key = json.loads(key_match.group())
+        position = _skip_whitespace(buffer, key_match.end())
+
+        if buffer[position:position + 1] != b':':
+            return None
+
+        value_start = _skip_whitespace(buffer, position + 1)
+
+        if key == until_key:
+            return members, value_start
+
+        opening = buffer[value_start:value_start + 1]
+
+        # values that fit on their line are short, so they are skipped
+        # by their brackets
+        if (
+            opening not in _CLOSING_BRACKETS
+            or buffer[value_start + 1:value_start + 2] not in (b'\n', b'\r')
+        ):
+            value_end = _skip_value(buffer, value_start)
+
+        else:
+            closing_line = member_line.search(buffer, value_start)
+
+            if closing_line is None:
+                return None
+
+            closing = closing_line.end()
+
+            if buffer[closing:closing + 1] != _CLOSING_BRACKETS[opening]:
+                return None
+
+            value_end = closing + 1
+
+        members[key] = (value_start, value_end)
+
+        position = _skip_whitespace(buffer, value_end)
+        separator = buffer[position:position + 1]
+
+        if separator == b'}':
+            return (members, position + 1) if until_key is None else None
+
+        if separator != b',':
+            return None
+
+        position = _skip_whitespace(buffer, position + 1)
+
+
+def _scan_worlds_by_layout(
+        buffer : bytes | mmap.mmap,
+        position : int,
+        indent : str
+    ) -> tuple[dict[str, tuple[int, int]], int] | None:
+    """
+    Finds where the value of each world starts and ends from the layout
+    of an indented file, with `_scan_object_by_layout`.
+
+
+    Returns
+    -------
+    tuple[dict[str, tuple[int, int]], int] | None
+        The start and end of each world's value, by world key, and where
+        the object holding the worlds starts. None, if the file is not
+        laid out as expected.
+    """
+
+    # the members of the file before the worlds are short, and the end
+    # of the worlds is found by scanning them, so the file is only
+    # scanned up to where the worlds start
+    file_scan = _scan_object_by_layout(
+        buffer, position, indent, until_key='waypoints'
+    )
+
+    if file_scan is None:
+        return None
+
+    waypoints_start = file_scan[1]
+    waypoints_scan = _scan_object_by_layout(buffer, waypoints_start, indent)
+
+    if waypoints_scan is None:
+        return None
+
+    world_spans, waypoints_end = waypoints_scan
+
+    # the worlds must be followed by the next member of the file, or by
+    # its end
+    separator_start = _skip_whitespace(buffer, waypoints_end)
+
+    if buffer[separator_start:separator_start + 1] not in (b',', b'}'):
+        return None
+
+    return world_spans, waypoints_start
+
+
+def _copy_range(source, destination, start : int, end : int) -> None:
+    """
+    Copies the bytes of `source` from `start` to `end` to the end of
+    `destination`. The file system copies them itself where it can, so
+    they are never read into memory.
+    """
+
+    if end <= start:
+        return
+
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while start < end:
+                copied = os.copy_file_range(
+                    source.fileno(), destination.fileno(), end - start, start
+                )
+
+                if copied == 0:
+                    raise OSError(f'{source.name} ended before byte {end}')
+
+                start += copied
+
+            return
+
+        # copying between some file systems, or on older kernels, is
+        # not supported, so the rest is copied through memory instead
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EOPNOTSUPP, errno.EINVAL):
+                raise
+
+    source.seek(start)
+
+    while start < end:
+        chunk = source.read(min(_COPY_CHUNK_SIZE, end - start))
+
+        if not chunk:
+            raise OSError(f'{source.name} ended before byte {end}')
+
+        _write_all(destination, chunk)
+        start += len(chunk)
+
+
+def _write_all(destination, data : bytes) -> None:
+    """
+    Writes all of `data` to an unbuffered file, which may write only
+    part of it at once.
+    """
+
+    data = memoryview(data)
+
+    while data:
+        data = data[destination.write(data):]
@@ -0,0 +1,19 @@
+"""near_duplicate_policies.py
+
+Contains the choices of the near duplicate filter, kept apart from
+`near_duplicates` so that the command line can offer them without
+importing the filter and the waypoint table it works on.
+"""
+
+
+# what is done with a waypoint that is near another:
+# skip      - the waypoint is not added
+# merge     - the converted waypoints near each other are combined into
+#             the first, placed where they are on average; a waypoint
+#             near one the world already has is not added, as the
+#             world's waypoint is kept as it is
+# report    - the waypoint is added, and reported
+NEAR_DUPLICATE_POLICIES : tuple[str, str, str] = ('skip', 'merge', 'report')
+
+# how close two waypoints are for them to be near duplicates, in blocks
+DEFAULT_NEAR_DUPLICATE_RADIUS : float = 2.0
@@ -0,0 +1,278 @@
+"""near_duplicates.py
+
+Contains a spatial hash grid over waypoint coordinates, and a filter
+that uses it to find waypoints converted into a mod that are almost at
+the same place as another waypoint, but under a different name.
+"""
+
+from dataclasses import dataclass
+from math import floor
+
+from .near_duplicate_policies import (
+    DEFAULT_NEAR_DUPLICATE_RADIUS,
+    NEAR_DUPLICATE_POLICIES
+)
+from .reporting import NearDuplicateFound, get_reporter
+from .tracing import traced
+from .waypoint_merge import normalize_waypoint_name
+from .waypoint_table import WaypointTable
+
+
+
+class SpatialHashGrid:
+    """
+    A class that indexes points of each dimension by the grid cell they
+    are in, to find the points near a position without comparing it to
+    every point.
+
+    Cells are squares over the x and z coordinates, twice as wide as the
+    search radius, so every point within the radius of a position is in
+    one of the 4 cells that the square around the position, as wide as
+    the search diameter, overlaps. The y coordinate is
+    only used for the distance, since waypoints spread out far more
+    horizontally than vertically.
+    """
+
+    __slots__ = ('radius', '_radius_squared', '_cell_size', '_cells')
+
+
+    def __init__(self, radius : float) -> None:
+        """
+        Initializes an empty SpatialHashGrid instance.
+
+
+        Parameters
+        ----------
+        radius : float
+            The distance within which points are found.
+        """
+
+        if radius <= 0:
+            raise ValueError(f'Radius must be positive, not {radius}')
+
+        self.radius : float = radius
+        self._radius_squared : float = radius * radius
+        self._cell_size : float = radius * 2
+        self._cells : dict[tuple[str, int, int], list[tuple]] = {}
+
+
+    def add(
+            self,
+            dimension : str,
+            x : float,
+            y : float,
+            z : float,
+            key : str,
+            value : int
+        ) -> None:
+        """
+        Adds a point to the grid.
+
+
+        Parameters
+        ----------
+        dimension : str
+            The dimension the point is in.
+
+        x, y, z : float
+            The coordinates of the point.
+
+        key : str
+            The key of the point, points with the same key are not found
+            by `find_nearest`.
+
+        value : int
+            What is returned when the point is found.
+        """
+
+        cell = (dimension, floor(x / self._cell_size), floor(z / self._cell_size))
+
+        self._cells.setdefault(cell, []).append((x, y, z, key, value))
+
+
+    def find_nearest(
+            self,
+            dimension : str,
+            x : float,
+            y : float,
+            z : float,
+            key : str
+        ) -> int | None:
+        """
+        Finds the point nearest to a position, within the radius.
+
+
+        Parameters
+        ----------
+        dimension : str
+            The dimension to search in.
+
+        x, y, z : float
+            The position to search around.
+
+        key : str
+            The key of the point being searched for, points with the
+            same key are passed over.
+
+
+        Returns
+        -------
+        int
+            The value of the nearest point,
+            None if no point is within the radius.
+        """
+
+        # the cells the corner of the square around the position nearest
+        # the origin is in, and the cells after it
+        cell_x = floor((x - self.radius) / self._cell_size)
+        cell_z = floor((z - self.radius) / self._cell_size)
+        cells = self._cells
+
+        nearest = None
+        nearest_distance = self._radius_squared
+
+        for neighbor_x in (cell_x, cell_x + 1):
+            for neighbor_z in (cell_z, cell_z + 1):
+
+                points = cells.get((dimension, neighbor_x, neighbor_z))
+
+                if points is None:
+                    continue
+
+                for point_x, point_y, point_z, point_key, value in points:
+
+                    dx = point_x - x
+                    dy = point_y - y
+                    dz = point_z - z
+                    distance = dx * dx + dy * dy + dz * dz
+
+                    if distance <= nearest_distance and point_key != key:
+                        nearest = value
+                        nearest_distance = distance
+
+        return nearest
+
+
+
+@dataclass(frozen=True, slots=True)
+class NearDuplicateFilter:
+    """
+    Applies a policy to the waypoints being converted into a mod that
+    are within a radius of another waypoint of the same dimension, but
+    under a different name, like "Base" and "base 2" left behind by
+    repeated conversions. Waypoints with the same name are left to the
+    mod handlers, which already skip them.
+
+    The waypoints the world already has are never changed, since the
+    handlers only add waypoints to a world. Under `merge`, a converted
+    waypoint near one of them is therefore left out, as under `skip`,
+    and only converted waypoints near each other are combined.
+
+
+    Attributes
+    ----------
+    policy : str
+        What is done with near duplicates, one of
+        `NEAR_DUPLICATE_POLICIES`.
+
+    radius : float
+        How close two waypoints are for them to be near duplicates, in
+        blocks.
+    """
+
+    policy : str
+    radius : float = DEFAULT_NEAR_DUPLICATE_RADIUS
+
+
+    def __post_init__(self) -> None:
+
+        if self.policy not in NEAR_DUPLICATE_POLICIES:
+            raise ValueError(
+                f'Unknown near duplicate policy {self.policy}, '
+                f'expected one of: {', '.join(NEAR_DUPLICATE_POLICIES)}'
+            )
+
+        if self.radius <= 0:
+            raise ValueError(f'Radius must be positive, not {self.radius}')
+
+
+    @traced
+    def apply(
+            self,
+            waypoints : WaypointTable,
+            existing_waypoints : WaypointTable | None = None
+        ) -> WaypointTable:
+        """
+        Applies the policy to waypoints being added to a world. Each
+        waypoint is compared to the waypoints the world already has and
+        to the waypoints before it, so that it takes a single pass.
+
+
+        Parameters
+        ----------
+        waypoints : WaypointTable
+            The waypoints being added.
+
+        existing_waypoints : WaypointTable, optional
+            The waypoints the world already has, which are kept as is.
+
+
+        Returns
+        -------
+        WaypointTable
+            The waypoints to add, after applying the policy.
+        """
+
+        existing_table = existing_waypoints if existing_waypoints is not None \
+            else WaypointTable()
+
+        grid = SpatialHashGrid(self.radius)
+
+        # existing waypoints are found as negative values, the waypoints
+        # kept so far as their index in the kept table
+        for index, (name, dimension, x, y, z, *_) in enumerate(existing_table.rows()):
+            grid.add(dimension, x, y, z, normalize_waypoint_name(name), -1 - index)
+
+        kept = WaypointTable()
+
+        # the waypoints combined into each kept waypoint, for merging
+        merged_rows : dict[int, list[tuple]] = {}
+
+        reporter = get_reporter()
+
+        for row in waypoints.rows():
+
+            name, dimension, x, y, z = row[:5]
+            key = normalize_waypoint_name(name)
+
+            nearest = grid.find_nearest(dimension, x, y, z, key)
+
+            if nearest is not None:
+
+                nearest_name = existing_table.names[-1 - nearest] if nearest < 0 \
+                    else kept.names[nearest]
+
+                reporter.emit(NearDuplicateFound(self.policy, name, nearest_name))
+
+                match self.policy:
+
+                    case 'skip':
+                        continue
+
+                    case 'merge':
+                        # the waypoints of the world are kept as is
+                        if nearest >= 0:
+                            merged_rows.setdefault(nearest, []).append(row)
+
+                        continue
+
+            grid.add(dimension, x, y, z, key, len(kept))
+            kept.append(*row)
+
+        for index, rows in merged_rows.items():
+            count = len(rows) + 1
+            kept.x[index] = (kept.x[index] + sum(row[2] for row in rows)) / count
+            kept.y[index] = (kept.y[index] + sum(row[3] for row in rows)) / count
+            kept.z[index] = (kept.z[index] + sum(row[4] for row in rows)) / count
+
+        return kept
@@ -0,0 +1,90 @@
+"""qt_reporter.py
+
+Contains a reporter that passes the events of a conversion to a Qt
+interface through signals. Kept apart from `reporting`, so that only the
+GUI needs PyQt6.
+"""
+
+import time
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from .reporting import DEFAULT_RENDER_INTERVAL, ReportEvent, Reporter
+
+
+from typing import override
+
+
+
+class QtReporterSignals(QObject):
+    """
+    The signals of a `QtSignalReporter`. A conversion run on another
+    thread than the interface can connect them to slots of the
+    interface, which Qt then calls on the interface's thread.
+
+
+    Attributes
+    ----------
+    events_reported : pyqtSignal(list)
+        Emitted with the events reported since it was last emitted.
+
+    counters_changed : pyqtSignal(dict)
+        Emitted with the totals of every counter, along with
+        `events_reported`.
+    """
+
+    events_reported = pyqtSignal(list)
+    counters_changed = pyqtSignal(dict)
+
+
+
+class QtSignalReporter(Reporter):
+    """
+    Passes events to a Qt interface through the signals of `signals`.
+    Events are emitted in batches, at most once per `render_interval`
+    seconds and when flushed, so that a large conversion does not flood
+    the interface's event loop.
+    """
+
+    def __init__(self, render_interval : float = DEFAULT_RENDER_INTERVAL) -> None:
+        """
+        Initializes a QtSignalReporter instance.
+
+
+        Parameters
+        ----------
+        render_interval : float, default=DEFAULT_RENDER_INTERVAL
+            The least number of seconds between two batches, other than
+            those emitted when flushed.
+        """
+
+        super().__init__()
+
+        self.signals : QtReporterSignals = QtReporterSignals()
+        self.render_interval : float = render_interval
+
+        self._events : list[ReportEvent] = []
+        self._last_render : float = time.monotonic()
+
+
+    @override
+    def _handle(self, event : ReportEvent) -> None:
+
+        self._events.append(event)
+
+        now = time.monotonic()
+
+        if event.urgent or now - self._last_render >= self.render_interval:
+            self.flush()
+
+
+    @override
+    def flush(self) -> None:
+
+        with self._lock:
+            events, self._events = self._events, []
+            self._last_render = time.monotonic()
+            counters = dict(self.counters)
+
+        self.signals.events_reported.emit(events)
+        self.signals.counters_changed.emit(counters)
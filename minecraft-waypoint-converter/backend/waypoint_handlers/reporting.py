@@ -0,0 +1,548 @@
+"""reporting.py
+
+Contains the events the handlers report while converting, and the
+reporters that count them and show them to the user, as console
+messages, as JSON lines, or not at all.
+"""
+
+import json
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from dataclasses import asdict, dataclass
+
+from lunapyutils import print_script_message
+
+
+from typing import ClassVar, Iterable, TextIO, override
+
+
+
+# the reporters the command line can choose between, see `create_reporter`
+REPORTER_KINDS : tuple[str, str, str] = ('console', 'ndjson', 'null')
+
+DEFAULT_REPORTER_KIND : str = 'console'
+
+# how often a long conversion shows its progress, in seconds
+DEFAULT_RENDER_INTERVAL : float = 1.0
+
+# how many events of a kind are described one by one before the console
+# only shows how many there were
+DEFAULT_DETAIL_LIMIT : int = 10
+
+
+
+########################################################################
+#####                            Events                            #####
+########################################################################
+
+@dataclass(frozen=True, slots=True)
+class ReportEvent:
+    """
+    Something that happened during a conversion, that the user may want
+    to know about.
+
+
+    Attributes
+    ----------
+    kind : str
+        The name of the event in JSON output.
+    """
+
+    kind : ClassVar[str] = 'event'
+
+    # whether the console shows the event as soon as it happens, rather
+    # than counting it
+    urgent : ClassVar[bool] = False
+
+
+    def counter_key(self) -> str:
+        """
+        Gets the counter the event is counted in.
+        """
+
+        return self.kind
+
+
+    def describe(self) -> str:
+        """
+        Gets the message the console shows for the event.
+        """
+
+        return self.kind
+
+
+    def to_dict(self) -> dict:
+        """
+        Gets the event as a JSON serializable dict.
+        """
+
+        return {'event' : self.kind, **asdict(self)}
+
+
+
+@dataclass(frozen=True, slots=True)
+class DuplicateSkipped(ReportEvent):
+    """
+    A waypoint was not added, since a waypoint with its name already
+    exists in the world.
+    """
+
+    kind : ClassVar[str] = 'duplicate_skipped'
+
+    mod_name : str
+    waypoint_name : str
+
+
+    @override
+    def describe(self) -> str:
+        return f'Waypoint with name "{self.waypoint_name}" already exists, skipping...'
+
+
+
+@dataclass(frozen=True, slots=True)
+class NearDuplicateFound(ReportEvent):
+    """
+    A waypoint is near another waypoint, and was skipped, merged, or
+    only reported, depending on the policy.
+    """
+
+    kind : ClassVar[str] = 'near_duplicate'
+
+    policy : str
+    waypoint_name : str
+    near_waypoint_name : str
+
+
+    @override
+    def counter_key(self) -> str:
+        return f'near_duplicate_{self.policy}'
+
+
+    @override
+    def describe(self) -> str:
+
+        action = {'skip' : ', skipping...', 'merge' : ', merging...'}.get(self.policy, '')
+
+        return f'Waypoint "{self.waypoint_name}" is near "{self.near_waypoint_name}"{action}'
+
+
+
+@dataclass(frozen=True, slots=True)
+class WaypointsWritten(ReportEvent):
+    """
+    A waypoint file was written, or failed to be written. `dimension`
+    is None for mods that store every dimension in the same file.
+    """
+
+    kind : ClassVar[str] = 'waypoints_written'
+
+    mod_name : str
+    dimension : str | None
+    successful : bool
+
+
+    @property
+    def urgent(self) -> bool:
+        return not self.successful
+
+
+    @override
+    def counter_key(self) -> str:
+        return 'waypoints_written' if self.successful else 'write_failed'
+
+
+    @override
+    def describe(self) -> str:
+
+        waypoints = f'{self.dimension.title()} waypoints' \
+            if self.dimension is not None else 'waypoints'
+
+        if self.successful:
+            return f'{waypoints[0].upper()}{waypoints[1:]} written.'
+
+        return f'Failure writing {waypoints}.'
+
+
+
+@dataclass(frozen=True, slots=True)
+class UnreadableWaypointLine(ReportEvent):
+    """
+    A waypoint line of a mod's file could not be parsed. It is not
+    converted, but is kept in the file as it is.
+    """
+
+    kind : ClassVar[str] = 'unreadable_line'
+
+    file_path : str
+    line : str
+
+
+    @override
+    def describe(self) -> str:
+        return f'Could not read waypoint line, keeping it unchanged: {self.line}'
+
+
+# how the console sums up the events of a counter, when there are too
+# many to describe one by one
+_COUNTER_SUMMARIES : dict[str, str] = {
+    'duplicate_skipped' : 'Skipped {count:,} waypoints whose names already exist.',
+    'near_duplicate_skip' : 'Skipped {count:,} waypoints near another waypoint.',
+    'near_duplicate_merge' : 'Merged {count:,} waypoints into a waypoint near them.',
+    'near_duplicate_report' : 'Found {count:,} waypoints near another waypoint.',
+    'waypoints_written' : 'Wrote {count:,} waypoint files.',
+    'write_failed' : 'Failed to write {count:,} waypoint files.',
+    'unreadable_line' : 'Could not read {count:,} waypoint lines, kept them unchanged.',
+}
+
+
+
+########################################################################
+#####                           Reporters                          #####
+########################################################################
+
+class Reporter(ABC):
+    """
+    A class that the handlers report events to while converting. Every
+    event is counted, and subclasses choose how the events are shown.
+
+    Events are reported from the hot loops of a conversion, so showing
+    them should be batched, with the batch shown when `flush` is called
+    at the end of each conversion. `close` is called once, at the end of
+    the run.
+
+    Events can be reported from several threads at once, such as the
+    I/O threads of the Xaero's Minimap handler, so they are counted and
+    shown while holding `_lock`, which subclasses also hold while
+    showing the events they held on to.
+
+
+    Attributes
+    ----------
+    counters : collections.Counter
+        How many events were reported of each counter key, since the
+        reporter was created.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes a Reporter instance with every counter at zero.
+        """
+
+        self.counters : Counter = Counter()
+
+        # reentrant, since showing an event can flush the others
+        self._lock : threading.RLock = threading.RLock()
+
+
+    def emit(self, event : ReportEvent) -> None:
+        """
+        Reports an event.
+        """
+
+        with self._lock:
+            self.counters[event.counter_key()] += 1
+            self._handle(event)
+
+
+    def emit_all(self, events : Iterable[ReportEvent]) -> None:
+        """
+        Reports events, such as those reported in another process.
+        """
+
+        for event in events:
+            self.emit(event)
+
+
+    def flush(self) -> None:
+        """
+        Shows the events that were not shown yet. Called at the end of
+        each conversion.
+        """
+        pass
+
+
+    def close(self) -> None:
+        """
+        Shows the events that were not shown yet, and anything that is
+        only shown once for the whole run. Called at the end of the run.
+        """
+
+        self.flush()
+
+
+    @abstractmethod
+    def _handle(self, event : ReportEvent) -> None:
+        """
+        Shows, or holds on to, an event that was just counted.
+        """
+        pass
+
+
+
+class NullReporter(Reporter):
+    """
+    Counts events without showing them.
+    """
+
+    @override
+    def _handle(self, event : ReportEvent) -> None:
+        pass
+
+
+
+class BufferedReporter(Reporter):
+    """
+    Holds on to events to be reported by another reporter, such as the
+    events of a batch worker process, which are sent to the main
+    process with the result of each conversion.
+    """
+
+    def __init__(self) -> None:
+
+        super().__init__()
+        self._events : list[ReportEvent] = []
+
+
+    @override
+    def _handle(self, event : ReportEvent) -> None:
+        self._events.append(event)
+
+
+    def drain(self) -> list[ReportEvent]:
+        """
+        Gets the events held so far, and removes them.
+        """
+
+        with self._lock:
+            events, self._events = self._events, []
+
+        return events
+
+
+
+class ConsoleReporter(Reporter):
+    """
+    Shows events as console messages, without printing a message per
+    event in large conversions.
+
+    Each conversion's events are counted until it is flushed. Kinds of
+    events that happened only a few times are then described one by
+    one, and the others summed up in a single message. Failures are
+    shown as soon as they happen. While a long conversion runs, how
+    many events it reported so far is shown at most once per
+    `render_interval` seconds.
+    """
+
+    def __init__(
+            self,
+            render_interval : float = DEFAULT_RENDER_INTERVAL,
+            detail_limit : int = DEFAULT_DETAIL_LIMIT
+        ) -> None:
+        """
+        Initializes a ConsoleReporter instance.
+
+
+        Parameters
+        ----------
+        render_interval : float, default=DEFAULT_RENDER_INTERVAL
+            The least number of seconds between two progress messages.
+
+        detail_limit : int, default=DEFAULT_DETAIL_LIMIT
+            How many events of a kind are described one by one, per
+            conversion.
+        """
+
+        super().__init__()
+
+        self.render_interval : float = render_interval
+        self.detail_limit : int = detail_limit
+
+        self._pending_counts : Counter = Counter()
+        self._pending_details : dict[str, list[str]] = {}
+        self._last_render : float = time.monotonic()
+
+
+    @override
+    def _handle(self, event : ReportEvent) -> None:
+
+        if event.urgent:
+            print_script_message(event.describe())
+            return
+
+        now = time.monotonic()
+
+        # a conversion's progress is first shown once it has run for
+        # `render_interval`, not as soon as it reports an event
+        if not self._pending_counts:
+            self._last_render = now
+
+        counter_key = event.counter_key()
+        self._pending_counts[counter_key] += 1
+
+        details = self._pending_details.setdefault(counter_key, [])
+
+        if len(details) < self.detail_limit:
+            details.append(event.describe())
+
+        if now - self._last_render >= self.render_interval:
+            self._last_render = now
+            print_script_message('Working... ' + ', '.join(
+                f'{count:,} {counter_key.replace('_', ' ')}'
+                for counter_key, count in self._pending_counts.items()
+            ))
+
+
+    @override
+    def flush(self) -> None:
+
+        with self._lock:
+            for counter_key, count in self._pending_counts.items():
+
+                if count <= self.detail_limit:
+                    for message in self._pending_details[counter_key]:
+                        print_script_message(message)
+
+                else:
+                    print_script_message(
+                        _COUNTER_SUMMARIES.get(
+                            counter_key, f'{{count:,}} {counter_key} events.'
+                        ).format(count=count)
+                    )
+
+            self._pending_counts.clear()
+            self._pending_details.clear()
+            self._last_render = time.monotonic()
+
+
+
+class NdjsonReporter(Reporter):
+    """
+    Writes events as newline-delimited JSON, one object per event,
+    followed by a single `counters` object with the totals of the run
+    when closed. Lines are written in batches rather than one by one.
+
+    The lines are written to stderr by default, since stdout holds the
+    script's messages and the result line of `--json`.
+    """
+
+    def __init__(self, stream : TextIO | None = None, batch_size : int = 1000) -> None:
+        """
+        Initializes a NdjsonReporter instance.
+
+
+        Parameters
+        ----------
+        stream : TextIO, optional
+            Where the lines are written, stderr by default.
+
+        batch_size : int, default=1000
+            How many lines are held before they are written.
+        """
+
+        super().__init__()
+
+        self.stream : TextIO = stream or sys.stderr
+        self.batch_size : int = batch_size
+
+        self._lines : list[str] = []
+        self._encode = json.JSONEncoder(ensure_ascii=False).encode
+
+
+    @override
+    def _handle(self, event : ReportEvent) -> None:
+
+        self._lines.append(self._encode(event.to_dict()))
+
+        if len(self._lines) >= self.batch_size:
+            self._write_lines()
+
+
+    @override
+    def flush(self) -> None:
+
+        with self._lock:
+            if self._lines:
+                self._write_lines()
+
+
+    @override
+    def close(self) -> None:
+
+        with self._lock:
+            self._lines.append(self._encode({
+                'event' : 'counters',
+                **self.counters
+            }))
+            self._write_lines()
+
+
+    def _write_lines(self) -> None:
+        """
+        Writes the lines held so far.
+        """
+
+        self._lines.append('')
+        self.stream.write('\n'.join(self._lines))
+        self.stream.flush()
+        self._lines.clear()
+
+
+
+_reporter : Reporter | None = None
+
+
+def create_reporter(kind : str) -> Reporter:
+    """
+    Creates a reporter of a kind, one of `REPORTER_KINDS`, or `qt` for
+    a `QtSignalReporter`, which needs PyQt6.
+
+
+    Raises
+    ------
+    ValueError
+        If there is no reporter of the kind.
+    """
+
+    match kind:
+
+        case 'console':
+            return ConsoleReporter()
+
+        case 'ndjson':
+            return NdjsonReporter()
+
+        case 'null':
+            return NullReporter()
+
+        case 'qt':
+            # imported here, since only the GUI has Qt installed
+            from .qt_reporter import QtSignalReporter
+            return QtSignalReporter()
+
+        case _:
+            raise ValueError(f'Unknown reporter: {kind}')
+
+
+def set_reporter(reporter : Reporter) -> None:
+    """
+    Chooses the reporter the handlers of this process report to.
+    """
+
+    global _reporter
+
+    _reporter = reporter
+
+
+def get_reporter() -> Reporter:
+    """
+    Gets the reporter the handlers of this process report to, a
+    `ConsoleReporter` unless another was set with `set_reporter`.
+    """
+
+    if _reporter is None:
+        set_reporter(create_reporter(DEFAULT_REPORTER_KIND))
+
+    return _reporter
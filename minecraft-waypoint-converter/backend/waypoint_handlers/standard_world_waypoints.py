@@ -6,7 +6,17 @@ a standardized format.
 
 from pathlib import Path
 
-from pyfilehandlers.file_handler import FileHandler
+from .tracing import traced
+from .waypoint_serializers import (
+    WaypointSerializer,
+    detect_serializer,
+    get_serializer,
+    get_serializers,
+    get_standard_format
+)
+from .waypoint_table import WaypointTable
+from .world_fingerprint import WorldFingerprint
+from .world_ref import WorldRef
 
 
 
@@ -27,6 +37,7 @@ class StandardWorldWaypoints:
                 z: float
             color: int,
             visible: bool
+            set: str (only for mods with waypoint sets)
         WAYPOINT_NAME_2:
             ...
     DIMENSION_NAME_2:
@@ -36,6 +47,12 @@ class StandardWorldWaypoints:
             ...
     ```
 
+    In memory, the waypoints are held column by column in a
+    `WaypointTable`. On file, they are stored as
+    YAML in the format above, or in one of the faster formats of
+    `waypoint_serializers`; the format of an existing file is detected
+    when it is read.
+
 
     Attributes
     ----------
@@ -45,8 +62,15 @@ class StandardWorldWaypoints:
     world_type : str
         Indication of what type of world the world is.
 
-    waypoints_file : FileHandler
-        Class to handle the file for this world's standardized waypoints.
+    serializer : WaypointSerializer
+        Writes the standardized waypoints in the chosen format.
+
+    waypoints_path : pathlib.Path
+        The file this world's standardized waypoints are written to.
+
+    standardized_waypoints_dir : pathlib.Path
+        The directory the standardized waypoints, and the fingerprints of
+        the conversions made from them, are stored in.
 
     mod_name : str
         Name of the mod whose standardized waypoints are held in the file.
@@ -56,7 +80,8 @@ class StandardWorldWaypoints:
         self,
         world_name : str,
         world_type : str,
-        mod_name : str
+        mod_name : str,
+        serialization_format : str | None = None
     ) -> None:
         """
         Initializes a StandardWorldWaypoints instance.
@@ -72,6 +97,11 @@ class StandardWorldWaypoints:
 
         mod_name : str
             Name of the mod whose standardized waypoints are held in the file.
+
+        serialization_format : str, optional
+            The format the waypoints are written in, one of
+            `SERIALIZATION_FORMATS`. Defaults to the format chosen with
+            `set_standard_format`.
         """
 
         self.world_name : str = world_name
@@ -106,26 +136,42 @@ class StandardWorldWaypoints:
             world_type,
         )
 
-        self.waypoints_file = FileHandler(Path(
-            standardized_waypoints_file_path,
-            f'{mod_name}_{world_name}.yaml'
-        ))
+        self.standardized_waypoints_dir : Path = standardized_waypoints_file_path
+
+        self.serializer : WaypointSerializer = get_serializer(
+            serialization_format or get_standard_format()
+        )
+        self.waypoints_path : Path = self._get_waypoints_path(self.serializer)
 
 
-    def read_waypoints(self) -> dict:
+    @traced
+    def read_table(self) -> WaypointTable:
         """
-        Reads the waypoints from the file and returns the dict data.
+        Reads the waypoints from the file, in whichever format it was
+        written in.
 
         
         Return
         ------
-        dict
-            The waypoint data held in the file.
+        WaypointTable
+            The waypoint data held in the file, empty if there is none.
         """
-        return self.waypoints_file.read()
 
+        candidate_paths = [self.waypoints_path] + [
+            self._get_waypoints_path(serializer)
+            for serializer in get_serializers()
+            if serializer is not self.serializer
+        ]
+
+        for waypoints_path in candidate_paths:
+            if waypoints_path.is_file():
+                return detect_serializer(waypoints_path).read(waypoints_path)
 
-    def write_waypoints(self, given_waypoints : dict) -> bool:
+        return WaypointTable()
+
+
+    @traced
+    def write_waypoints(self, given_waypoints : WaypointTable) -> bool:
         """
         Writes the passed in waypoints to the file containing the
         standardized waypoint information.
@@ -133,8 +179,8 @@ class StandardWorldWaypoints:
         
         Parameters
         ----------
-        given_waypoints : dict
-            Properly formatted waypoints to write to the file.
+        given_waypoints : WaypointTable
+            The waypoints to write to the file.
 
         
         Return
@@ -144,4 +190,107 @@ class StandardWorldWaypoints:
             False,  otherwise.
         """
 
-        return self.waypoints_file.write(given_waypoints)
+        if not self.serializer.write(
+            self.waypoints_path,
+            given_waypoints
+        ):
+            return False
+
+        # so that a file written before in another format is not read
+        # instead of this one
+        for serializer in get_serializers():
+            if serializer is not self.serializer:
+                self._get_waypoints_path(serializer).unlink(missing_ok=True)
+
+        return True
+
+
+    def _get_waypoints_path(self, serializer : WaypointSerializer) -> Path:
+        """
+        Gets the path of this world's standardized waypoints when they
+        are written by `serializer`.
+        """
+
+        return Path(
+            self.standardized_waypoints_dir,
+            f'{self.mod_name}_{self.world_name}{serializer.file_suffix}'
+        )
+
+
+    def get_fingerprint_path(self, target_world : WorldRef) -> Path:
+        """
+        Gets the path of the file holding the fingerprint of the last
+        conversion of this world to a world of another mod.
+
+        
+        Parameters
+        ----------
+        target_world : WorldRef
+            The world that this world was converted to.
+
+        
+        Return
+        ------
+        pathlib.Path
+            The path of the fingerprint file.
+        """
+
+        target_name = f'{target_world.mod_name}_{target_world.world_type}_{target_world.name}'
+
+        return Path(
+            self.standardized_waypoints_dir,
+            f'{self.mod_name}_{self.world_name}.{target_name}.fingerprint.json'
+        )
+
+
+    @traced
+    def read_fingerprint(self, target_world : WorldRef) -> WorldFingerprint | None:
+        """
+        Reads the fingerprint of the last conversion of this world to a
+        world of another mod.
+
+        
+        Parameters
+        ----------
+        target_world : WorldRef
+            The world that this world was converted to.
+
+        
+        Return
+        ------
+        WorldFingerprint
+            The fingerprint of the last conversion.
+            None if the world was not converted to `target_world` before.
+        """
+
+        return WorldFingerprint.load(self.get_fingerprint_path(target_world))
+
+
+    @traced
+    def write_fingerprint(
+            self,
+            target_world : WorldRef,
+            fingerprint : WorldFingerprint
+        ) -> bool:
+        """
+        Writes the fingerprint of a conversion of this world to a world
+        of another mod.
+
+        
+        Parameters
+        ----------
+        target_world : WorldRef
+            The world that this world was converted to.
+
+        fingerprint : WorldFingerprint
+            The fingerprint to write.
+
+        
+        Return
+        ------
+        bool
+            True,   if the fingerprint was successfully written.
+            False,  otherwise.
+        """
+
+        return fingerprint.save(self.get_fingerprint_path(target_world))
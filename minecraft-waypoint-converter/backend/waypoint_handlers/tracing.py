@@ -0,0 +1,265 @@
+"""tracing.py
+
+Contains a lightweight tracer that records how long each phase of a
+conversion takes, as nested spans, and writes them as a Chrome trace.
+"""
+
+import os
+import threading
+import time
+from contextlib import nullcontext
+from functools import wraps
+from pathlib import Path
+
+
+from typing import Any, Callable, ContextManager, Iterable, TypeVar
+
+F = TypeVar('F', bound=Callable)
+
+
+
+class Tracer:
+    """
+    A class that records spans of time as Chrome trace events.
+
+    Each span is recorded as a complete event, with the thread it ran on,
+    when it ended. Spans nest by time, so a span that starts inside
+    another is shown below it. Events recorded in other processes, such
+    as the workers of a batch conversion, can be added to the trace,
+    since they are timed by the same system-wide clock.
+
+
+    Attributes
+    ----------
+    events : list[dict]
+        The trace events recorded so far.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes a Tracer instance with no events.
+        """
+
+        self.events : list[dict] = []
+
+
+    def span(self, name : str, **args : Any) -> '_Span':
+        """
+        Records the time spent in a `with` block as a span.
+
+
+        Parameters
+        ----------
+        name : str
+            The name the span is shown with.
+
+        **args : Any
+            Details shown with the span, such as the world it is for.
+            Must be JSON serializable.
+        """
+
+        return _Span(self.events, name, args)
+
+
+    def drain(self) -> list[dict]:
+        """
+        Gets the events recorded so far, and removes them from the
+        tracer.
+        """
+
+        events, self.events = self.events, []
+
+        return events
+
+
+
+class _Span:
+    """
+    A span being recorded by a `Tracer`.
+    """
+
+    __slots__ = ('_events', '_name', '_args', '_start_ns')
+
+    def __init__(self, events : list[dict], name : str, args : dict) -> None:
+
+        self._events = events
+        self._name = name
+        self._args = args
+        self._start_ns = 0
+
+
+    def __enter__(self) -> '_Span':
+
+        self._start_ns = time.perf_counter_ns()
+
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+
+        end_ns = time.perf_counter_ns()
+
+        if exc_type is not None:
+            self._args['error'] = exc_type.__name__
+
+        # appending to a list is atomic, so spans of several threads can
+        # be recorded at once
+        self._events.append({
+            'name' : self._name,
+            'ph' : 'X',
+            'ts' : self._start_ns / 1000,
+            'dur' : (end_ns - self._start_ns) / 1000,
+            'pid' : os.getpid(),
+            'tid' : threading.get_native_id(),
+            'args' : self._args
+        })
+
+
+
+_tracer : Tracer | None = None
+
+# returned instead of a span while tracing is disabled
+_NO_SPAN : ContextManager = nullcontext()
+
+
+def set_tracing(enabled : bool) -> None:
+    """
+    Enables or disables tracing for this process. Enabling it starts a
+    new trace, without the events of any earlier one.
+    """
+
+    global _tracer
+
+    _tracer = Tracer() if enabled else None
+
+
+def is_tracing() -> bool:
+    """
+    Checks whether tracing is enabled for this process.
+    """
+
+    return _tracer is not None
+
+
+def get_tracer() -> Tracer | None:
+    """
+    Gets the tracer of this process, None if tracing is disabled.
+    """
+
+    return _tracer
+
+
+def span(name : str, **args : Any) -> ContextManager:
+    """
+    Records the time spent in a `with` block as a span, if tracing is
+    enabled. Costs a single check otherwise.
+
+
+    Parameters
+    ----------
+    name : str
+        The name the span is shown with.
+
+    **args : Any
+        Details shown with the span. Must be JSON serializable.
+    """
+
+    if _tracer is None:
+        return _NO_SPAN
+
+    return _tracer.span(name, **args)
+
+
+def traced(function : F) -> F:
+    """
+    Records every call of a function or method as a span named after
+    it, if tracing is enabled when it is called.
+    """
+
+    name = function.__qualname__
+
+    @wraps(function)
+    def traced_function(*args, **kwargs):
+
+        if _tracer is None:
+            return function(*args, **kwargs)
+
+        with _tracer.span(name):
+            return function(*args, **kwargs)
+
+    return traced_function
+
+
+def drain_trace_events() -> list[dict]:
+    """
+    Gets the events recorded by this process so far, removing them, so
+    they can be sent to the process writing the trace. Empty if tracing
+    is disabled.
+    """
+
+    return _tracer.drain() if _tracer is not None else []
+
+
+def add_trace_events(events : Iterable[dict]) -> None:
+    """
+    Adds events recorded by another process to the trace of this one.
+    """
+
+    if _tracer is not None:
+        _tracer.events.extend(events)
+
+
+def write_trace(file_path : Path) -> bool:
+    """
+    Writes the events recorded so far in the Chrome trace event format,
+    which can be opened in `chrome://tracing` or https://ui.perfetto.dev.
+
+
+    Parameters
+    ----------
+    file_path : pathlib.Path
+        The file to write the trace to.
+
+
+    Returns
+    -------
+    bool
+        True,   if the trace was written.
+        False,  if tracing is disabled or the file could not be written.
+    """
+
+    if _tracer is None:
+        return False
+
+    # imported here, since only traced runs write a trace
+    import json
+
+    main_pid = os.getpid()
+
+    # names the rows of each process, workers by their process id
+    metadata = [
+        {
+            'name' : 'process_name',
+            'ph' : 'M',
+            'pid' : pid,
+            'args' : {
+                'name' : 'convert_waypoints' if pid == main_pid else f'worker {pid}'
+            }
+        }
+        for pid in sorted({event['pid'] for event in _tracer.events})
+    ]
+
+    try:
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(
+                {
+                    'traceEvents' : metadata + _tracer.events,
+                    'displayTimeUnit' : 'ms'
+                },
+                f
+            )
+
+    except OSError:
+        return False
+
+    return True
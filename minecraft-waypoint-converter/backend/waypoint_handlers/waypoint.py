@@ -0,0 +1,60 @@
+"""waypoint.py
+
+Contains the record that holds a single waypoint in the standardized
+format, as given when iterating over a `WaypointTable`.
+"""
+
+from dataclasses import dataclass
+
+
+
+@dataclass(slots=True)
+class Waypoint:
+    """
+    A single waypoint in the standardized format. Holds only waypoint
+    data that is common between all waypoint mods.
+
+    Records are treated as immutable once created. They are not frozen,
+    since a frozen dataclass sets every field through `object.__setattr__`
+    which makes building millions of them noticeably slower.
+    Strings shared between many waypoints (`dimension`, `set_name`) are
+    expected to be interned by whatever creates the record, as every
+    literal dimension name and the set names read by the mod handlers are.
+
+
+    Attributes
+    ----------
+    name : str
+        The name of the waypoint.
+
+    dimension : str
+        The dimension the waypoint is in, ex. `overworld`, `nether`, `end`.
+
+    x : float
+        The x coordinate of the waypoint.
+
+    y : float
+        The y coordinate of the waypoint.
+
+    z : float
+        The z coordinate of the waypoint.
+
+    color : int
+        The color of the waypoint, as the mod's color index.
+
+    visible : bool
+        Whether the waypoint is shown in game.
+
+    set_name : str | None
+        The name of the waypoint set/group the waypoint belongs to, for
+        mods that support them.
+    """
+
+    name : str
+    dimension : str
+    x : float
+    y : float
+    z : float
+    color : int = 0
+    visible : bool = True
+    set_name : str | None = None
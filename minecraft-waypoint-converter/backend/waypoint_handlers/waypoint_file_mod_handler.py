@@ -10,18 +10,36 @@ from pathlib import Path
 
 from pyfilehandlers.file_handler import FileHandler
 
+from .reporting import WaypointsWritten, get_reporter
+from .tracing import traced
 from .waypoint_mod_handler import WaypointModHandler
 
 
+from typing import Any, override
+
+
 
 class FileWaypointModHandler(WaypointModHandler):
     """
     A class that handles reading and writing waypoints to and from
     a waypoint mod that stores all waypoints in a single file.
 
+    Writing a world's waypoints only keeps them as the world's dirty
+    data, which is read back by the handler in place of the file. The
+    file is written once, when `commit` is called, with every dirty
+    world at the same time.
+
     
     Attributes
     ----------
+    input_file_path : pathlib.Path
+        The full path of the waypoint file to be used as input to the
+        converter.
+
+    output_file_path : pathlib.Path
+        The full path of the waypoint file to be used as output from the
+        converter.
+
     input_waypoint_file : FileHandler
         Class that handles IO for the file in which the waypoints
         are stored, to be used as input to the converter.
@@ -52,26 +70,73 @@ class FileWaypointModHandler(WaypointModHandler):
         """
 
         super().__init__()
+        self.input_file_path = input_file_path
+        self.output_file_path = output_file_path
         self.input_waypoint_file = FileHandler(input_file_path)
         self.output_waypoint_file = FileHandler(output_file_path)
 
+        self._dirty_worlds : dict[str, Any] = {}
+
 
     @abstractmethod
-    def read_full_waypoint_file(self) -> dict:
+    def _write_worlds(self, world_waypoints : dict[str, Any]) -> bool:
         """
-        Reads and returns the data held within the waypoints file.
+        Writes the waypoint data of worlds to the output file, keeping
+        every other world in the file as it is.
 
         
+        Parameters
+        ----------
+        world_waypoints : dict[str, Any]
+            The waypoint data of each world to write, in the format of
+            the mod, keyed by the location of the world, as held by
+            `WorldRef`.
+
+            
         Returns
         -------
-        dict
-            The data held within the file.
+        bool
+            True,   if the write was successful.
+            False,  otherwise.
         """
-        
 
-    @abstractmethod
-    def write_to_full_waypoint_file(self) -> None:
+
+
+    ####################################################################
+    #####                      Dirty Worlds                        #####
+    ####################################################################
+
+    def set_world_data(self, location : str, world_data : Any) -> None:
         """
-        Writes to the data held within the waypoints file.
+        Changes the waypoint data of a world and marks the world as
+        dirty. The file is not written until `commit`.
+
+        
+        Parameters
+        ----------
+        location : str
+            The location of the world in the file, as held by
+            `WorldRef`.
+
+        world_data : Any
+            The world's waypoint data, in the format of the mod.
         """
-    
\ No newline at end of file
+
+        self._dirty_worlds[location] = world_data
+
+
+    @override
+    @traced
+    def commit(self) -> bool:
+
+        if not self._dirty_worlds:
+            return True
+
+        if not self._write_worlds(world_waypoints=self._dirty_worlds):
+            get_reporter().emit(WaypointsWritten(self.mod_name, None, False))
+            return False
+
+        get_reporter().emit(WaypointsWritten(self.mod_name, None, True))
+        self._dirty_worlds.clear()
+
+        return True
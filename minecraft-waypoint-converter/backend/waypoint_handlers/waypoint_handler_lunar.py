@@ -4,22 +4,28 @@ Contains a class that handles reading and writing waypoints to and from
 the Lunar Client waypoint mod.
 """
 
+import hashlib
+import json
 import os
 from pathlib import Path
 
 from pyfilehandlers.file_handler import FileHandler
-from pyfilehandlers.file_json import JSONFile
-from pyfilehandlers.file_minecraft_dat import MinecraftDatFile
 from lunapyutils import (
     print_script_message, 
     select_list_options,
     merge_dicts
 )
 
+from .backup_store import get_run_id
+from .lunar_waypoint_file import LunarWaypointFile
+from .reporting import DuplicateSkipped, get_reporter
+from .tracing import traced
 from .waypoint_file_mod_handler import FileWaypointModHandler
+from .waypoint_table import WaypointTable
+from .world_ref import WorldRef
 
 
-from typing import Any, override
+from typing import override
 
 
 
@@ -70,8 +76,15 @@ class LunarWaypointHandler(FileWaypointModHandler):
         1  - end
 
     Lunar Client does NOT allow for duplicate waypoint names.
+
+    The file holds every world and server the player has waypoints in,
+    so the worlds are listed, and a world's waypoints read and written,
+    through a `LunarWaypointFile`, which only parses and serializes the
+    worlds that are needed. The rest of the file is copied as it is.
     """
 
+    mod_name : str = 'lunar client'
+
     def __init__(
         self,
         input_file_path : Path = None,
@@ -108,16 +121,22 @@ class LunarWaypointHandler(FileWaypointModHandler):
             'waypoints.json'
         )
 
-        output_file = output_file_path or input_file_path
+        output_file = output_file_path or input_file
 
         super().__init__(
             input_file_path=input_file,
             output_file_path=output_file
         )
 
+        self._world_file : LunarWaypointFile = LunarWaypointFile(input_file)
+
+        # the waypoints of each world read from the file so far, while
+        # the file has the signature they were read at
+        self._world_waypoints : dict[str, dict] = {}
+        self._world_waypoints_signature : tuple[int, int] | None = None
+
         try:
-            data : dict = self.read_full_waypoint_file()
-            self.waypoint_list : dict = data['waypoints']
+            self._world_file.refresh()
 
         except FileNotFoundError:
             raise FileNotFoundError(
@@ -131,6 +150,22 @@ class LunarWaypointHandler(FileWaypointModHandler):
     #####              WaypointsModHandler Overrides               #####
     ####################################################################
 
+    @override
+    @classmethod
+    def create(
+            cls,
+            convert_here : bool = False,
+            **options
+        ) -> 'LunarWaypointHandler':
+
+        # the waypoint file is read when the handler is created, so the
+        # default file is not read first when converting here
+        if convert_here:
+            return cls(input_file_path=cls._get_convert_here_file())
+
+        return cls()
+
+
     @override
     def parse_world_name(world_name: str) -> str:
         # Lunar world name format is either
@@ -147,76 +182,117 @@ class LunarWaypointHandler(FileWaypointModHandler):
 
 
     @override
-    def get_world_name(self, search_name : str) -> str | None:
+    @traced
+    def get_world_name(
+            self,
+            search_name : str,
+            ambiguity : str = 'prompt'
+        ) -> str | None:
+
+        return self._get_specific_world_name(
+            search_name=search_name,
+            ambiguity=ambiguity
+        )
+
+
+    @override
+    def _get_world_location(self, file_name : str) -> str:
 
-        return self._get_specific_world_name(search_name=search_name)
+        # worlds are stored under their file system name as the key
+        return file_name
 
 
     @override
-    def _get_worlds(self) -> list[str]:
+    def get_world_files(self, world : WorldRef) -> list[Path]:
 
-        worlds_with_created_wps = list(self.waypoint_list.keys())
-        worlds_singleplayer = os.listdir(os.path.join(
-            os.getenv('APPDATA'),
-            '.minecraft',
-            'saves'
-        ))
-        worlds_multiplayer_file = FileHandler(
-            extension=MinecraftDatFile,
-            full_path=os.path.join(
-                os.getenv('APPDATA'),
-                '.minecraft',
-                'servers.dat'
-            )
-        )
-        worlds_multiplayer = []
+        # every world is stored in the same file
+        return [Path(self.input_file_path)] \
+            if os.path.isfile(self.input_file_path) else []
+
+
+    @override
+    @traced
+    def get_worlds_with_waypoints(self) -> list[str]:
 
-        for server in worlds_multiplayer_file.read()['servers']:
-            worlds_multiplayer.append(f'{server['name']} (ip: {server['ip']})')
+        world_keys = self._world_file.get_world_keys()
+        known_keys = set(world_keys)
 
-        return worlds_with_created_wps + worlds_singleplayer + worlds_multiplayer
+        # worlds that were given waypoints, but are not committed yet
+        return world_keys + [
+            location for location in self._dirty_worlds
+            if location not in known_keys
+        ]
 
 
     @override
-    def _get_world_waypoints(self, world_name: str) -> dict:
+    @traced
+    def _get_worlds(self) -> list[str]:
 
-        found_world = self._get_specific_world_name(search_name=world_name)
+        worlds_with_created_wps = self.get_worlds_with_waypoints()
+        worlds_in_game = self.world_catalog.get_game_worlds()
 
-        if not found_world:
-            raise Exception(
-                'This should not happen, since the given world name is'
-                ' the exact way it appears in the Lunar Client file.'
-            )
+        return worlds_with_created_wps + worlds_in_game
+
+
+    @override
+    @traced
+    def _get_world_waypoints(self, world: WorldRef) -> dict:
 
-        return self.waypoint_list[found_world][""]
+        if world.location in self._dirty_worlds:
+            return self._dirty_worlds[world.location]
+
+        # worlds read before are read again once the file was changed
+        self._world_file.refresh()
+
+        if self._world_file.signature != self._world_waypoints_signature:
+            self._world_waypoints.clear()
+            self._world_waypoints_signature = self._world_file.signature
+
+        if world.location not in self._world_waypoints:
+            self._world_waypoints[world.location] = \
+                self._world_file.read_world_waypoints(world.location)
+
+        return self._world_waypoints[world.location]
 
 
     @override
-    def _get_specific_world_name(self, search_name: str) -> str | None:
+    def _get_specific_world_name(
+            self,
+            search_name : str,
+            ambiguity : str = 'prompt'
+        ) -> str | None:
+
+        # an exact name, such as a file system name found earlier,
+        # needs no searching or choosing
+        exact_matches = self._get_world_search_index().exact_matches(search_name)
+
+        if len(exact_matches) == 1:
+            return exact_matches[0]
 
-        matching_servers = self._get_matching_servers(search_name)
+        matching_servers = self._get_matching_servers(search_name=search_name)
 
+        # names that are only similar to the search may be other worlds,
+        # so they are never taken without being chosen
         if len(matching_servers) == 0:
-            print_script_message(
-                f'No servers matching the name "{search_name}" were found.'
+            return self._choose_similar_match(
+                search_name=search_name,
+                ambiguity=ambiguity
             )
-            return None
 
         if len(matching_servers) == 1:
             return matching_servers[0]
         
-        return self._choose_server(matching_servers)
+        return self._choose_match(
+            search_name=search_name,
+            matching_servers=matching_servers,
+            ambiguity=ambiguity
+        )
 
 
     @override
     def _get_matching_servers(self, search_name: str) -> list[str]:
 
-        return list(
-            filter(
-                lambda server_name: search_name.lower() in server_name.lower(),
-                self._get_worlds()
-            )
-        )
+        return self._get_world_search_index().search(search_name, fuzzy=False)
 
 
     @override
@@ -231,92 +307,66 @@ class LunarWaypointHandler(FileWaypointModHandler):
     
 
     @override
-    def convert_from_mod_to_standard(self, world_name: str) -> dict:
-        
-        standardized_dict = self._create_standardized_dict(world_name=world_name)
+    @traced
+    def convert_from_mod_to_table(self, world: WorldRef) -> WaypointTable:
 
-        standardized_dict = {
-            key: value for (key, value) in standardized_dict.items() if value
-        }
+        world_waypoints = self._get_world_waypoints(world=world)
 
-        return standardized_dict
-    
-
-    @override
-    def _create_standardized_dict(self, world_name: str) -> dict:
-
-        world_waypoints = self._get_world_waypoints(world_name=world_name)
-
-        standardized_format = {
-            'overworld' : {},
-            'nether' : {},
-            'end' : {}
-        }
+        table = WaypointTable()
 
         for wp_name, wp_data in world_waypoints.items():
 
-            # verify duplicate names are not overriden
-            dimension = 'filler_dimension'
-
-            match wp_data['dimension']:
-
-                case 0:
-                    dimension = 'overworld'
-
-                case -1:
-                    dimension = 'nether'
-
-                case 1:
-                    dimension = 'end'
-
-                # other dimension
-                case _:
-                    pass
-
+            location = wp_data['location']
 
-            color = wp_data['color']['value'] if 'color' in wp_data else 0
+            table.append(
+                name=wp_name,
+                dimension=self._get_dimension_name(wp_data['dimension']),
+                x=location['x'],
+                y=location['y'],
+                z=location['z'],
+                color=wp_data['color']['value'] if 'color' in wp_data else 0,
+                visible=wp_data['visible']
+            )
 
-            standardized_format[dimension][wp_name] = {
-                'coordinates' : {
-                    'x' : wp_data['location']['x'],
-                    'y' : wp_data['location']['y'],
-                    'z' : wp_data['location']['z']
-                },
-                'color' : color,
-                'visible' : wp_data['visible']
-            }
+        return table
 
-        return standardized_format
-    
 
     @override
+    @traced
     def convert_from_standard_to_mod(
             self, 
-            standard_data : dict, 
-            world_name : str
+            standard_data : WaypointTable, 
+            world : WorldRef
         ) -> bool:
         
-        existing_waypoints = self._get_world_waypoints(world_name=world_name)
+        existing_waypoints = self._get_world_waypoints(world=world)
         wps_to_add = {}
 
-        for dimension, waypoints in standard_data.items():
-            for wp_name, wp_data in waypoints.items():
-
-                # remove duplicate waypoint names because Lunar does not
-                # support duplicate waypoint names
-                if wp_name in existing_waypoints:
-                    print_script_message(f'Waypoint with name "{wp_name}" already exists, skipping...')
-                    continue
-
-                wps_to_add[wp_name] = self._create_mod_waypoint_dict(
-                    standard_wp_dict=wp_data,
-                    dimension=dimension
-                )
+        reporter = get_reporter()
+
+        for (
+            wp_name, dimension, x, y, z, color, visible, _
+        ) in standard_data.rows():
+
+            # remove duplicate waypoint names because Lunar does not
+            # support duplicate waypoint names
+            if wp_name in existing_waypoints:
+                reporter.emit(DuplicateSkipped(self.mod_name, wp_name))
+                continue
+
+            wps_to_add[wp_name] = self._create_mod_waypoint_dict(
+                dimension=dimension,
+                x=x,
+                y=y,
+                z=z,
+                color=color,
+                visible=visible
+            )
 
         combined_waypoints = merge_dicts(existing_waypoints, wps_to_add)
         
         return  self._add_waypoints_to_mod(
-                    world_name=world_name,
+                    world=world,
                     waypoints=combined_waypoints
                 )
 
@@ -324,48 +374,61 @@ class LunarWaypointHandler(FileWaypointModHandler):
     @override    
     def _add_waypoints_to_mod(
             self, 
-            world_name: str, 
+            world: WorldRef, 
             waypoints: dict
         ) -> bool:
 
-        error_in_write = False
+        # only marks the world as changed, the file is written once
+        # when the conversion is committed
+        self.set_world_data(location=world.location, world_data=waypoints)
+
+        return True
 
-        full_wp_data = self.read_full_waypoint_file()
 
-        full_wp_data['waypoints'][world_name][""] = waypoints
+    @override
+    def convert_here(self) -> None:
 
-        write_successful = self.write_to_full_waypoint_file(data=full_wp_data)
+        convert_here_file = self._get_convert_here_file()
 
-        if write_successful:
-            print_script_message('Waypoints written.')
-        else:
-            error_in_write = True
-            print_script_message('Failure writing waypoints.')
+        self.input_file_path = convert_here_file
+        self.output_file_path = convert_here_file
+        self.input_waypoint_file = FileHandler(convert_here_file)
+        self.output_waypoint_file = FileHandler(convert_here_file)
 
-        return not error_in_write
+        self._world_file = LunarWaypointFile(convert_here_file)
+        self._world_waypoints.clear()
+        self._dirty_worlds.clear()
 
 
     @override
-    def create_backup(self, world_name : str) -> bool:
-        data : dict = self.read_full_waypoint_file()
-        backup_file = FileHandler.exact_path(
-            full_path=Path(
-                os.getcwd(),
-                'minecraft-waypoint-converter',
-                'data',
-                'backups',
-                self.get_datetime(),
-                'lunar client',
-                'waypoints.json'
-            ),
-            extension=JSONFile
+    @traced
+    def create_backup(self, world : WorldRef) -> bool:
+
+        # the file is stored as it is on disk, so it does not need to be
+        # serialized again, and is only stored once while it is unchanged
+        return self.backup_store.back_up_files(
+            run_id=get_run_id(),
+            mod_name=self.mod_name,
+            world_name=world.file_name,
+            files={'waypoints.json' : Path(self.input_file_path)}
         )
 
-        if not backup_file.write(data=data):
-            print_script_message('Error creating Lunar Client backup file.')
-            return False
 
-        return True
+    @override
+    @traced
+    def hash_world_data(self, world : WorldRef) -> str:
+
+        # the file is shared by every world, so only the world's own
+        # waypoints are hashed
+        world_waypoints = self._get_world_waypoints(world=world) \
+            if world.location in self._dirty_worlds \
+            or self._world_file.has_world(world.location) \
+            else {}
+
+        return hashlib.blake2b(
+            json.dumps(world_waypoints, sort_keys=True).encode('utf-8'),
+            digest_size=16
+        ).hexdigest()
 
 
 
@@ -374,13 +437,27 @@ class LunarWaypointHandler(FileWaypointModHandler):
     ####################################################################
 
     @override
-    def read_full_waypoint_file(self) -> dict:
-        return self.waypoints_file.read()
-    
+    def _write_worlds(self, world_waypoints : dict[str, dict]) -> bool:
 
-    @override
-    def write_to_full_waypoint_file(self, data : Any) -> bool:
-        return self.waypoints_file.write(data)
+        # only the changed worlds are written, so the file is not parsed
+        # as a whole. It is scanned again if another process wrote to it
+        # since, so that its changes to other worlds are kept
+        try:
+            self._world_file.write_worlds(
+                world_waypoints=world_waypoints,
+                output_path=self.output_file_path
+            )
+
+        except (OSError, ValueError):
+            return False
+
+        # the written worlds are what is now in the file, unless it was
+        # written to another file, which is never read from
+        if Path(self.output_file_path).resolve() == self._world_file.file_path.resolve():
+            self._world_waypoints = dict(world_waypoints)
+            self._world_waypoints_signature = self._world_file.signature
+
+        return True
 
 
 
@@ -388,33 +465,90 @@ class LunarWaypointHandler(FileWaypointModHandler):
     #####                       Other Methods                      #####
     ####################################################################
 
+    @staticmethod
+    def _get_convert_here_file() -> Path:
+        """
+        Gets the path of the waypoint file in the predefined directory
+        `minecraft-waypoint-converter/data/convert-here`.
+        """
+
+        return Path(
+            os.getcwd(),
+            'minecraft-waypoint-converter',
+            'data',
+            'convert-here',
+            'lunar client',
+            'waypoints.json'
+        )
+
+
     def print_waypoints(self) -> None:
         """
         Prints the Lunar Client waypoints to the console.
         """
 
-        self.waypoints_file.print()
+        self.input_waypoint_file.print()
+
+
+    @staticmethod
+    def _get_dimension_name(dimension_int : int) -> str:
+        """
+        Gets the standardized name of a Lunar Client dimension tag.
+
+        Parameters
+        ----------
+        dimension_int : int
+            the dimension tag of the waypoint
+
+        Returns
+        -------
+        str
+            the name of the dimension
+        """
+
+        match dimension_int:
+
+            case 0:
+                return 'overworld'
+
+            case -1:
+                return 'nether'
+
+            case 1:
+                return 'end'
+
+            # other dimension
+            case _:
+                return 'filler_dimension'
 
 
     def _create_mod_waypoint_dict(
             self, 
-            standard_wp_dict : dict, 
-            dimension : str
+            dimension : str,
+            x : float,
+            y : float,
+            z : float,
+            color : int,
+            visible : bool
         ) -> dict:
         """
         Creates the waypoint dict in the format of Lunar Client.
 
         Parameters
         ----------
-        standard_wp_dict : dict
-            the standardized waypoint data
         dimension : str
-            the dimension currently being handled
+            the dimension of the waypoint
+        x, y, z : float
+            the coordinates of the waypoint
+        color : int
+            the color of the waypoint
+        visible : bool
+            whether the waypoint is visible
 
         Returns
         -------
         dict
-            the waypoints formatted in the way of Lunar Client
+            the waypoint formatted in the way of Lunar Client
         """
         
         dimension_int : int
@@ -437,18 +571,17 @@ class LunarWaypointHandler(FileWaypointModHandler):
 
         lunar_dict = {
             'location' : {
-                'x' : float(standard_wp_dict['coordinates']['x']),
-                'y' : float(standard_wp_dict['coordinates']['y']),
-                'z' : float(standard_wp_dict['coordinates']['z'])
+                'x' : x,
+                'y' : y,
+                'z' : z
             },
-            'visible' : bool(standard_wp_dict['visible']),
-            'dimension' : int(dimension_int),
+            'visible' : visible,
+            'dimension' : dimension_int,
             'color' : {
-                'value' : int(standard_wp_dict['color'])
+                'value' : color
             },
             'showBeam' : True,
             'showText' : True
         }
 
         return lunar_dict
-    
\ No newline at end of file
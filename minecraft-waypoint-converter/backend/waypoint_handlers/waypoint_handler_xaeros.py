@@ -7,19 +7,54 @@ the mod Xaero's Minimap.
 from pathlib import Path
 import os
 
-from pyfilehandlers.file_handler import FileHandler
-from pyfilehandlers.file_txt import TxtFile
-from pyfilehandlers.file_minecraft_dat import MinecraftDatFile
 from lunapyutils import (
     print_script_message, 
     select_list_options,
     merge_dicts
 )
 
+from .backup_store import get_run_id
+from .reporting import (
+    DuplicateSkipped,
+    UnreadableWaypointLine,
+    WaypointsWritten,
+    get_reporter
+)
+from .tracing import traced
 from .waypoint_directory_mod_handler import DirectoryWaypointModHandler
+from .xaeros_waypoint_parser import (
+    UnparsedLines,
+    XaerosWaypoint,
+    iter_waypoint_file
+)
+from .xaeros_waypoint_writer import write_waypoint_file
+from .waypoint_table import WaypointTable
+from .waypoint_merge import waypoint_key
+from .world_ref import WorldRef
+
+
+from typing import Callable, Iterable, TYPE_CHECKING, TypeVar, override
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor, ThreadPoolExecutor
 
 
-from typing import override
+_T = TypeVar('_T')
+_R = TypeVar('_R')
+
+
+# the directory of each dimension within a world's directory
+DIMENSION_DIRECTORIES : dict[str, str] = {
+    'overworld' : 'dim%0',
+    'nether' : 'dim%-1',
+    'end' : 'dim%1'
+}
+
+WAYPOINT_FILE_NAME : str = 'mw$default_1.txt'
+
+# the number of dimension files of a world read, written, or backed up
+# at the same time
+DEFAULT_IO_WORKERS : int = 4
 
 
 class XaerosWaypointHandler(DirectoryWaypointModHandler):
@@ -34,6 +69,12 @@ class XaerosWaypointHandler(DirectoryWaypointModHandler):
     `dim%0`, `dim%-1`, and `dim%1`, for the Overworld, Nether, and End
     respectively. Each of these dimension directories contains a file named
     `mw$default_1.txt`, which contains the waypoints for that dimension.
+    Modded dimensions have their own directories, such as
+    `dim%aether$the_aether`, and keep their directory name as their
+    dimension name.
+
+    The dimension files of a world are read, written, and backed up on a
+    pool of threads, so their I/O latencies overlap on slow disks.
 
     Xaero's Minimap also supports creating waypoint groups. 
     If a group is created, the first line of the file will be a line starting
@@ -63,10 +104,13 @@ class XaerosWaypointHandler(DirectoryWaypointModHandler):
     ```
     """
 
+    mod_name : str = "xaero's minimap"
+
     def __init__(
         self,
         input_directory_path : Path = None,
-        output_directory_path : Path = None
+        output_directory_path : Path = None,
+        io_workers : int = DEFAULT_IO_WORKERS
     ) -> None:
         """
         Initializes a XaerosWaypointHandler instance.
@@ -84,6 +128,10 @@ class XaerosWaypointHandler(DirectoryWaypointModHandler):
             The path to the directory where waypoints are stored, to be used as
             output from the converter. If not provided, defaults to the same
             as `input_directory_path`.
+
+        io_workers : int, default=DEFAULT_IO_WORKERS
+            The number of dimension files handled at the same time.
+            1 handles them one after another, without any threads.
         """
 
         input_dir = input_directory_path or Path(
@@ -101,12 +149,43 @@ class XaerosWaypointHandler(DirectoryWaypointModHandler):
             extension_of_files='txt'
         )
 
+        # the non-waypoint lines of each file read, kept so that writing
+        # the file again does not need to read it first
+        self._unparsed_lines : dict[str, UnparsedLines] = {}
+
+        # the unreadable lines already reported, as a file can be read
+        # more than once in a run
+        self._reported_lines : set[tuple[str, str]] = set()
+
+        self.io_workers : int = max(io_workers, 1)
+        self._io_executor : 'ThreadPoolExecutor | None' = None
+
 
 
     ####################################################################
     #####              WaypointsModHandler Overrides               #####
     ####################################################################
 
+    @override
+    @classmethod
+    def create(
+            cls,
+            convert_here : bool = False,
+            **options
+        ) -> 'XaerosWaypointHandler':
+
+        handler_options = {}
+
+        if options.get('io_workers') is not None:
+            handler_options['io_workers'] = options['io_workers']
+
+        if convert_here:
+            handler_options['input_directory_path'] = \
+                cls._get_convert_here_directory()
+
+        return cls(**handler_options)
+
+
     @override
     def parse_world_name(world_name : str) -> str:
         # Xaero's world name format is:
@@ -136,124 +215,66 @@ class XaerosWaypointHandler(DirectoryWaypointModHandler):
 
 
     @override
-    def get_world_name(self, search_name : str) -> str | None:
-        
-        return self._get_specific_world_name(search_name=search_name)
+    @traced
+    def get_world_name(
+            self,
+            search_name : str,
+            ambiguity : str = 'prompt'
+        ) -> str | None:
+
+        return self._get_specific_world_name(
+            search_name=search_name,
+            ambiguity=ambiguity
+        )
+
+
+    @override
+    def _get_world_location(self, file_name : str) -> str:
+
+        return self._get_world_directory(world_name=file_name)
+
+
+    @override
+    def get_world_files(self, world : WorldRef) -> list[Path]:
+
+        world_files : list[Path] = []
+
+        try:
+            with os.scandir(world.location) as entries:
+                for entry in entries:
+
+                    waypoint_file_path = Path(entry.path, WAYPOINT_FILE_NAME)
+
+                    if entry.is_dir() and waypoint_file_path.is_file():
+                        world_files.append(waypoint_file_path)
+
+        except (FileNotFoundError, NotADirectoryError):
+            pass
+
+        return world_files
+
+
+    @override
+    @traced
+    def get_worlds_with_waypoints(self) -> list[str]:
+
+        return self.world_catalog.list_subdirectories(self.input_directory_path)
 
 
     # TODO create dict and tuples of sp/mp worlds
     @override
+    @traced
     def _get_worlds(self) -> list[str]:
 
-        worlds_with_created_wps = os.listdir(self.base_directory_path)
-        worlds_singleplayer = os.listdir(os.path.join(
-            os.getenv('APPDATA'),
-            '.minecraft',
-            'saves'
-        ))
-        worlds_multiplayer_file = FileHandler(
-            extension=MinecraftDatFile,
-            full_path=os.path.join(
-                os.getenv('APPDATA'),
-                '.minecraft',
-                'servers.dat'
-            )
-        )
-        worlds_multiplayer = []
-
-        for server in worlds_multiplayer_file.read()['servers']:
-            worlds_multiplayer.append(f'{server['name']} (ip: {server['ip']})')
+        worlds_with_created_wps = self.get_worlds_with_waypoints()
+        worlds_in_game = self.world_catalog.get_game_worlds()
 
-        return worlds_with_created_wps + worlds_singleplayer + worlds_multiplayer
+        return worlds_with_created_wps + worlds_in_game
     
 
     @override
-    def _get_world_waypoints(self, world_name : str) -> dict:
-
-        def get_dimension_name(dir_name : str) -> str:
-            """
-            Gets the name of the dimension from the name of the
-            directory.
-
-            Parameters
-            ----------
-            dir_name : str
-                the name of the directory to get the dimension from
-
-            Returns
-            -------
-            str
-                the name of the dimension
-            """
-
-            dir_name = dir_name.replace('dim%', '')
-
-            try:
-                dimension_int = int(dir_name)
-
-                # unaware of custom dimension ints
-                dimensions = ['overworld', 'end', 'nether']
-                return dimensions[dimension_int]
-            
-            except (IndexError, ValueError):
-                print_script_message(f'Dimension in folder {dir_name} is invalid')
-                return 'filler_dimension'
-            
-        
-        def get_formatted_wp_dict(line_data : str) -> dict | None:
-            """
-            Creates the formatted waypoint dict from the line.
-
-            Parameters
-            ----------
-            line_data : str
-                the line from the file
-
-            Returns
-            -------
-            dict
-                the formatted waypoint dict,
-                None,   if the line does not contain waypoint data
-                        or upon error
-            """
-            if line_data.startswith('sets') or line_data.startswith('#'):
-                return None
-                
-            line_data = line_data.split(':')
-
-            try:
-                waypoint_format = {
-                    'name' : line_data[1], 
-                    'initials' : line_data[2],
-                    'x' : line_data[3],
-                    'y' : line_data[4],
-                    'z' : line_data[5],
-                    'color' : line_data[6],
-                    'disabled' : line_data[7],
-                    'type' : line_data[8],
-                    'set' : line_data[9], 
-                    'rotate_on_tp' : line_data[10], 
-                    'tp_yaw' : line_data[11], 
-                    'visibility_type' : line_data[12],
-                    'destination' : line_data[13]
-                }
-
-                return waypoint_format
-
-            except (ValueError, IndexError):
-                print_script_message(f'Error in line parsing: {line_data}')
-                return None
-
-
-        found_world = self._get_specific_world_name(search_name=world_name)
-
-        if not found_world:
-            raise Exception(
-                'This should not happen, since the given world name is'
-                ' the exact way it appears in the Xaero\'s dir.'
-            )
-
-        world_dir = self._get_world_directory(world_name=found_world)
+    @traced
+    def _get_world_waypoints(self, world : WorldRef) -> dict:
 
         waypoints = {
             'overworld' : {},
@@ -261,59 +282,58 @@ class XaerosWaypointHandler(DirectoryWaypointModHandler):
             'end' : {}
         }
 
-        for item in os.listdir(world_dir):
+        dimension_files = self._get_dimension_files(world=world)
 
-            item_path = os.path.join(world_dir, item)
-            if not os.path.isdir(item_path):
-                continue
-
-            dimension = get_dimension_name(item)
-
-            waypoint_file = FileHandler.exact_path(
-                full_path=os.path.join(item_path, 'mw$default_1.txt'),
-                extension=TxtFile
-            )
+        dimension_waypoints = self._map_io(
+            self._read_waypoint_file,
+            [waypoint_file_path for _, waypoint_file_path in dimension_files]
+        )
 
-            waypoint_file_data = waypoint_file.read()
+        for (dimension, _), file_waypoints in zip(dimension_files, dimension_waypoints):
+            waypoints.setdefault(dimension, {}).update(file_waypoints)
 
-            for line in waypoint_file_data:
+        return waypoints
 
-                formatted_wp_dict = get_formatted_wp_dict(line_data=line)
-                if not formatted_wp_dict:
-                    continue
 
-                waypoints[dimension][formatted_wp_dict['name']] = formatted_wp_dict
+    @override
+    def _get_specific_world_name(
+            self,
+            search_name : str,
+            ambiguity : str = 'prompt'
+        ) -> str | None:
 
-        return waypoints
+        # an exact name, such as a file system name found earlier,
+        # needs no searching or choosing
+        exact_matches = self._get_world_search_index().exact_matches(search_name)
 
+        if len(exact_matches) == 1:
+            return exact_matches[0]
 
-    @override
-    def _get_specific_world_name(self, search_name : str) -> str | None:
-        
         matching_servers = self._get_matching_servers(search_name=search_name)
 
+        # names that are only similar to the search may be other worlds,
+        # so they are never taken without being chosen
         if len(matching_servers) == 0:
-            print_script_message(
-                f'No servers matching the name "{search_name}" were found.'
+            return self._choose_similar_match(
+                search_name=search_name,
+                ambiguity=ambiguity
             )
-            return None
 
         if len(matching_servers) == 1:
             return matching_servers[0]
 
-        return self._choose_server(matching_servers)
+        return self._choose_match(
+            search_name=search_name,
+            matching_servers=matching_servers,
+            ambiguity=ambiguity
+        )
 
 
     # TODO search tuples
     @override
     def _get_matching_servers(self, search_name : str) -> list[str]:
 
-        return list(
-            filter(
-                lambda server_name: search_name.lower() in server_name.lower(),
-                self._get_worlds()
-            )
-        )
+        return self._get_world_search_index().search(search_name, fuzzy=False)
 
 
     @override
@@ -328,189 +348,201 @@ class XaerosWaypointHandler(DirectoryWaypointModHandler):
     
 
     @override
-    def convert_from_mod_to_standard(self, world_name : str) -> dict:
-        
-        standardized_dict = self._create_standardized_dict(world_name=world_name)
-
-        standardized_dict = {
-            key: value for (key, value) in standardized_dict.items() if value
-        }
+    @traced
+    def convert_from_mod_to_table(self, world : WorldRef) -> WaypointTable:
 
-        return standardized_dict
+        world_waypoints = self._get_world_waypoints(world=world)
 
-
-    @override
-    def _create_standardized_dict(self, world_name : str) -> dict:
-        
-        world_waypoints = self._get_world_waypoints(world_name=world_name)
-
-        standardized_format = {
-            'overworld' : {},
-            'nether' : {},
-            'end' : {}
-        }
-
-        for dimension in world_waypoints:
-            for dimension_wp_name, dimension_wp_data in world_waypoints[dimension].items():
-                
-                standardized_format[dimension][dimension_wp_name] = {
-                    'coordinates' : {
-                        'x' : dimension_wp_data['x'],
-                        'y' : dimension_wp_data['y'],
-                        'z' : dimension_wp_data['z']
-                    },
-                    'color' : dimension_wp_data['color'],
-                    'visible' : dimension_wp_data['disabled']
-                }
-
-        return standardized_format
+        return self._create_waypoint_table(world_waypoints)
 
 
     """
     Xaero's waypoint dict format
     {
         'DIMENSION_NAME' : {
-            'WAYPOINT_NAME' : {
-                'name' : line_data[1], 
-                'initials' : line_data[2],
-                'x' : line_data[3],
-                'y' : line_data[4],
-                'z' : line_data[5],
-                'color' : line_data[6],
-                'disabled' : False, # default
-                'type' : 0, # default
-                'set' : 'gui.xaero_default', # default
-                'rotate_on_tp' : False, # default
-                'tp_yaw' : 0, # default
-                'visibility_type' : 0, # default
-                'destination' : False # default
-            },
+            'WAYPOINT_NAME' : XaerosWaypoint(
+                name = line_data[1], 
+                initials = line_data[2],
+                x = line_data[3],
+                y = line_data[4],
+                z = line_data[5],
+                color = line_data[6],
+                disabled = False, # default
+                type = 0, # default
+                set = 'gui.xaero_default', # default
+                rotate_on_tp = False, # default
+                tp_yaw = 0, # default
+                visibility_type = 0, # default
+                destination = False # default
+            ),
             ...
         },
         ...
     }
     """
     @override
+    @traced
     def convert_from_standard_to_mod(
         self, 
-        standard_data : dict,
-        world_name : str
+        standard_data : WaypointTable,
+        world : WorldRef
     ) -> bool:
         
-        existing_waypoints = self._get_world_waypoints(world_name=world_name)
-        wps_to_add = {
-            'overworld' : {},
-            'nether' : {},
-            'end' : {}
-        }
-
-        for dimension, waypoints in standard_data.items():
-            for wp_name, wp_data in waypoints.items():
-
-                # remove duplicate waypoint names, despite Xaero's
-                # support for duplicate waypoint names, to prevent
-                # undesired waypoint duplication if converted multiple
-                # times
-                if wp_name in existing_waypoints:
-                    print_script_message(f'Waypoint with name "{wp_name}" already exists, skipping...')
-                    continue
-
-                wps_to_add[dimension][wp_name] = self._create_mod_waypoint_dict(
-                    standard_wp_dict=wp_data,
-                    waypoint_name=wp_name
-                )
+        existing_waypoints = self._get_world_waypoints(world=world)
 
-        combined_waypoints = merge_dicts(existing_waypoints, wps_to_add)
+        combined_waypoints = self._combine_waypoints(
+            existing_waypoints=existing_waypoints,
+            standard_data=standard_data
+        )
 
         return  self._add_waypoints_to_mod(
-                    world_name=world_name,
+                    world=world,
                     waypoints=combined_waypoints
                 )
 
 
     @override
+    @traced
     def _add_waypoints_to_mod(self, 
-                              world_name: str, 
+                              world: WorldRef, 
                               waypoints: dict
     ) -> bool:
 
-        dir_path = self._get_world_directory(world_name=world_name)
-        
-        output_files : dict[str, FileHandler] = {
-            'overworld' : FileHandler.exact_path(
-                full_path=os.path.join(dir_path, 'dim%0', 'mw$default_1.txt'),
-                extension=TxtFile
-            ),
-            'nether' : FileHandler.exact_path(
-                full_path=os.path.join(dir_path, 'dim%-1', 'mw$default_1.txt'),
-                extension=TxtFile
+        dimension_writes = self._get_dimension_writes(world=world, waypoints=waypoints)
+
+        write_results = self._map_io(
+            lambda dimension_write: self._write_to_waypoint_file(
+                waypoint_file_path=dimension_write[1],
+                mod_formatted_waypoints=dimension_write[2]
             ),
-            'end' : FileHandler.exact_path(
-                full_path=os.path.join(dir_path, 'dim%1', 'mw$default_1.txt'),
-                extension=TxtFile
-            )
-        }
+            dimension_writes
+        )
 
-        error_in_write = False
+        return all([
+            self._report_write(dimension, write_successful)
+            for (dimension, _, _), write_successful in zip(dimension_writes, write_results)
+        ])
 
-        for dimension, dimension_waypoints in waypoints.items():
 
-            dimension : str
+ 
+    @override
+    def convert_here(self) -> None:
 
-            write_successful = self._write_to_waypoint_file(
-                waypoint_file=output_files[dimension],
-                mod_formatted_waypoints=dimension_waypoints
-            )
+        convert_here_dir = self._get_convert_here_directory()
 
-            if write_successful:
-                print_script_message(f'{dimension.title()} waypoints written.')
-            else:
-                error_in_write = True
-                print_script_message(f'Failure writing {dimension.title()} waypoints.')
+        self.input_directory_path = convert_here_dir
+        self.output_directory_path = convert_here_dir
 
-        return not error_in_write
+
+    @override
+    @traced
+    def create_backup(self, world : WorldRef) -> bool:
+
+        return self.backup_store.back_up_files(
+            run_id=get_run_id(),
+            mod_name=self.mod_name,
+            world_name=world.file_name,
+            files={
+                Path(os.path.relpath(file_path, world.location)).as_posix() : file_path
+                for file_path in self.get_world_files(world=world)
+            },
+            io_executor=self._get_io_executor()
+        )
+
+
+
+    ####################################################################
+    #####                  Async Method Overrides                  #####
+    ####################################################################
+
+    @override
+    async def convert_from_mod_to_table_async(
+            self,
+            world : WorldRef
+        ) -> WaypointTable:
+
+        world_waypoints = await self._get_world_waypoints_async(world=world)
+
+        return self._create_waypoint_table(world_waypoints)
 
 
- 
     @override
-    def create_backup(self, world_name : str) -> bool:
+    async def convert_from_standard_to_mod_async(
+            self,
+            standard_data : WaypointTable,
+            world : WorldRef
+        ) -> bool:
 
-        world_dir = self._get_world_directory(world_name=world_name)
+        existing_waypoints = await self._get_world_waypoints_async(world=world)
 
-        for item in os.listdir(world_dir):
+        combined_waypoints = self._combine_waypoints(
+            existing_waypoints=existing_waypoints,
+            standard_data=standard_data
+        )
 
-            item_path = os.path.join(world_dir, item)
-            if not os.path.isdir(item_path):
-                continue
+        return await self._add_waypoints_to_mod_async(
+            world=world,
+            waypoints=combined_waypoints
+        )
 
-            # read file with FileHandler
-            waypoint_file = FileHandler.exact_path(
-                full_path=os.path.join(item_path, 'mw$default_1.txt'),
-                extension=TxtFile
-            )
 
-            waypoint_file_data = waypoint_file.read()
-
-            backup_file = FileHandler.exact_path(
-                full_path=Path(
-                    os.getcwd(),
-                    'minecraft-waypoint-converter',
-                    'data',
-                    'backups',
-                    self.get_datetime(),
-                    'xaero\'s minimap',
-                    world_name,
-                    item,
-                    'mw$default_1.txt'
-                ),
-                extension=TxtFile
-            )
+    async def _get_world_waypoints_async(self, world : WorldRef) -> dict:
+        """
+        Async variant of `_get_world_waypoints`, reading the dimension
+        files of the world concurrently.
+        """
+
+        # imported here, as in the base class
+        import asyncio
+
+        dimension_files = await asyncio.to_thread(
+            self._get_dimension_files, world=world
+        )
+
+        dimension_waypoints = await asyncio.gather(*(
+            asyncio.to_thread(self._read_waypoint_file, waypoint_file_path)
+            for _, waypoint_file_path in dimension_files
+        ))
+
+        waypoints = {
+            'overworld' : {},
+            'nether' : {},
+            'end' : {}
+        }
+
+        for (dimension, _), file_waypoints in zip(dimension_files, dimension_waypoints):
+            waypoints.setdefault(dimension, {}).update(file_waypoints)
+
+        return waypoints
 
-            if not backup_file.write(data = waypoint_file_data):
-                print_script_message('Error creating Xaero\'s Minimap backup file.')
-                return False
 
-        return True
+    async def _add_waypoints_to_mod_async(
+            self,
+            world : WorldRef,
+            waypoints : dict
+        ) -> bool:
+        """
+        Async variant of `_add_waypoints_to_mod`, writing the dimension
+        files of the world concurrently.
+        """
+
+        import asyncio
+
+        dimension_writes = self._get_dimension_writes(world=world, waypoints=waypoints)
+
+        write_results = await asyncio.gather(*(
+            asyncio.to_thread(
+                self._write_to_waypoint_file,
+                waypoint_file_path=waypoint_file_path,
+                mod_formatted_waypoints=dimension_waypoints
+            )
+            for _, waypoint_file_path, dimension_waypoints in dimension_writes
+        ))
+
+        return all([
+            self._report_write(dimension, write_successful)
+            for (dimension, _, _), write_successful in zip(dimension_writes, write_results)
+        ])
 
 
 
@@ -521,7 +553,7 @@ class XaerosWaypointHandler(DirectoryWaypointModHandler):
     @override
     def _get_world_directory(self, world_name : str) -> str:
 
-        return os.path.join(self.base_directory_path, world_name)
+        return os.path.join(self.input_directory_path, world_name)
     
     
 
@@ -529,62 +561,422 @@ class XaerosWaypointHandler(DirectoryWaypointModHandler):
     #####                       Other Methods                      #####
     ####################################################################
 
-    def _create_mod_waypoint_dict(
-            self, 
-            standard_wp_dict : dict, 
-            waypoint_name : str
+    @staticmethod
+    def _get_convert_here_directory() -> Path:
+        """
+        Gets the waypoints directory in the predefined directory
+        `minecraft-waypoint-converter/data/convert-here`.
+        """
+
+        return Path(
+            os.getcwd(),
+            'minecraft-waypoint-converter',
+            'data',
+            'convert-here',
+            'xaero\'s minimap'
+        )
+
+
+    def _get_dimension_files(self, world : WorldRef) -> list[tuple[str, str]]:
+        """
+        Gets the waypoint file of each dimension directory of a world.
+
+        Parameters
+        ----------
+        world : WorldRef
+            the world to get the files of
+
+        Returns
+        -------
+        list[tuple[str, str]]
+            the name of the dimension and the path of its waypoint file
+        """
+
+        dimension_files : list[tuple[str, str]] = []
+
+        for item in os.listdir(world.location):
+
+            item_path = os.path.join(world.location, item)
+            if not os.path.isdir(item_path):
+                continue
+
+            waypoint_file_path = os.path.join(item_path, WAYPOINT_FILE_NAME)
+            if not os.path.isfile(waypoint_file_path):
+                continue
+
+            dimension_files.append(
+                (self._get_dimension_name(item), waypoint_file_path)
+            )
+
+        return dimension_files
+
+
+    @staticmethod
+    def _get_dimension_name(dir_name : str) -> str:
+        """
+        Gets the name of the dimension from the name of the
+        directory.
+
+        Parameters
+        ----------
+        dir_name : str
+            the name of the directory to get the dimension from
+
+        Returns
+        -------
+        str
+            the name of the dimension
+        """
+
+        for dimension, dimension_dir in DIMENSION_DIRECTORIES.items():
+            if dir_name == dimension_dir:
+                return dimension
+
+        if not dir_name.startswith('dim%'):
+            print_script_message(f'Dimension in folder {dir_name} is invalid')
+            return 'filler_dimension'
+
+        # modded dimensions keep the name of their directory, so that
+        # they are written back to it
+        return dir_name
+
+
+    @traced
+    def _read_waypoint_file(
+            self,
+            waypoint_file_path : str
+        ) -> dict[str, XaerosWaypoint]:
+        """
+        Reads the waypoints of a dimension file, keeping the lines that
+        are not waypoints for when it is written again, and reporting
+        the waypoint lines that could not be read.
+
+        Parameters
+        ----------
+        waypoint_file_path : str
+            the path of the dimension file
+
+        Returns
+        -------
+        dict[str, XaerosWaypoint]
+            the waypoints of the file, keyed by name
+        """
+
+        unparsed_lines = UnparsedLines()
+
+        dimension_waypoints = {
+            waypoint.name : waypoint
+            for waypoint in iter_waypoint_file(waypoint_file_path, unparsed_lines)
+        }
+
+        self._unparsed_lines[waypoint_file_path] = unparsed_lines
+        self._report_unreadable_lines(waypoint_file_path, unparsed_lines)
+
+        return dimension_waypoints
+
+
+    def _report_unreadable_lines(
+            self,
+            waypoint_file_path : str,
+            unparsed_lines : UnparsedLines
+        ) -> None:
+        """
+        Reports the waypoint lines of a file that could not be parsed,
+        and are kept as they are rather than converted. Each line is
+        reported once, however many times the file is read.
+        """
+
+        reporter = get_reporter()
+
+        for line in unparsed_lines.unreadable_lines():
+            if (waypoint_file_path, line) in self._reported_lines:
+                continue
+
+            self._reported_lines.add((waypoint_file_path, line))
+
+            # bytes that are not valid UTF-8 are shown as replacement
+            # characters, since the event is printed or written as JSON
+            reporter.emit(UnreadableWaypointLine(
+                os.fspath(waypoint_file_path),
+                line.encode('utf-8', 'surrogateescape').decode('utf-8', 'replace')
+            ))
+
+
+    def _create_waypoint_table(self, world_waypoints : dict) -> WaypointTable:
+        """
+        Creates the standardized table of a world's waypoints, as read
+        by `_get_world_waypoints`.
+        """
+
+        table = WaypointTable()
+
+        for dimension, dimension_waypoints in world_waypoints.items():
+            for dimension_wp_data in dimension_waypoints.values():
+
+                dimension_wp_data : XaerosWaypoint
+
+                table.append(
+                    name=dimension_wp_data.name,
+                    dimension=dimension,
+                    x=dimension_wp_data.x,
+                    y=dimension_wp_data.y,
+                    z=dimension_wp_data.z,
+                    color=dimension_wp_data.color,
+                    visible=not dimension_wp_data.disabled,
+                    set_name=dimension_wp_data.set
+                )
+
+        return table
+
+
+    def _combine_waypoints(
+            self,
+            existing_waypoints : dict,
+            standard_data : WaypointTable
         ) -> dict:
+        """
+        Adds the standardized waypoints to the world's existing waypoints,
+        skipping the waypoints whose names already exist in their
+        dimension.
 
-        xaeros_dict = {
-            'name' : waypoint_name, 
-            'initials' : waypoint_name[0].title(),
-            'x' : int(standard_wp_dict['coordinates']['x']),
-            'y' : int(standard_wp_dict['coordinates']['y']),
-            'z' : int(standard_wp_dict['coordinates']['z']),
-            'color' : int(standard_wp_dict['color']),
-            'disabled' : not bool(standard_wp_dict['visible']),
-            'type' : 0, # default
-            'set' : 'gui.xaero_default', # default
-            'rotate_on_tp' : False, # default
-            'tp_yaw' : 0, # default
-            'visibility_type' : 0, # default
-            'destination' : False # default
+        Parameters
+        ----------
+        existing_waypoints : dict
+            the world's waypoints, as read by `_get_world_waypoints`
+        standard_data : WaypointTable
+            the standardized waypoints to add
+
+        Returns
+        -------
+        dict
+            the combined waypoints, in Xaero's waypoint dict format
+        """
+
+        wps_to_add = {
+            'overworld' : {},
+            'nether' : {},
+            'end' : {}
+        }
+
+        # the existing waypoints are grouped by dimension, so they are
+        # indexed by dimension and name to look each new waypoint up once
+        existing_keys = {
+            waypoint_key(dimension, wp_name)
+            for dimension, dimension_waypoints in existing_waypoints.items()
+            for wp_name in dimension_waypoints
         }
 
-        return xaeros_dict
+        # Xaero's stores block coordinates, which the table floors for
+        # every waypoint at once
+        reporter = get_reporter()
+
+        for (
+            wp_name, dimension, x, y, z, color, visible, set_name
+        ) in standard_data.rows(block_coordinates=True):
+
+            key = waypoint_key(dimension, wp_name)
+
+            # remove duplicate waypoint names, despite Xaero's
+            # support for duplicate waypoint names, to prevent
+            # undesired waypoint duplication if converted multiple
+            # times
+            if key in existing_keys:
+                reporter.emit(DuplicateSkipped(self.mod_name, wp_name))
+                continue
+
+            existing_keys.add(key)
+
+            wps_to_add.setdefault(dimension, {})[wp_name] = \
+                self._create_mod_waypoint_dict(
+                    waypoint_name=wp_name,
+                    x=x,
+                    y=y,
+                    z=z,
+                    color=color,
+                    visible=visible,
+                    set_name=set_name
+                )
+
+        return merge_dicts(existing_waypoints, wps_to_add)
+
+
+    def _get_dimension_writes(
+            self,
+            world : WorldRef,
+            waypoints : dict
+        ) -> list[tuple[str, str, dict]]:
+        """
+        Gets the file each dimension's waypoints are written to.
+        Dimensions without a known directory are skipped.
+
+        Returns
+        -------
+        list[tuple[str, str, dict]]
+            the dimension, the path of its waypoint file, and its waypoints
+        """
+
+        dimension_writes = []
+
+        for dimension, dimension_waypoints in waypoints.items():
+
+            dimension : str
+
+            dimension_dir = DIMENSION_DIRECTORIES.get(
+                dimension,
+                dimension if dimension.startswith('dim%') else None
+            )
+
+            if dimension_dir is None:
+                print_script_message(
+                    f'No Xaero\'s directory for dimension {dimension}, skipping...'
+                )
+                continue
+
+            dimension_writes.append((
+                dimension,
+                os.path.join(world.location, dimension_dir, WAYPOINT_FILE_NAME),
+                dimension_waypoints
+            ))
+
+        return dimension_writes
+
+
+    def _map_io(
+            self,
+            function : Callable[[_T], _R],
+            items : Iterable[_T]
+        ) -> list[_R]:
+        """
+        Calls `function` on every item, on the I/O threads when there is
+        more than one item and more than one I/O worker.
+
+        Parameters
+        ----------
+        function : Callable[[_T], _R]
+            the I/O to do for each item
+        items : Iterable[_T]
+            the items, such as the dimension files of a world
+
+        Returns
+        -------
+        list[_R]
+            the results, in the order of `items`
+        """
+
+        items = list(items)
+
+        if self.io_workers == 1 or len(items) <= 1:
+            return [function(item) for item in items]
+
+        return list(self._get_io_executor().map(function, items))
+
+
+    def _get_io_executor(self) -> 'Executor | None':
+        """
+        Gets the pool of I/O threads, creating it the first time it is
+        needed. None if I/O is done one file at a time.
+        """
+
+        if self.io_workers == 1:
+            return None
+
+        if self._io_executor is None:
+
+            # imported here, since only worlds with several dimension
+            # files use the pool
+            from concurrent.futures import ThreadPoolExecutor
+
+            self._io_executor = ThreadPoolExecutor(
+                max_workers=self.io_workers,
+                thread_name_prefix='xaeros-io'
+            )
+
+        return self._io_executor
+
+
+    @override
+    def close(self) -> None:
+
+        # the pool is created again if the handler is used after this
+        if self._io_executor is not None:
+            self._io_executor.shutdown(wait=True)
+            self._io_executor = None
+
+
+    def _report_write(self, dimension : str, write_successful : bool) -> bool:
+        """
+        Reports whether a dimension's waypoints were written, and returns
+        `write_successful`.
+        """
+
+        get_reporter().emit(WaypointsWritten(self.mod_name, dimension, write_successful))
+
+        return write_successful
+
+
+    def _create_mod_waypoint_dict(
+            self, 
+            waypoint_name : str,
+            x : int,
+            y : int,
+            z : int,
+            color : int,
+            visible : bool,
+            set_name : str | None
+        ) -> XaerosWaypoint:
+
+        xaeros_waypoint = XaerosWaypoint(
+            name = waypoint_name, 
+            initials = waypoint_name[0].title(),
+            x = x,
+            y = y,
+            z = z,
+            color = color,
+            disabled = not visible,
+            type = 0, # default
+            set = set_name or 'gui.xaero_default', # default
+            rotate_on_tp = False, # default
+            tp_yaw = 0, # default
+            visibility_type = 0, # default
+            destination = False # default
+        )
+
+        return xaeros_waypoint
     
 
+    @traced
     def _write_to_waypoint_file(
             self,
-            waypoint_file : FileHandler,
+            waypoint_file_path : str,
             mod_formatted_waypoints : dict
         ) -> bool:
 
-        lines_to_write = self._get_headers_(waypoint_file=waypoint_file)
-
-        for wp_name, wp_data in mod_formatted_waypoints.items():
+        unparsed_lines = self._unparsed_lines.get(waypoint_file_path)
 
-            line_format = \
-                f'waypoint:{wp_name}:{wp_data['initials']}:{wp_data['x']}:' \
-                f'{wp_data['y']}:{wp_data['z']}:{wp_data['color']}:' \
-                f'{str(wp_data['disabled']).lower()}:{wp_data['type']}:{wp_data['set']}:' \
-                f'{str(wp_data['rotate_on_tp']).lower()}:{wp_data['tp_yaw']}:' \
-                f'{wp_data['visibility_type']}:{str(wp_data['destination']).lower()}'.strip()
-            
-            lines_to_write.append(line_format)
+        if unparsed_lines is None:
+            unparsed_lines = self._get_unparsed_lines(waypoint_file_path=waypoint_file_path)
 
-        return waypoint_file.write(data=lines_to_write)       
+        return write_waypoint_file(
+            file_path=waypoint_file_path,
+            unparsed_lines=unparsed_lines,
+            waypoints=mod_formatted_waypoints.values()
+        )
         
 
-    def _get_headers_(
+    def _get_unparsed_lines(
             self,
-            waypoint_file : FileHandler,
-        ) -> list[str]:
+            waypoint_file_path : str,
+        ) -> UnparsedLines:
 
-        if waypoint_file.is_empty():
-            return []
-        
-        file_lines : list[str] = waypoint_file.read()
+        unparsed_lines = UnparsedLines()
+
+        # the waypoints themselves are read again by the caller, only
+        # the lines that are not parsed waypoints are kept
+        try:
+            for _ in iter_waypoint_file(waypoint_file_path, unparsed_lines):
+                pass
+
+        except FileNotFoundError:
+            return UnparsedLines()
 
-        return [line.strip() for line in file_lines if not line.startswith('waypoint')]
-    
\ No newline at end of file
+        return unparsed_lines
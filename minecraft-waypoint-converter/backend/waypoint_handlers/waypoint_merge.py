@@ -0,0 +1,176 @@
+"""waypoint_merge.py
+
+Contains a class that merges the waypoints of several sources into a
+single table, skipping the waypoints that more than one source has.
+"""
+
+from .waypoint_table import WaypointTable
+
+
+
+def normalize_waypoint_name(name : str) -> str:
+    """
+    Normalizes a waypoint name for comparing it with others, so that
+    names differing only in case or whitespace are the same waypoint.
+
+
+    Parameters
+    ----------
+    name : str
+        The name of the waypoint.
+
+
+    Returns
+    -------
+    str
+        The normalized name.
+    """
+
+    return ' '.join(name.split()).casefold()
+
+
+def waypoint_key(dimension : str, name : str) -> tuple[str, str]:
+    """
+    Gets the key waypoints are told apart by when merging, which is
+    their dimension along with their normalized name.
+    """
+
+    return dimension, normalize_waypoint_name(name)
+
+
+
+class WaypointMerger:
+    """
+    A class that merges waypoints into a single table, keeping only the
+    first of the waypoints that share a dimension and normalized name.
+
+    Each waypoint is looked up once in a hash index of the keys merged
+    so far, so merging is linear in the number of waypoints. Sources
+    added earlier take precedence over those added later, and the
+    merged table keeps the order the waypoints were added in.
+
+
+    Attributes
+    ----------
+    table : WaypointTable
+        The merged waypoints.
+
+    duplicate_count : int
+        The number of waypoints skipped, since a waypoint with the same
+        key was already merged.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty WaypointMerger instance.
+        """
+
+        self.table : WaypointTable = WaypointTable()
+        self.duplicate_count : int = 0
+        self._index : set[tuple[str, str]] = set()
+
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+
+    def __contains__(self, key : tuple[str, str]) -> bool:
+        return key in self._index
+
+
+    def add(self, waypoints : WaypointTable) -> int:
+        """
+        Merges the waypoints of a source into the table.
+
+
+        Parameters
+        ----------
+        waypoints : WaypointTable
+            The waypoints of the source.
+
+
+        Returns
+        -------
+        int
+            The number of waypoints added to the table.
+        """
+
+        added_count = 0
+
+        for row in waypoints.rows():
+
+            key = waypoint_key(row[1], row[0])
+
+            if key in self._index:
+                self.duplicate_count += 1
+                continue
+
+            self._index.add(key)
+            self.table.append(*row)
+            added_count += 1
+
+        return added_count
+
+
+    def missing_from(
+            self,
+            waypoints : WaypointTable
+        ) -> WaypointTable:
+        """
+        Gets the merged waypoints that a source does not have, which are
+        the waypoints to add to it for it to hold the whole merge.
+
+
+        Parameters
+        ----------
+        waypoints : WaypointTable
+            The waypoints of the source.
+
+
+        Returns
+        -------
+        WaypointTable
+            The merged waypoints whose keys are not in the source.
+        """
+
+        source_keys = {
+            waypoint_key(row[1], row[0])
+            for row in waypoints.rows()
+        }
+
+        missing = WaypointTable()
+
+        for row in self.table.rows():
+            if waypoint_key(row[1], row[0]) not in source_keys:
+                missing.append(*row)
+
+        return missing
+
+
+
+def merge_waypoints(
+        *sources : WaypointTable
+    ) -> WaypointTable:
+    """
+    Merges the waypoints of several sources into a single table, see
+    `WaypointMerger`.
+
+
+    Parameters
+    ----------
+    *sources : WaypointTable
+        The waypoints of each source, in order of precedence.
+
+
+    Returns
+    -------
+    WaypointTable
+        The merged waypoints.
+    """
+
+    merger = WaypointMerger()
+
+    for waypoints in sources:
+        merger.add(waypoints)
+
+    return merger.table
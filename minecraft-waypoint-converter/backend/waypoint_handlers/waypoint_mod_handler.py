@@ -5,8 +5,23 @@ a waypoint mod.
 Class is written as an abstract class.
 """
 
+import hashlib
 from abc import ABC, abstractmethod
-from datetime import datetime
+from pathlib import Path
+
+from lunapyutils import print_script_message
+
+from .backup_store import BackupStore, get_backup_store
+from .waypoint_table import WaypointTable
+from .world_catalog import WorldCatalog, get_world_catalog
+from .world_search_index import AmbiguousWorldError, WorldSearchIndex
+from .world_ref import WorldRef
+
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .backup_archive import BackupArchive
 
 
 
@@ -18,21 +33,66 @@ class WaypointModHandler(ABC):
     
     Attributes
     ----------
-    waypoint_list : dict
-        The list of all the waypoints in all the worlds/servers
-        that the mod has created waypoints for. Formatted in the
-        standard waypoint save format used in `StandardWorldWaypoints`.
+    mod_name : str
+        The name of the mod, set by each subclass.
 
-    time_created : datetime.datetime
-        The date and time that the instance was created.
+    world_catalog : WorldCatalog
+        The index of the worlds/servers on the file system, shared by
+        all mod handlers.
+
+    backup_store : BackupStore | BackupArchive
+        The store that backups of the waypoint files are created in,
+        shared by all mod handlers.
     """
 
+    mod_name : str = None
+
     def __init__(self) -> None: 
         """
         Initializes a WaypointModHandler instance.
         """
-        self.waypoint_list = {}
-        self.time_created = datetime.now()
+        self.world_catalog : WorldCatalog = get_world_catalog()
+        self.backup_store : BackupStore | BackupArchive = get_backup_store()
+
+        self._world_search_index : WorldSearchIndex | None = None
+        self._world_search_source : list[str] | None = None
+
+
+    @classmethod
+    def create(
+            cls,
+            convert_here : bool = False,
+            **options
+        ) -> 'WaypointModHandler':
+        """
+        Creates a handler for a conversion. The same options are given to
+        the handler of every mod, so a mod ignores the options it does
+        not support.
+
+        
+        Parameters
+        ----------
+        convert_here : bool, default=False
+            True,   if the handler should use the predefined directory
+                    `minecraft-waypoint-converter/data/convert-here`
+            False,  otherwise
+
+        **options
+            Options for the handler, such as `io_workers`.
+
+            
+        Returns
+        -------
+        WaypointModHandler
+            The created handler.
+        """
+
+        handler = cls()
+
+        if convert_here:
+            handler.convert_here()
+
+        return handler
 
 
 
@@ -87,7 +147,11 @@ class WaypointModHandler(ABC):
     ####################################################################
 
     @abstractmethod
-    def get_world_name(self, search_name : str) -> str | None:
+    def get_world_name(
+            self,
+            search_name : str,
+            ambiguity : str = 'prompt'
+        ) -> str | None:
         """
         Finds and returns the desired world's name on the file system
         for the mod.
@@ -98,6 +162,10 @@ class WaypointModHandler(ABC):
         search_name : str
             Part of the world name to be searched for.
 
+        ambiguity : str, default='prompt'
+            How a search matching several worlds is settled, one of
+            `AMBIGUITY_POLICIES`.
+
             
         Returns
         -------
@@ -107,6 +175,125 @@ class WaypointModHandler(ABC):
         """
 
 
+    def get_world(
+            self,
+            search_name : str,
+            ambiguity : str = 'prompt'
+        ) -> WorldRef | None:
+        """
+        Finds the desired world and resolves it, so that it does not
+        need to be searched for again.
+
+        
+        Parameters
+        ----------
+        search_name : str
+            Part of the world name to be searched for.
+
+        ambiguity : str, default='prompt'
+            How a search matching several worlds is settled, one of
+            `AMBIGUITY_POLICIES`.
+
+            
+        Returns
+        -------
+        WorldRef
+            The resolved world.
+            None if the world is not found.
+
+
+        Raises
+        ------
+        AmbiguousWorldError
+            If several worlds match and `ambiguity` is 'error'.
+        """
+
+        file_name = self.get_world_name(
+            search_name=search_name,
+            ambiguity=ambiguity
+        )
+
+        return self.make_world_ref(file_name) if file_name else None
+
+
+    def make_world_ref(self, file_name : str) -> WorldRef:
+        """
+        Resolves a world from its file system name, without searching.
+
+        
+        Parameters
+        ----------
+        file_name : str
+            The file system name of the world.
+
+            
+        Returns
+        -------
+        WorldRef
+            The resolved world.
+        """
+
+        return WorldRef(
+            mod_name=self.mod_name,
+            file_name=file_name,
+            name=type(self).parse_world_name(file_name),
+            world_type=type(self).get_world_type(file_name),
+            location=self._get_world_location(file_name)
+        )
+
+
+    @abstractmethod
+    def _get_world_location(self, file_name : str) -> str:
+        """
+        Gets where the mod stores the waypoints of a world.
+
+        
+        Parameters
+        ----------
+        file_name : str
+            The file system name of the world.
+
+            
+        Returns
+        -------
+        str
+            The location of the world's waypoints, as held by `WorldRef`.
+        """
+
+
+    @abstractmethod
+    def get_world_files(self, world : WorldRef) -> list[Path]:
+        """
+        Gets the files that hold the waypoints of a world.
+
+        
+        Parameters
+        ----------
+        world : WorldRef
+            The world to get the files of.
+
+            
+        Returns
+        -------
+        list[pathlib.Path]
+            The paths of the world's existing waypoint files.
+        """
+
+
+    @abstractmethod
+    def get_worlds_with_waypoints(self) -> list[str]:
+        """
+        Retrieves the file system names of all worlds/servers that the
+        mod has waypoint data stored for.
+
+        
+        Returns
+        -------
+        list[str]
+            The file system names of the worlds/servers.
+        """
+
+
     @abstractmethod
     def _get_worlds(self) -> list[str]:
         """
@@ -122,7 +309,7 @@ class WaypointModHandler(ABC):
 
 
     @abstractmethod
-    def _get_world_waypoints(self, world_name : str) -> dict:
+    def _get_world_waypoints(self, world : WorldRef) -> dict:
         """
         Retrieves a list of all the waypoints for a world which the mod 
         has waypoints created. Subclasses of this class will
@@ -132,8 +319,8 @@ class WaypointModHandler(ABC):
         
         Parameters
         ----------
-        world_name : str
-            The name of the world/server to get waypoints from.
+        world : WorldRef
+            The world/server to get waypoints from.
 
             
         Returns
@@ -144,7 +331,11 @@ class WaypointModHandler(ABC):
 
 
     @abstractmethod
-    def _get_specific_world_name(self, search_name : str) -> str | None:
+    def _get_specific_world_name(
+            self,
+            search_name : str,
+            ambiguity : str = 'prompt'
+        ) -> str | None:
         """
         Obtains the file system name for the desired world/server. 
         Searches all world names using `search_name`, eventually 
@@ -156,6 +347,10 @@ class WaypointModHandler(ABC):
         search_name : str
             Part of the world/server name to find a server with.
 
+        ambiguity : str, default='prompt'
+            How a search matching several worlds is settled, one of
+            `AMBIGUITY_POLICIES`.
+
             
         Returns
         -------
@@ -211,53 +406,30 @@ class WaypointModHandler(ABC):
     ####################################################################
 
     @abstractmethod
-    def convert_from_mod_to_standard(self, world_name : str) -> dict:
+    def convert_from_mod_to_table(self, world : WorldRef) -> WaypointTable:
         """
         Converts this mod's complete waypoint data to the standardized
-        format.
+        format, held column by column in a `WaypointTable`.
 
         
         Parameters
         ----------
-        world_name : str
-            Name of the world to get waypoints for, as it appears in the
-            mod's file system.
-
-            
-        Returns
-        -------
-        dict
-            A standardized formatted dict of a world's waypoints' 
-            data that all waypoint mods share.
-        """
-
-
-    @abstractmethod
-    def _create_standardized_dict(self, world_name : str) -> dict:
-        """
-        Creates the dictionary with the world's waypoints in the
-        standardized format.
-
-
-        Parameters
-        ----------
-        world_name : str
-            Name of the world to get waypoints for, as it appears in the
-            mod's file system.
+        world : WorldRef
+            The world to get waypoints for.
 
             
         Returns
         -------
-        dict
-            The dict with the waypoint data as a standardized format.
+        WaypointTable
+            The world's waypoints in the standardized format.
         """
 
 
     @abstractmethod
     def convert_from_standard_to_mod(
         self, 
-        standard_data : dict,
-        world_name : str    
+        standard_data : WaypointTable,
+        world : WorldRef
     ) -> bool:
         """
         Converts the standardized format to this mod's waypoint data.
@@ -265,15 +437,11 @@ class WaypointModHandler(ABC):
         
         Parameters
         ----------
-        standard_data : dict
+        standard_data : WaypointTable
             The standardized waypoint data to be converted.
 
-        world_name : str
-            The name of the world/server to add waypoints to.
-
-        testing : bool
-            True,   if the method is being tested.
-            False,  otherwise.
+        world : WorldRef
+            The world/server to add waypoints to.
 
             
         Returns
@@ -286,7 +454,7 @@ class WaypointModHandler(ABC):
 
     @abstractmethod
     def _add_waypoints_to_mod(self, 
-                              world_name: str, 
+                              world: WorldRef, 
                               waypoints: dict
     ) -> bool:
         """
@@ -298,8 +466,8 @@ class WaypointModHandler(ABC):
         
         Parameters
         ----------
-        world_name : str
-            The name of the world to add waypoints to.
+        world : WorldRef
+            The world to add waypoints to.
 
         waypoints : dict
             Waypoint data to add to the world's waypoint list.
@@ -313,6 +481,32 @@ class WaypointModHandler(ABC):
         """
 
 
+    def commit(self) -> bool:
+        """
+        Writes any waypoint changes that the handler holds in memory to
+        the mod's files. Mods that write each world as it is converted
+        have nothing to commit.
+
+        
+        Returns
+        -------
+        bool
+            True,   if the changes were written successfully.
+            False,  otherwise.
+        """
+
+        return True
+
+
+    def close(self) -> None:
+        """
+        Releases what the handler holds on to between conversions, such
+        as a pool of I/O threads. Called once the handler is no longer
+        needed; handlers that hold nothing do not need to override it.
+        """
+        pass
+
+
     @abstractmethod
     def convert_here(self) -> None:
         """
@@ -322,16 +516,16 @@ class WaypointModHandler(ABC):
 
 
     @abstractmethod
-    def create_backup(self, world_name : str) -> bool:
+    def create_backup(self, world : WorldRef) -> bool:
         """
-        Creates a backup of the waypoint data and stores it in
-        `minecraft-waypoint-converter/data/backups`
+        Creates a backup of the waypoint data and stores it in the
+        backup store, `minecraft-waypoint-converter/data/backups`
 
         
         Parameters
         ----------
-        world_name : str
-            The name of the world to save a backup of.
+        world : WorldRef
+            The world to save a backup of.
 
             
         Returns
@@ -343,14 +537,267 @@ class WaypointModHandler(ABC):
 
 
 
+    ####################################################################
+    #####                      Async Methods                       #####
+    ####################################################################
+
+    # The async variants run the blocking methods on worker threads, so
+    # they can be awaited from an event loop. Subclasses override them
+    # where the work can be split and overlapped, e.g. per dimension file.
+    # Cancelling an awaiting task does not stop a thread that has already
+    # started, but every write replaces its file atomically, so a
+    # cancelled conversion never leaves a partially written file.
+
+    async def convert_from_mod_to_table_async(
+            self,
+            world : WorldRef
+        ) -> WaypointTable:
+        """
+        Async variant of `convert_from_mod_to_table`.
+        """
+
+        return await _to_thread(
+            self.convert_from_mod_to_table, world=world
+        )
+
+
+    async def convert_from_standard_to_mod_async(
+            self,
+            standard_data : WaypointTable,
+            world : WorldRef
+        ) -> bool:
+        """
+        Async variant of `convert_from_standard_to_mod`.
+        """
+
+        return await _to_thread(
+            self.convert_from_standard_to_mod,
+            standard_data=standard_data,
+            world=world
+        )
+
+
+    async def create_backup_async(self, world : WorldRef) -> bool:
+        """
+        Async variant of `create_backup`.
+        """
+
+        return await _to_thread(self.create_backup, world=world)
+
+
+    async def commit_async(self) -> bool:
+        """
+        Async variant of `commit`.
+        """
+
+        return await _to_thread(self.commit)
+
+
+    async def hash_world_data_async(self, world : WorldRef) -> str:
+        """
+        Async variant of `hash_world_data`.
+        """
+
+        return await _to_thread(self.hash_world_data, world=world)
+
+
+
     ####################################################################
     #####                      Other Methods                       #####
     ####################################################################
 
-    def get_datetime(self) -> str:
+    def resolve_world_name(self, search_name : str) -> str | None:
+        """
+        Finds the file system name of the world/server best matching
+        `search_name`, without prompting the user: exact matches are
+        preferred over prefix, then substring, then fuzzy matches.
+
+        
+        Parameters
+        ----------
+        search_name : str
+            Part of the world/server name to be searched for.
+
+            
+        Returns
+        -------
+        str
+            The file system name of the best matching world.
+            None if no world matches.
         """
-        Gets the datetime from this instance and returns a 
-        human readable string with relevant information.
+
+        return self._get_world_search_index().best_match(search_name)
+
+
+    def _choose_match(
+            self,
+            search_name : str,
+            matching_servers : list[str],
+            ambiguity : str
+        ) -> str:
         """
+        Chooses one of several worlds/servers matching `search_name`,
+        as the ambiguity policy says.
+
+        
+        Parameters
+        ----------
+        search_name : str
+            The name that was searched for.
+
+        matching_servers : list[str]
+            The file system names of the matching worlds, best match first.
+
+        ambiguity : str
+            How the match is chosen, one of `AMBIGUITY_POLICIES`.
+
+            
+        Returns
+        -------
+        str
+            The file system name of the chosen world.
+
+
+        Raises
+        ------
+        AmbiguousWorldError
+            If `ambiguity` is 'error'.
+        """
+
+        match ambiguity:
+
+            case 'prompt':
+                return self._choose_server(matching_servers)
+
+            case 'error':
+                raise AmbiguousWorldError(search_name, matching_servers)
+
+            # the world the mod lists first, which does not change as
+            # worlds are added the way the ranking can
+            case 'first':
+                world_positions = {
+                    world_name : i for i, world_name in
+                    enumerate(self._get_world_search_index().world_names)
+                }
+                return min(matching_servers, key=world_positions.__getitem__)
+
+            case 'best':
+                return matching_servers[0]
+
+            case _:
+                raise ValueError(f'Unknown ambiguity policy: {ambiguity}')
+
+
+    def _choose_similar_match(
+            self,
+            search_name : str,
+            ambiguity : str
+        ) -> str | None:
+        """
+        Chooses one of the worlds/servers whose names are only similar
+        to `search_name`, for when no name contains it. Even a single
+        similar world is only converted once the user or the ambiguity
+        policy chooses it, and none is chosen if the policy is 'error'.
+
+        
+        Parameters
+        ----------
+        search_name : str
+            The name that was searched for.
+
+        ambiguity : str
+            How the match is chosen, one of `AMBIGUITY_POLICIES`.
+
+            
+        Returns
+        -------
+        str
+            The file system name of the chosen world.
+            None if no world is chosen.
+        """
+
+        similar_servers = self._get_world_search_index().search(search_name)
+
+        if not similar_servers or ambiguity == 'error':
+            print_script_message(
+                f'No servers matching the name "{search_name}" were found.'
+            )
+            return None
+
+        if ambiguity == 'prompt':
+            print_script_message(
+                f'No servers matching the name "{search_name}" were found, '
+                'but some have similar names.'
+            )
+
+        return self._choose_match(
+            search_name=search_name,
+            matching_servers=similar_servers,
+            ambiguity=ambiguity
+        )
+
+
+    def _get_world_search_index(self) -> WorldSearchIndex:
+        """
+        Gets the search index over the names returned by `_get_worlds`,
+        building it again only when those names change.
+
+
+        Returns
+        -------
+        WorldSearchIndex
+            The search index of the world/server names.
+        """
+
+        worlds = self._get_worlds()
+
+        if self._world_search_index is None or worlds != self._world_search_source:
+            self._world_search_index = WorldSearchIndex(worlds)
+            self._world_search_source = worlds
+
+        return self._world_search_index
+
+
+    def hash_world_data(self, world : WorldRef) -> str:
+        """
+        Hashes the waypoint data the mod holds for a world, as stored in
+        the world's files.
+
+        
+        Parameters
+        ----------
+        world : WorldRef
+            The world to hash.
+
+            
+        Returns
+        -------
+        str
+            The hex digest of the world's waypoint data.
+        """
+
+        digest = hashlib.blake2b(digest_size=16)
+
+        for file_path in sorted(self.get_world_files(world=world)):
+
+            digest.update(str(file_path).encode('utf-8', 'surrogatepass'))
+
+            with open(file_path, 'rb') as f:
+                digest.update(f.read())
+
+        return digest.hexdigest()
+
+
+
+async def _to_thread(function, /, *args, **kwargs):
+    """
+    Runs a blocking function on a worker thread of the running event loop.
+
+    asyncio is imported here rather than with the module, since it takes
+    longer to import than most synchronous runs of the script spend
+    converting. Once an event loop is running it is already imported.
+    """
+
+    import asyncio
 
-        return self.time_created.strftime("%Y.%m.%d-%H.%M.%S")
+    return await asyncio.to_thread(function, *args, **kwargs)
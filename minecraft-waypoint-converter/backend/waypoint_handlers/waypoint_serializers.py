@@ -0,0 +1,592 @@
+"""waypoint_serializers.py
+
+Contains the classes that save standardized waypoints to file in each
+of the formats the standardized waypoints can be stored in, and the
+functions to choose between them.
+"""
+
+import json
+import os
+import struct
+import sys
+from abc import ABC, abstractmethod
+from array import array
+from pathlib import Path
+
+from sys import intern
+
+from .waypoint_table import WaypointTable
+
+
+from typing import override
+
+
+
+# the formats the standardized waypoints can be stored in
+SERIALIZATION_FORMATS : tuple[str, str, str] = ('yaml', 'jsonl', 'binary')
+
+DEFAULT_SERIALIZATION_FORMAT : str = 'yaml'
+
+# how many bytes of a file are read to detect its format
+_HEADER_SIZE : int = 64
+
+
+
+class WaypointSerializer(ABC):
+    """
+    A class that saves standardized waypoints to file, and reads them
+    back, in a single format.
+
+
+    Attributes
+    ----------
+    format_name : str
+        The name of the format, as chosen by the user.
+
+    file_suffix : str
+        The suffix of the files in the format.
+    """
+
+    format_name : str
+    file_suffix : str
+
+
+    @abstractmethod
+    def write(self, file_path : Path, waypoint_table : WaypointTable) -> bool:
+        """
+        Writes waypoints to a file, replacing the file.
+
+
+        Parameters
+        ----------
+        file_path : pathlib.Path
+            The file to write to.
+
+        waypoint_table : WaypointTable
+            The waypoints to write.
+
+
+        Returns
+        -------
+        bool
+            True,   if the file was written.
+            False,  otherwise.
+        """
+        pass
+
+
+    @abstractmethod
+    def read(self, file_path : Path) -> WaypointTable:
+        """
+        Reads waypoints from a file.
+
+
+        Parameters
+        ----------
+        file_path : pathlib.Path
+            The file to read.
+
+
+        Returns
+        -------
+        WaypointTable
+            The waypoints held in the file.
+
+
+        Raises
+        ------
+        ValueError
+            If the file is not in this format.
+        """
+        pass
+
+
+    def detect(self, header : bytes) -> bool:
+        """
+        Checks whether a file is in this format, from its first bytes.
+        Formats without a recognizable header are never detected, and
+        are only read when no other format is.
+        """
+
+        return False
+
+
+    def _write_atomically(self, file_path : Path, contents : bytes) -> bool:
+        """
+        Writes a file through a temporary file renamed over it, so a
+        partially written file is never left behind.
+        """
+
+        file_path = Path(file_path)
+        temp_path = file_path.with_name(f'{file_path.name}.{os.getpid()}.tmp')
+
+        try:
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+
+            with open(temp_path, 'wb') as f:
+                f.write(contents)
+
+            os.replace(temp_path, file_path)
+
+        except OSError:
+            temp_path.unlink(missing_ok=True)
+            return False
+
+        return True
+
+
+
+class YamlWaypointSerializer(WaypointSerializer):
+    """
+    Stores waypoints as YAML, in the nested layout documented in
+    `StandardWorldWaypoints`. The slowest format, but the easiest to
+    read and edit by hand.
+    """
+
+    format_name = 'yaml'
+    file_suffix = '.yaml'
+
+
+    @override
+    def write(self, file_path : Path, waypoint_table : WaypointTable) -> bool:
+
+        # imported here, since only this format needs it
+        from pyfilehandlers.file_handler import FileHandler
+
+        return FileHandler(Path(file_path)).write(
+            self._to_standard_dict(waypoint_table)
+        )
+
+
+    @override
+    def read(self, file_path : Path) -> WaypointTable:
+
+        from pyfilehandlers.file_handler import FileHandler
+
+        return self._from_standard_dict(FileHandler(Path(file_path)).read())
+
+
+    @staticmethod
+    def _to_standard_dict(waypoint_table : WaypointTable) -> dict:
+        """
+        Converts a table to the nested dict layout documented in
+        `StandardWorldWaypoints`, keyed by dimension and then by
+        waypoint name.
+        """
+
+        standard_dict : dict[str, dict] = {}
+
+        for (
+            name, dimension, x, y, z, color, visible, set_name
+        ) in waypoint_table.rows():
+
+            waypoint_dict = {
+                'coordinates' : {
+                    'x' : x,
+                    'y' : y,
+                    'z' : z
+                },
+                'color' : color,
+                'visible' : visible
+            }
+
+            if set_name is not None:
+                waypoint_dict['set'] = set_name
+
+            standard_dict.setdefault(dimension, {})[name] = waypoint_dict
+
+        return standard_dict
+
+
+    @staticmethod
+    def _from_standard_dict(standard_dict : dict | None) -> WaypointTable:
+        """
+        Converts the nested dict layout documented in
+        `StandardWorldWaypoints` back to a table, empty if the file held
+        nothing.
+        """
+
+        table = WaypointTable()
+
+        if not standard_dict:
+            return table
+
+        for dimension, dimension_waypoints in standard_dict.items():
+
+            dimension = intern(dimension)
+
+            for wp_name, wp_data in dimension_waypoints.items():
+
+                set_name = wp_data.get('set')
+                coordinates = wp_data['coordinates']
+
+                table.append(
+                    name=wp_name,
+                    dimension=dimension,
+                    x=float(coordinates['x']),
+                    y=float(coordinates['y']),
+                    z=float(coordinates['z']),
+                    color=int(wp_data['color']),
+                    visible=bool(wp_data['visible']),
+                    set_name=intern(set_name) if set_name is not None else None
+                )
+
+        return table
+
+
+
+class JsonLinesWaypointSerializer(WaypointSerializer):
+    """
+    Stores waypoints as JSON Lines: a header line naming the format,
+    followed by one line per waypoint holding its fields as an array,
+    in the order of `WaypointTable.rows`.
+    """
+
+    format_name = 'jsonl'
+    file_suffix = '.jsonl'
+
+    HEADER : dict = {'format' : 'standard-waypoints', 'version' : 1}
+
+    _header_line : bytes = json.dumps(HEADER, separators=(',', ':')).encode('utf-8')
+
+
+    @override
+    def write(self, file_path : Path, waypoint_table : WaypointTable) -> bool:
+
+        encode = json.JSONEncoder(
+            ensure_ascii=False,
+            separators=(',', ':')
+        ).encode
+
+        lines = [self._header_line.decode('utf-8')]
+        lines.extend(encode(row) for row in waypoint_table.rows())
+        lines.append('')
+
+        return self._write_atomically(file_path, '\n'.join(lines).encode('utf-8'))
+
+
+    @override
+    def read(self, file_path : Path) -> WaypointTable:
+
+        with open(file_path, 'rb') as f:
+            header = f.readline().rstrip(b'\r\n')
+
+            if header != self._header_line:
+                raise ValueError(f'{file_path} is not a JSON Lines waypoint file')
+
+            waypoint_table = WaypointTable()
+            decode = json.JSONDecoder().decode
+
+            for line in f:
+                if line.strip():
+                    waypoint_table.append(*decode(line.decode('utf-8')))
+
+        return waypoint_table
+
+
+    @override
+    def detect(self, header : bytes) -> bool:
+        return header.startswith(self._header_line)
+
+
+
+class BinaryWaypointSerializer(WaypointSerializer):
+    """
+    Stores waypoints in a compact binary layout, which writes the
+    columns of a `WaypointTable` as they are held in memory. The
+    fastest format to write and to read, and the smallest.
+
+    The file is, in little-endian order:
+
+    ```
+    header      magic, version, waypoint count, string count,
+                dimension count
+    strings     the length of each string, then the strings, in UTF-8.
+                The dimensions come first, then the set names
+    names       the length of each waypoint name, then the names
+    columns     the dimension of each waypoint as an index into the
+                strings, its set as an index into the strings (-1 for
+                none), then x, y, z, colors, and visibility
+    ```
+    """
+
+    format_name = 'binary'
+    file_suffix = '.bin'
+
+    MAGIC : bytes = b'SWPT'
+    VERSION : int = 1
+
+    _header = struct.Struct('<4sHIII')
+
+
+    @override
+    def write(self, file_path : Path, waypoint_table : WaypointTable) -> bool:
+
+        strings = list(waypoint_table.dimension_names)
+        string_codes = {}
+
+        set_codes = array('i')
+
+        for set_name in waypoint_table.set_names:
+
+            if set_name is None:
+                set_codes.append(-1)
+                continue
+
+            code = string_codes.get(set_name)
+
+            if code is None:
+                code = string_codes[set_name] = len(strings)
+                strings.append(set_name)
+
+            set_codes.append(code)
+
+        parts = [self._header.pack(
+            self.MAGIC,
+            self.VERSION,
+            len(waypoint_table),
+            len(strings),
+            len(waypoint_table.dimension_names)
+        )]
+
+        for string_list in (strings, waypoint_table.names):
+            encoded = [string.encode('utf-8', 'surrogatepass') for string in string_list]
+            parts.append(self._to_bytes(array('I', map(len, encoded))))
+            parts.extend(encoded)
+
+        for column in (
+            waypoint_table.dimension_codes,
+            set_codes,
+            waypoint_table.x,
+            waypoint_table.y,
+            waypoint_table.z,
+            waypoint_table.colors,
+            waypoint_table.visible
+        ):
+            parts.append(self._to_bytes(column))
+
+        return self._write_atomically(file_path, b''.join(parts))
+
+
+    @override
+    def read(self, file_path : Path) -> WaypointTable:
+
+        with open(file_path, 'rb') as f:
+            contents = memoryview(f.read())
+
+        if not self.detect(bytes(contents[:self._header.size])):
+            raise ValueError(f'{file_path} is not a binary waypoint file')
+
+        _, version, waypoint_count, string_count, dimension_count = \
+            self._header.unpack_from(contents)
+
+        if version != self.VERSION:
+            raise ValueError(
+                f'{file_path} is version {version} of the binary waypoint '
+                f'format, only version {self.VERSION} can be read'
+            )
+
+        offset = self._header.size
+
+        strings, offset = self._read_strings(contents, offset, string_count)
+        strings = [sys.intern(string) for string in strings]
+        names, offset = self._read_strings(contents, offset, waypoint_count)
+
+        waypoint_table = WaypointTable()
+        waypoint_table.names = names
+        waypoint_table.dimension_names = strings[:dimension_count]
+
+        set_codes = array('i')
+
+        for column in (
+            waypoint_table.dimension_codes,
+            set_codes,
+            waypoint_table.x,
+            waypoint_table.y,
+            waypoint_table.z,
+            waypoint_table.colors,
+            waypoint_table.visible
+        ):
+            offset = self._read_column(contents, offset, column, waypoint_count)
+
+        waypoint_table.set_names = [
+            None if code < 0 else strings[code] for code in set_codes
+        ]
+
+        return waypoint_table
+
+
+    @override
+    def detect(self, header : bytes) -> bool:
+        return header.startswith(self.MAGIC)
+
+
+    @staticmethod
+    def _to_bytes(column : array) -> bytes:
+        """
+        Gets the bytes of a column, in little-endian order.
+        """
+
+        if sys.byteorder == 'big':
+            column = array(column.typecode, column)
+            column.byteswap()
+
+        return column.tobytes()
+
+
+    @staticmethod
+    def _read_column(
+            contents : memoryview,
+            offset : int,
+            column : array,
+            count : int
+        ) -> int:
+        """
+        Reads `count` values into an empty column, returning the offset
+        after them.
+        """
+
+        end = offset + count * column.itemsize
+
+        if end > len(contents):
+            raise ValueError('Binary waypoint file is truncated')
+
+        column.frombytes(contents[offset:end])
+
+        if sys.byteorder == 'big':
+            column.byteswap()
+
+        return end
+
+
+    @classmethod
+    def _read_strings(
+            cls,
+            contents : memoryview,
+            offset : int,
+            count : int
+        ) -> tuple[list[str], int]:
+        """
+        Reads `count` strings, returning them and the offset after them.
+        """
+
+        lengths = array('I')
+        offset = cls._read_column(contents, offset, lengths, count)
+
+        strings = []
+
+        for length in lengths:
+            strings.append(
+                str(contents[offset:offset + length], 'utf-8', 'surrogatepass')
+            )
+            offset += length
+
+        if offset > len(contents):
+            raise ValueError('Binary waypoint file is truncated')
+
+        return strings, offset
+
+
+
+_serializers : dict[str, WaypointSerializer] = {
+    serializer.format_name : serializer
+    for serializer in (
+        YamlWaypointSerializer(),
+        JsonLinesWaypointSerializer(),
+        BinaryWaypointSerializer()
+    )
+}
+
+_standard_format : str = DEFAULT_SERIALIZATION_FORMAT
+
+
+def register_serializer(serializer : WaypointSerializer) -> None:
+    """
+    Adds a format the standardized waypoints can be stored in, replacing
+    any format of the same name.
+    """
+
+    _serializers[serializer.format_name] = serializer
+
+
+def get_serializer(format_name : str) -> WaypointSerializer:
+    """
+    Gets the serializer of a format.
+
+
+    Raises
+    ------
+    ValueError
+        If there is no serializer for the format.
+    """
+
+    try:
+        return _serializers[format_name]
+
+    except KeyError:
+        raise ValueError(f'Unknown serialization format: {format_name}') from None
+
+
+def get_serializers() -> list[WaypointSerializer]:
+    """
+    Gets the serializers of every format.
+    """
+
+    return list(_serializers.values())
+
+
+def detect_serializer(file_path : Path) -> WaypointSerializer:
+    """
+    Gets the serializer of the format a file is in, from its first
+    bytes. Files of no recognizable format are read as YAML, which has
+    no header of its own.
+
+
+    Parameters
+    ----------
+    file_path : pathlib.Path
+        The file to detect the format of.
+
+
+    Returns
+    -------
+    WaypointSerializer
+        The serializer that reads the file.
+    """
+
+    with open(file_path, 'rb') as f:
+        header = f.read(_HEADER_SIZE)
+
+    for serializer in _serializers.values():
+        if serializer.detect(header):
+            return serializer
+
+    return _serializers['yaml']
+
+
+def set_standard_format(format_name : str) -> None:
+    """
+    Chooses the format the standardized waypoints of this process are
+    written in. Files already written in another format are still read.
+
+
+    Parameters
+    ----------
+    format_name : str
+        One of `SERIALIZATION_FORMATS`, or a registered format.
+    """
+
+    global _standard_format
+
+    get_serializer(format_name)
+
+    _standard_format = format_name
+
+
+def get_standard_format() -> str:
+    """
+    Gets the format the standardized waypoints of this process are
+    written in.
+    """
+
+    return _standard_format
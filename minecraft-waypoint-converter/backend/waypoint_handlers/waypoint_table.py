@@ -0,0 +1,570 @@
+"""waypoint_table.py
+
+Contains a class that holds standardized waypoints column by column,
+with bulk coordinate transforms over whole columns.
+"""
+
+import hashlib
+import math
+from array import array
+from sys import intern
+
+from .tracing import traced
+from .waypoint import Waypoint
+
+
+from typing import Callable, Iterator
+
+# numpy comes with amulet_nbt, but the table only uses it to speed up
+# the bulk transforms, so it is not required. It is imported on the
+# first transform, since importing it takes longer than most runs of
+# the script spend converting
+_numpy = None
+_numpy_imported : bool = False
+
+
+def _get_numpy():
+    """
+    Gets the numpy module, importing it the first time it is needed.
+    None if numpy is not installed.
+    """
+
+    global _numpy, _numpy_imported
+
+    if not _numpy_imported:
+        try:
+            import numpy as _numpy
+        except ImportError:
+            _numpy = None
+
+        _numpy_imported = True
+
+    return _numpy
+
+
+def _floor(values):
+    """
+    Floors a coordinate column, or a single coordinate without numpy.
+    """
+
+    numpy = _get_numpy()
+    return numpy.floor(values) if numpy is not None else math.floor(values)
+
+OVERWORLD_TO_NETHER_SCALE : float = 1 / 8
+NETHER_TO_OVERWORLD_SCALE : float = 8.0
+
+
+
+class WaypointTable:
+    """
+    A class that holds standardized waypoints as columns rather than as
+    one record per waypoint. Coordinates are stored in `array.array`s,
+    so bulk transforms run over whole columns at once (vectorized
+    through numpy when it is available) instead of re-casting each
+    waypoint's coordinates one at a time.
+
+    Transforms return a new table and leave the original unchanged.
+
+
+    Attributes
+    ----------
+    names : list[str]
+        The names of the waypoints.
+
+    dimension_names : list[str]
+        The distinct dimensions in the table, indexed by dimension code.
+
+    dimension_codes : array.array
+        The dimension code of each waypoint.
+
+    x : array.array
+        The x coordinates of the waypoints, as doubles.
+
+    y : array.array
+        The y coordinates of the waypoints, as doubles.
+
+    z : array.array
+        The z coordinates of the waypoints, as doubles.
+
+    colors : array.array
+        The colors of the waypoints.
+
+    visible : array.array
+        Whether each waypoint is visible, as 0 or 1.
+
+    set_names : list[str | None]
+        The waypoint set of each waypoint, None for mods without sets.
+    """
+
+    __slots__ = (
+        'names',
+        'dimension_names',
+        'dimension_codes',
+        'x',
+        'y',
+        'z',
+        'colors',
+        'visible',
+        'set_names'
+    )
+
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty WaypointTable instance.
+        """
+
+        self.names : list[str] = []
+        self.dimension_names : list[str] = []
+        self.dimension_codes : array = array('H')
+        self.x : array = array('d')
+        self.y : array = array('d')
+        self.z : array = array('d')
+        self.colors : array = array('q')
+        self.visible : array = array('b')
+        self.set_names : list[str | None] = []
+
+
+    ####################################################################
+    #####                     Table Contents                       #####
+    ####################################################################
+
+    def append(
+        self,
+        name : str,
+        dimension : str,
+        x : float,
+        y : float,
+        z : float,
+        color : int = 0,
+        visible : bool = True,
+        set_name : str | None = None
+    ) -> None:
+        """
+        Adds a single waypoint to the end of the table.
+        """
+
+        self.names.append(name)
+        self.dimension_codes.append(self._dimension_code(dimension))
+        self.x.append(x)
+        self.y.append(y)
+        self.z.append(z)
+        self.colors.append(color)
+        self.visible.append(visible)
+        self.set_names.append(set_name)
+
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+    def __iter__(self) -> Iterator[Waypoint]:
+        """
+        Iterates over the table as `Waypoint` records.
+        """
+
+        for row in self.rows():
+            yield Waypoint(*row)
+
+
+    def dimensions(self) -> list[str]:
+        """
+        Returns the dimension of every waypoint, in table order.
+        """
+
+        dimension_names = self.dimension_names
+        return [dimension_names[code] for code in self.dimension_codes]
+
+
+    def rows(self, block_coordinates : bool = False) -> Iterator[tuple]:
+        """
+        Iterates over the table row by row, without creating records.
+
+
+        Parameters
+        ----------
+        block_coordinates : bool, default=False
+            True,   to give the coordinates as the int coordinates of
+                    the block the waypoint is in.
+            False,  to give the coordinates as stored.
+
+
+        Yields
+        ------
+        tuple
+            (name, dimension, x, y, z, color, visible, set_name)
+        """
+
+        x, y, z = self.block_coordinates() if block_coordinates \
+            else (self.x, self.y, self.z)
+
+        return zip(
+            self.names,
+            self.dimensions(),
+            x,
+            y,
+            z,
+            self.colors,
+            map(bool, self.visible),
+            self.set_names
+        )
+
+
+    def block_coordinates(self) -> tuple[list[int], list[int], list[int]]:
+        """
+        Gets the int coordinates of the block each waypoint is in,
+        flooring each coordinate column in bulk.
+
+
+        Returns
+        -------
+        tuple[list[int], list[int], list[int]]
+            The x, y and z block coordinate columns.
+        """
+
+        numpy = _get_numpy()
+
+        if numpy is not None:
+            return tuple(
+                numpy.floor(self._as_numpy(column)).astype(numpy.int64).tolist()
+                for column in (self.x, self.y, self.z)
+            )
+
+        return tuple(
+            [math.floor(value) for value in column]
+            for column in (self.x, self.y, self.z)
+        )
+
+
+
+    ####################################################################
+    #####                     Bulk Transforms                      #####
+    ####################################################################
+
+    def filter_dimension(self, dimension : str) -> 'WaypointTable':
+        """
+        Gets the waypoints of a single dimension.
+
+
+        Parameters
+        ----------
+        dimension : str
+            The dimension to keep.
+
+
+        Returns
+        -------
+        WaypointTable
+            A table with only the waypoints in `dimension`.
+        """
+
+        table = WaypointTable()
+
+        if dimension not in self.dimension_names:
+            return table
+
+        code = self.dimension_names.index(dimension)
+        indices = [
+            index for index, row_code in enumerate(self.dimension_codes)
+            if row_code == code
+        ]
+
+        table.dimension_names = [dimension]
+        table.dimension_codes = array('H', bytes(2 * len(indices)))
+        table.names = [self.names[index] for index in indices]
+        table.set_names = [self.set_names[index] for index in indices]
+
+        for column_name in ('x', 'y', 'z', 'colors', 'visible'):
+            column : array = getattr(self, column_name)
+            setattr(
+                table,
+                column_name,
+                array(column.typecode, [column[index] for index in indices])
+            )
+
+        return table
+
+
+    def scale(
+        self,
+        factor : float,
+        dimension : str | None = None,
+        to_dimension : str | None = None
+    ) -> 'WaypointTable':
+        """
+        Multiplies the horizontal (x and z) coordinates by `factor`.
+
+
+        Parameters
+        ----------
+        factor : float
+            The factor to multiply by.
+
+        dimension : str, optional
+            Only scale the waypoints in this dimension.
+
+        to_dimension : str, optional
+            Move the scaled waypoints into this dimension.
+
+
+        Returns
+        -------
+        WaypointTable
+            The scaled table.
+        """
+
+        return self._transform(
+            dimension=dimension,
+            x=lambda x: x * factor,
+            z=lambda z: z * factor,
+            to_dimension=to_dimension
+        )
+
+
+    def overworld_to_nether(self) -> 'WaypointTable':
+        """
+        Moves the Overworld waypoints to their matching Nether
+        coordinates, dividing x and z by 8.
+        """
+
+        return self.scale(
+            OVERWORLD_TO_NETHER_SCALE,
+            dimension='overworld',
+            to_dimension='nether'
+        )
+
+
+    def nether_to_overworld(self) -> 'WaypointTable':
+        """
+        Moves the Nether waypoints to their matching Overworld
+        coordinates, multiplying x and z by 8.
+        """
+
+        return self.scale(
+            NETHER_TO_OVERWORLD_SCALE,
+            dimension='nether',
+            to_dimension='overworld'
+        )
+
+
+    def round_to_block_center(
+        self,
+        dimension : str | None = None
+    ) -> 'WaypointTable':
+        """
+        Moves each waypoint to the center of the block it is in, the
+        way the game places a player teleported to block coordinates.
+
+
+        Parameters
+        ----------
+        dimension : str, optional
+            Only round the waypoints in this dimension.
+
+
+        Returns
+        -------
+        WaypointTable
+            The rounded table.
+        """
+
+        return self._transform(
+            dimension=dimension,
+            x=lambda x: _floor(x) + 0.5,
+            y=_floor,
+            z=lambda z: _floor(z) + 0.5
+        )
+
+
+    def offset(
+        self,
+        dx : float = 0.0,
+        dy : float = 0.0,
+        dz : float = 0.0,
+        dimension : str | None = None
+    ) -> 'WaypointTable':
+        """
+        Moves every waypoint by the given offsets.
+
+
+        Parameters
+        ----------
+        dx, dy, dz : float, default=0.0
+            The offsets to add to each coordinate.
+
+        dimension : str, optional
+            Only move the waypoints in this dimension.
+
+
+        Returns
+        -------
+        WaypointTable
+            The moved table.
+        """
+
+        return self._transform(
+            dimension=dimension,
+            x=(lambda x: x + dx) if dx else None,
+            y=(lambda y: y + dy) if dy else None,
+            z=(lambda z: z + dz) if dz else None
+        )
+
+
+
+    ####################################################################
+    #####                      Other Methods                       #####
+    ####################################################################
+
+    def copy(self) -> 'WaypointTable':
+        """
+        Returns a copy of the table. The columns are copied, the strings
+        in them are shared.
+        """
+
+        table = WaypointTable()
+        table.names = self.names.copy()
+        table.dimension_names = self.dimension_names.copy()
+        table.dimension_codes = array('H', self.dimension_codes)
+        table.x = array('d', self.x)
+        table.y = array('d', self.y)
+        table.z = array('d', self.z)
+        table.colors = array('q', self.colors)
+        table.visible = array('b', self.visible)
+        table.set_names = self.set_names.copy()
+
+        return table
+
+
+    @traced
+    def content_hash(self) -> str:
+        """
+        Hashes the waypoints held in the table, column by column. Tables
+        holding the same waypoints in the same order hash the same.
+
+
+        Returns
+        -------
+        str
+            The hex digest of the table's contents.
+        """
+
+        digest = hashlib.blake2b(digest_size=16)
+
+        for strings in (self.names, self.dimensions(), self.set_names):
+            digest.update('\0'.join(
+                '\1' if string is None else string for string in strings
+            ).encode('utf-8', 'surrogatepass'))
+            digest.update(b'\2')
+
+        for column in (self.x, self.y, self.z, self.colors, self.visible):
+            digest.update(column.tobytes())
+
+        return digest.hexdigest()
+
+
+    def _dimension_code(self, dimension : str) -> int:
+        """
+        Gets the code of a dimension, adding the dimension to the table
+        if it is not in it yet.
+        """
+
+        try:
+            return self.dimension_names.index(dimension)
+
+        except ValueError:
+            self.dimension_names.append(intern(dimension))
+            return len(self.dimension_names) - 1
+
+
+    def _transform(
+        self,
+        dimension : str | None,
+        x : Callable | None = None,
+        y : Callable | None = None,
+        z : Callable | None = None,
+        to_dimension : str | None = None
+    ) -> 'WaypointTable':
+        """
+        Applies a function to whole coordinate columns, optionally
+        limited to the waypoints of one dimension.
+
+
+        Parameters
+        ----------
+        dimension : str | None
+            Only transform the waypoints in this dimension, None for all.
+
+        x, y, z : Callable, optional
+            The function to apply to each coordinate column. Each is given
+            a numpy array when numpy is available, otherwise a float.
+
+        to_dimension : str, optional
+            Move the transformed waypoints into this dimension.
+
+
+        Returns
+        -------
+        WaypointTable
+            The transformed table.
+        """
+
+        table = self.copy()
+
+        if dimension is not None and dimension not in self.dimension_names:
+            return table
+
+        code = None if dimension is None else self.dimension_names.index(dimension)
+        numpy = _get_numpy()
+
+        for column_name, function in (('x', x), ('y', y), ('z', z)):
+
+            if function is None:
+                continue
+
+            column : array = getattr(table, column_name)
+
+            if numpy is not None:
+                values = self._as_numpy(column)
+                transformed = function(values)
+
+                if code is not None:
+                    mask = self._as_numpy(table.dimension_codes) == code
+                    transformed = numpy.where(mask, transformed, values)
+
+                setattr(table, column_name, array(
+                    'd', numpy.asarray(transformed, dtype=numpy.float64).tobytes()
+                ))
+                continue
+
+            if code is None:
+                setattr(table, column_name, array(
+                    'd', [function(value) for value in column]
+                ))
+            else:
+                setattr(table, column_name, array('d', [
+                    function(value) if row_code == code else value
+                    for value, row_code in zip(column, table.dimension_codes)
+                ]))
+
+        if to_dimension is not None:
+
+            new_code = table._dimension_code(to_dimension)
+
+            table.dimension_codes = array('H', [
+                new_code if code is None or row_code == code else row_code
+                for row_code in table.dimension_codes
+            ])
+
+        return table
+
+
+    @staticmethod
+    def _as_numpy(column : array):
+        """
+        Gets a numpy view of an array column, without copying it.
+        """
+
+        numpy = _get_numpy()
+
+        return numpy.frombuffer(column, dtype=column.typecode) \
+            if len(column) else numpy.empty(0, dtype=column.typecode)
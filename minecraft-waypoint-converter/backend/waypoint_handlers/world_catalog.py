@@ -0,0 +1,320 @@
+"""world_catalog.py
+
+Contains a class that keeps an on-disk index of the worlds/servers found
+in the directories and files the waypoint mod handlers search through.
+"""
+
+import json
+import os
+from pathlib import Path
+
+from .tracing import traced
+
+
+from typing import Callable
+
+
+CATALOG_VERSION : int = 1
+
+
+
+class WorldCatalog:
+    """
+    A class that keeps an on-disk index of the worlds/servers found in
+    the directories and files that the waypoint mod handlers search.
+
+    Each source (a directory whose subdirectories are worlds, or a
+    `servers.dat` file) is stored with the modification time it had when
+    it was read. A source is only read again once its modification time
+    changes, so looking up worlds costs one `os.stat` per source.
+
+    The catalog file has the following format:
+
+    ```
+    {
+        "version" : int,
+        "sources" : {
+            "directory:PATH OR servers:PATH" : {
+                "mtime_ns" : int,
+                "entries" : [str, ...]
+            },
+            ...
+        }
+    }
+    ```
+
+
+    Attributes
+    ----------
+    catalog_path : pathlib.Path
+        The path of the file the catalog is stored in.
+    """
+
+    def __init__(self, catalog_path : Path = None) -> None:
+        """
+        Initializes a WorldCatalog instance.
+
+
+        Parameters
+        ----------
+        catalog_path : pathlib.Path, optional
+            The path of the file the catalog is stored in. If not provided,
+            defaults to `minecraft-waypoint-converter/data/world_catalog.json`.
+        """
+
+        self.catalog_path : Path = catalog_path or Path(
+            os.getcwd(),
+            'minecraft-waypoint-converter',
+            'data',
+            'world_catalog.json'
+        )
+
+        self._sources : dict[str, dict] | None = None
+
+
+
+    ####################################################################
+    #####                       World Lookup                       #####
+    ####################################################################
+
+    def list_subdirectories(self, directory_path : Path) -> list[str]:
+        """
+        Gets the names of the subdirectories of a directory.
+
+
+        Parameters
+        ----------
+        directory_path : pathlib.Path
+            The directory to list.
+
+
+        Returns
+        -------
+        list[str]
+            The names of the subdirectories, empty if the directory
+            does not exist.
+        """
+
+        return self._get_source_entries(
+            source_key=f'directory:{os.fspath(directory_path)}',
+            source_path=directory_path,
+            read_source=self._read_subdirectories
+        )
+
+
+    def list_servers(self, servers_file_path : Path) -> list[str]:
+        """
+        Gets the multiplayer servers saved in a `servers.dat` file.
+
+
+        Parameters
+        ----------
+        servers_file_path : pathlib.Path
+            The `servers.dat` file to read.
+
+
+        Returns
+        -------
+        list[str]
+            The servers, formatted as `NAME (ip: IP)`, empty if the file
+            does not exist.
+        """
+
+        return self._get_source_entries(
+            source_key=f'servers:{os.fspath(servers_file_path)}',
+            source_path=servers_file_path,
+            read_source=self._read_servers
+        )
+
+
+    @traced
+    def get_game_worlds(self) -> list[str]:
+        """
+        Gets every singleplayer world and multiplayer server of the
+        Minecraft installation, `%APPDATA%/.minecraft`.
+
+
+        Returns
+        -------
+        list[str]
+            The singleplayer world names followed by the servers.
+        """
+
+        minecraft_dir = Path(os.getenv('APPDATA'), '.minecraft')
+
+        return self.list_subdirectories(Path(minecraft_dir, 'saves')) \
+            + self.list_servers(Path(minecraft_dir, 'servers.dat'))
+
+
+
+    ####################################################################
+    #####                     Catalog Storage                      #####
+    ####################################################################
+
+    def _get_source_entries(
+            self,
+            source_key : str,
+            source_path : Path,
+            read_source : Callable[[Path], list[str]]
+        ) -> list[str]:
+        """
+        Gets the entries of a source from the catalog, reading the source
+        again only if it changed since it was last read.
+
+
+        Parameters
+        ----------
+        source_key : str
+            The key of the source in the catalog.
+
+        source_path : pathlib.Path
+            The path of the source.
+
+        read_source : Callable[[pathlib.Path], list[str]]
+            Reads the entries of the source.
+
+
+        Returns
+        -------
+        list[str]
+            The entries of the source.
+        """
+
+        try:
+            mtime_ns = os.stat(source_path).st_mtime_ns
+        except (FileNotFoundError, NotADirectoryError):
+            mtime_ns = None
+
+        sources = self._load()
+        source = sources.get(source_key)
+
+        if source is not None and source['mtime_ns'] == mtime_ns:
+            return source['entries']
+
+        entries = read_source(source_path) if mtime_ns is not None else []
+
+        sources[source_key] = {
+            'mtime_ns' : mtime_ns,
+            'entries' : entries
+        }
+        self._save()
+
+        return entries
+
+
+    def _load(self) -> dict[str, dict]:
+        """
+        Loads the catalog from its file, the first time it is needed.
+        An unreadable or outdated catalog is treated as empty.
+
+
+        Returns
+        -------
+        dict[str, dict]
+            The sources held in the catalog.
+        """
+
+        if self._sources is not None:
+            return self._sources
+
+        self._sources = {}
+
+        try:
+            with open(self.catalog_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            if data.get('version') == CATALOG_VERSION:
+                self._sources = data['sources']
+
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+
+        return self._sources
+
+
+    def _save(self) -> None:
+        """
+        Saves the catalog to its file. The file is replaced atomically,
+        since batch conversions may update it from several processes.
+        """
+
+        temp_path = self.catalog_path.with_name(
+            f'{self.catalog_path.name}.{os.getpid()}.tmp'
+        )
+
+        try:
+            self.catalog_path.parent.mkdir(parents=True, exist_ok=True)
+
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(
+                    {'version' : CATALOG_VERSION, 'sources' : self._sources},
+                    f
+                )
+
+            os.replace(temp_path, self.catalog_path)
+
+        # the catalog is only a cache, lookups still work without it
+        except OSError:
+            pass
+
+
+
+    ####################################################################
+    #####                      Source Readers                      #####
+    ####################################################################
+
+    @staticmethod
+    @traced
+    def _read_subdirectories(directory_path : Path) -> list[str]:
+        """
+        Reads the names of the subdirectories of a directory.
+        """
+
+        with os.scandir(directory_path) as entries:
+            return [entry.name for entry in entries if entry.is_dir()]
+
+
+    @staticmethod
+    @traced
+    def _read_servers(servers_file_path : Path) -> list[str]:
+        """
+        Reads the servers saved in a `servers.dat` file.
+        """
+
+        # imported here, since the .dat reader loads amulet_nbt, which
+        # is only needed once the servers are listed
+        from pyfilehandlers.file_handler import FileHandler
+        from pyfilehandlers.file_minecraft_dat import MinecraftDatFile
+
+        servers_file = FileHandler(
+            extension=MinecraftDatFile,
+            full_path=servers_file_path
+        )
+
+        return [
+            f'{server['name']} (ip: {server['ip']})'
+            for server in servers_file.read()['servers']
+        ]
+
+
+
+_shared_catalog : WorldCatalog | None = None
+
+
+def get_world_catalog() -> WorldCatalog:
+    """
+    Gets the world catalog shared by all mod handlers of this process.
+
+
+    Returns
+    -------
+    WorldCatalog
+        The shared world catalog.
+    """
+
+    global _shared_catalog
+
+    if _shared_catalog is None:
+        _shared_catalog = WorldCatalog()
+
+    return _shared_catalog
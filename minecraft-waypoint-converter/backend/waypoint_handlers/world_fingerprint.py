@@ -0,0 +1,292 @@
+"""world_fingerprint.py
+
+Contains a class that records the state of a pair of worlds after a
+conversion, so that converting an unchanged pair again can be skipped.
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .tracing import traced
+
+
+from typing import Iterable
+
+
+FINGERPRINT_VERSION : int = 3
+
+
+
+@traced
+def stat_signature(file_paths : Iterable[Path]) -> list[list]:
+    """
+    Gets the size and modification time of each file, which change
+    whenever a file is written to.
+
+
+    Parameters
+    ----------
+    file_paths : Iterable[pathlib.Path]
+        The files to stat.
+
+
+    Returns
+    -------
+    list[list]
+        [path, size, mtime_ns] for every file, sorted by path. Files that
+        do not exist are left out.
+    """
+
+    signature = []
+
+    for file_path in file_paths:
+
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            continue
+
+        signature.append([os.fspath(file_path), stat.st_size, stat.st_mtime_ns])
+
+    signature.sort()
+
+    return signature
+
+
+
+@dataclass(slots=True)
+class WorldFingerprint:
+    """
+    The state of a pair of worlds, as it was after they were last
+    converted.
+
+    Checking the stat signatures only costs an `os.stat` per file. When
+    they differ, for example because another world stored in the same
+    file was written to, the content hashes tell whether the waypoints
+    themselves changed. Either way, a conversion is only skipped when it
+    is run with the same options as the last one, since those change
+    what it writes.
+
+    The fingerprint file has the following format:
+
+    ```
+    {
+        "version" : int,
+        "source_files" : [[path, size, mtime_ns], ...],
+        "source_hash" : str,
+        "target_files" : [[path, size, mtime_ns], ...],
+        "target_hash" : str,
+        "target_location" : str,
+        "options" : {
+            "OPTION_NAME" : value,
+            ...
+        }
+    }
+    ```
+
+
+    Attributes
+    ----------
+    source_files : list[list]
+        The stat signature of the files of the world converted from.
+
+    source_hash : str
+        The hash of the standardized waypoints of the world converted from.
+
+    target_files : list[list]
+        The stat signature of the files of the world converted to.
+
+    target_hash : str
+        The hash of the waypoint data of the world converted to.
+
+    target_location : str
+        The location of the world converted to, see `WorldRef`. Mods that
+        store every world in one file give every world the same files,
+        so only the location tells which world was converted to.
+
+    options : dict
+        The options of the conversion that change what it writes, such
+        as whether the worlds were merged, with JSON serializable values.
+    """
+
+    source_files : list[list] = field(default_factory=list)
+    source_hash : str = ''
+    target_files : list[list] = field(default_factory=list)
+    target_hash : str = ''
+    target_location : str = ''
+    options : dict = field(default_factory=dict)
+
+
+    def matches_files(
+            self,
+            source_files : list[list],
+            target_files : list[list],
+            target_location : str,
+            options : dict
+        ) -> bool:
+        """
+        Checks whether neither world's files changed since the fingerprint
+        was taken.
+
+
+        Parameters
+        ----------
+        source_files : list[list]
+            The current stat signature of the world converted from.
+
+        target_files : list[list]
+            The current stat signature of the world converted to.
+
+        target_location : str
+            The location of the world converted to.
+
+        options : dict
+            The options of the conversion, see `options`.
+
+
+        Returns
+        -------
+        bool
+            True,   if both stat signatures and the options are unchanged.
+            False,  otherwise.
+        """
+
+        # a world without files has nothing to compare
+        return bool(source_files) \
+            and target_location == self.target_location \
+            and options == self.options \
+            and source_files == self.source_files \
+            and target_files == self.target_files
+
+
+    def matches_content(
+            self,
+            source_hash : str,
+            target_hash : str,
+            target_location : str,
+            options : dict
+        ) -> bool:
+        """
+        Checks whether neither world's waypoints changed since the
+        fingerprint was taken.
+
+
+        Parameters
+        ----------
+        source_hash : str
+            The current hash of the world converted from.
+
+        target_hash : str
+            The current hash of the world converted to.
+
+        target_location : str
+            The location of the world converted to.
+
+        options : dict
+            The options of the conversion, see `options`.
+
+
+        Returns
+        -------
+        bool
+            True,   if both hashes and the options are unchanged.
+            False,  otherwise.
+        """
+
+        return bool(self.source_hash) \
+            and target_location == self.target_location \
+            and options == self.options \
+            and source_hash == self.source_hash \
+            and target_hash == self.target_hash
+
+
+
+    ####################################################################
+    #####                    Fingerprint Storage                   #####
+    ####################################################################
+
+    @classmethod
+    def load(cls, fingerprint_path : Path) -> 'WorldFingerprint | None':
+        """
+        Loads a fingerprint from its file.
+
+
+        Parameters
+        ----------
+        fingerprint_path : pathlib.Path
+            The file the fingerprint is stored in.
+
+
+        Returns
+        -------
+        WorldFingerprint
+            The stored fingerprint.
+            None if there is no readable fingerprint.
+        """
+
+        try:
+            with open(fingerprint_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            if data.get('version') != FINGERPRINT_VERSION:
+                return None
+
+            return cls(
+                source_files=data['source_files'],
+                source_hash=data['source_hash'],
+                target_files=data['target_files'],
+                target_hash=data['target_hash'],
+                target_location=data['target_location'],
+                options=data['options']
+            )
+
+        except (OSError, ValueError, KeyError, AttributeError):
+            return None
+
+
+    def save(self, fingerprint_path : Path) -> bool:
+        """
+        Saves the fingerprint to its file, replacing the file atomically.
+
+
+        Parameters
+        ----------
+        fingerprint_path : pathlib.Path
+            The file to store the fingerprint in.
+
+
+        Returns
+        -------
+        bool
+            True,   if the fingerprint was saved.
+            False,  otherwise.
+        """
+
+        fingerprint_path = Path(fingerprint_path)
+        temp_path = fingerprint_path.with_name(
+            f'{fingerprint_path.name}.{os.getpid()}.tmp'
+        )
+
+        try:
+            fingerprint_path.parent.mkdir(parents=True, exist_ok=True)
+
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'version' : FINGERPRINT_VERSION,
+                    'source_files' : self.source_files,
+                    'source_hash' : self.source_hash,
+                    'target_files' : self.target_files,
+                    'target_hash' : self.target_hash,
+                    'target_location' : self.target_location,
+                    'options' : self.options
+                }, f)
+
+            os.replace(temp_path, fingerprint_path)
+
+        # without a fingerprint, the next conversion is simply not skipped
+        except OSError:
+            return False
+
+        return True
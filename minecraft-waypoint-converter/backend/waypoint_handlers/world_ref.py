@@ -0,0 +1,43 @@
+"""world_ref.py
+
+Contains the record that identifies a world/server in a waypoint mod,
+once its name has been resolved.
+"""
+
+from dataclasses import dataclass
+
+
+
+@dataclass(frozen=True, slots=True)
+class WorldRef:
+    """
+    A world/server of a waypoint mod, resolved once from a searched name
+    and then passed to every mod handler method that works on the world,
+    so the world is never searched for again.
+
+
+    Attributes
+    ----------
+    mod_name : str
+        The name of the mod the world belongs to.
+
+    file_name : str
+        The name of the world as it appears in the mod's file system.
+
+    name : str
+        The general name of the world, parsed from `file_name`.
+
+    world_type : str
+        Indication of what type of world the world is.
+
+    location : str
+        Where the mod stores the world's waypoints: the key of the world
+        for mods storing all worlds in a single file, or the path of the
+        world's directory for mods storing worlds in directories.
+    """
+
+    mod_name : str
+    file_name : str
+    name : str
+    world_type : str
+    location : str
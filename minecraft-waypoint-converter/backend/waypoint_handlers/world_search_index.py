@@ -0,0 +1,266 @@
+"""world_search_index.py
+
+Contains a class that searches world/server names through a trigram
+index, ranking the matches.
+"""
+
+from collections import defaultdict
+
+
+from typing import Iterable
+
+
+# names holding less than this share of the search's trigrams are not
+# considered fuzzy matches
+FUZZY_THRESHOLD : float = 0.5
+
+MATCH_EXACT : int = 0
+MATCH_PREFIX : int = 1
+MATCH_SUBSTRING : int = 2
+MATCH_FUZZY : int = 3
+
+# how a search matching several worlds is settled: by asking the user,
+# by failing, by taking the match listed first by the mod, or by taking
+# the best ranked match
+AMBIGUITY_POLICIES : tuple[str, ...] = ('prompt', 'error', 'first', 'best')
+
+
+
+class AmbiguousWorldError(LookupError):
+    """
+    Raised when a search matches several worlds and the ambiguity policy
+    does not allow choosing one of them.
+
+
+    Attributes
+    ----------
+    search_name : str
+        The name that was searched for.
+
+    matches : list[str]
+        The file system names of the matching worlds, best match first.
+    """
+
+    def __init__(self, search_name : str, matches : list[str]) -> None:
+
+        super().__init__(
+            f'{len(matches)} worlds match "{search_name}": {', '.join(matches)}'
+        )
+
+        self.search_name : str = search_name
+        self.matches : list[str] = matches
+
+
+
+class WorldSearchIndex:
+    """
+    A class that searches world/server names through a trigram index
+    built over the casefolded names.
+
+    Matches are ranked in tiers: exact matches first, then names starting
+    with the search, then names containing it, and finally, if asked for,
+    fuzzy matches holding enough of the search's trigrams. Within a tier,
+    shorter names come first, as they match a larger part of the search,
+    and fuzzy matches are ordered by the share of trigrams they hold.
+
+
+    Attributes
+    ----------
+    world_names : list[str]
+        The distinct names held in the index, in the order they were given.
+    """
+
+    def __init__(self, world_names : Iterable[str]) -> None:
+        """
+        Initializes a WorldSearchIndex instance.
+
+
+        Parameters
+        ----------
+        world_names : Iterable[str]
+            The world/server names to index.
+        """
+
+        self.world_names : list[str] = list(dict.fromkeys(world_names))
+
+        self._folded_names : list[str] = [
+            name.casefold() for name in self.world_names
+        ]
+        self._exact : dict[str, list[int]] = defaultdict(list)
+        self._postings : dict[str, set[int]] = defaultdict(set)
+
+        for index, folded_name in enumerate(self._folded_names):
+
+            self._exact[folded_name].append(index)
+
+            for trigram in self._trigrams(folded_name):
+                self._postings[trigram].add(index)
+
+
+    def search(self, search_name : str, fuzzy : bool = True) -> list[str]:
+        """
+        Finds the indexed names matching `search_name`, best match first.
+
+
+        Parameters
+        ----------
+        search_name : str
+            The full or partial name to search for.
+
+        fuzzy : bool, default=True
+            True,   to include fuzzy matches after the other tiers.
+            False,  to only include names containing `search_name`.
+
+
+        Returns
+        -------
+        list[str]
+            The matching names, ranked.
+        """
+
+        return [
+            self.world_names[index]
+            for _, index in self._ranked_matches(search_name, fuzzy)
+        ]
+
+
+    def exact_matches(self, search_name : str) -> list[str]:
+        """
+        Finds the indexed names equal to `search_name`, ignoring case.
+
+
+        Parameters
+        ----------
+        search_name : str
+            The full name to search for.
+
+
+        Returns
+        -------
+        list[str]
+            The matching names.
+        """
+
+        return [
+            self.world_names[index]
+            for index in self._exact.get(search_name.casefold(), ())
+        ]
+
+
+    def best_match(self, search_name : str) -> str | None:
+        """
+        Finds the single best match for `search_name`, without prompting.
+
+
+        Parameters
+        ----------
+        search_name : str
+            The full or partial name to search for.
+
+
+        Returns
+        -------
+        str
+            The best matching name.
+            None, if no name matches.
+        """
+
+        matches = self._ranked_matches(search_name, fuzzy=True)
+
+        return self.world_names[matches[0][1]] if matches else None
+
+
+
+    ####################################################################
+    #####                      Other Methods                       #####
+    ####################################################################
+
+    def _ranked_matches(
+            self,
+            search_name : str,
+            fuzzy : bool
+        ) -> list[tuple[int, int]]:
+        """
+        Finds and ranks the names matching `search_name`.
+
+
+        Returns
+        -------
+        list[tuple[int, int]]
+            The (tier, index) of each match, sorted best first.
+        """
+
+        folded_search = search_name.casefold()
+        search_trigrams = self._trigrams(folded_search)
+        folded_names = self._folded_names
+
+        # (tier, negated similarity, name length, index), so that sorting
+        # puts the best match first
+        ranked : list[tuple[int, float, int, int]] = []
+
+        # every name containing the search contains all of its trigrams,
+        # so only the names in every posting list need to be checked
+        if search_trigrams:
+            postings = sorted(
+                (self._postings.get(trigram, set()) for trigram in search_trigrams),
+                key=len
+            )
+            candidates = postings[0].intersection(*postings[1:])
+        else:
+            candidates = range(len(folded_names))
+
+        matched = set()
+
+        for index in candidates:
+
+            folded_name = folded_names[index]
+
+            if folded_name == folded_search:
+                tier = MATCH_EXACT
+            elif folded_name.startswith(folded_search):
+                tier = MATCH_PREFIX
+            elif folded_search in folded_name:
+                tier = MATCH_SUBSTRING
+            else:
+                continue
+
+            matched.add(index)
+            ranked.append((tier, 0.0, len(folded_name), index))
+
+        if fuzzy and search_trigrams:
+
+            shared_counts : dict[int, int] = defaultdict(int)
+
+            for trigram in search_trigrams:
+                for index in self._postings.get(trigram, ()):
+                    shared_counts[index] += 1
+
+            for index, shared in shared_counts.items():
+
+                if index in matched:
+                    continue
+
+                # measured against the search alone, since a partial
+                # name is expected to be much shorter than the world name
+                similarity = shared / len(search_trigrams)
+
+                if similarity >= FUZZY_THRESHOLD:
+                    ranked.append((
+                        MATCH_FUZZY,
+                        -similarity,
+                        len(folded_names[index]),
+                        index
+                    ))
+
+        ranked.sort()
+
+        return [(tier, index) for tier, _, _, index in ranked]
+
+
+    @staticmethod
+    def _trigrams(text : str) -> set[str]:
+        """
+        Gets the distinct three character substrings of `text`.
+        """
+
+        return {text[i:i + 3] for i in range(len(text) - 2)}
@@ -0,0 +1,317 @@
+"""xaeros_waypoint_parser.py
+
+Contains functions that stream waypoints out of Xaero's Minimap
+waypoint files, one line at a time, as typed records.
+"""
+
+import mmap
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from sys import intern
+
+
+from typing import Iterator, NamedTuple
+
+
+# files at least this large are parsed from a memory map rather than
+# through a text stream
+MMAP_THRESHOLD : int = 8 * 1024 * 1024
+
+WAYPOINT_PREFIX : str = 'waypoint:'
+WAYPOINT_PREFIX_BYTES : bytes = WAYPOINT_PREFIX.encode()
+
+# builds records without going through the keyword handling of the
+# generated NamedTuple constructor
+_new_waypoint = tuple.__new__
+
+
+
+class XaerosWaypoint(NamedTuple):
+    """
+    A single waypoint line of a Xaero's Minimap waypoint file.
+    Fields follow the order of the header line
+    `#waypoint:name:initials:x:y:z:color:disabled:type:set:rotate_on_tp:tp_yaw:visibility_type:destination`
+    """
+
+    name : str
+    initials : str
+    x : int
+    y : int
+    z : int
+    color : int
+    disabled : bool
+    type : int
+    set : str
+    rotate_on_tp : bool
+    tp_yaw : int
+    visibility_type : int
+    destination : bool
+
+
+
+@dataclass(slots=True)
+class UnparsedLines:
+    """
+    The lines of a Xaero's Minimap waypoint file that were not parsed
+    into waypoints, such as the sets line, header comments, and waypoint
+    lines that could not be parsed (e.g. with `~` for y, or not valid
+    UTF-8). They are kept where they were in the file, so that writing
+    the file again leaves them unchanged and in place.
+
+    Bytes that are not valid UTF-8 are held as surrogate escapes, and
+    written back as the same bytes.
+
+
+    Attributes
+    ----------
+    headers : list[str]
+        The lines before the first waypoint, without their line endings.
+
+    following : dict[str, list[str]]
+        The lines after each waypoint, up to the next waypoint, keyed by
+        the name of the waypoint they follow.
+    """
+
+    headers : list[str] = field(default_factory=list)
+    following : dict[str, list[str]] = field(default_factory=dict)
+
+
+    def add(self, previous_name : str | None, line : str) -> None:
+        """
+        Keeps a line that follows the waypoint named `previous_name`,
+        or that comes before every waypoint if it is None.
+        """
+
+        if previous_name is None:
+            self.headers.append(line)
+        else:
+            self.following.setdefault(previous_name, []).append(line)
+
+
+    def unreadable_lines(self) -> Iterator[str]:
+        """
+        Iterates over the kept lines that are waypoint lines, which
+        could not be parsed.
+        """
+
+        for line in self.headers:
+            if line.startswith(WAYPOINT_PREFIX):
+                yield line
+
+        for lines in self.following.values():
+            for line in lines:
+                if line.startswith(WAYPOINT_PREFIX):
+                    yield line
+
+
+
+def parse_waypoint_line(line : str) -> XaerosWaypoint | None:
+    """
+    Parses a single line of a Xaero's Minimap waypoint file.
+
+
+    Parameters
+    ----------
+    line : str
+        The line from the file.
+
+
+    Returns
+    -------
+    XaerosWaypoint
+        The parsed waypoint.
+        None, if the line does not contain waypoint data or upon error.
+    """
+
+    if not line.startswith(WAYPOINT_PREFIX):
+        return None
+
+    try:
+        (
+            _, name, initials, x, y, z, color, disabled, waypoint_type,
+            waypoint_set, rotate_on_tp, tp_yaw, visibility_type, destination
+        ) = line.rstrip('\r\n').split(':')
+
+        return _new_waypoint(XaerosWaypoint, (
+            name,
+            initials,
+            int(x),
+            int(y),
+            int(z),
+            int(color),
+            disabled == 'true',
+            int(waypoint_type),
+            intern(waypoint_set),
+            rotate_on_tp == 'true',
+            int(tp_yaw),
+            int(visibility_type),
+            destination == 'true'
+        ))
+
+    except ValueError:
+        return None
+
+
+def parse_waypoint_bytes(line : bytes) -> XaerosWaypoint | None:
+    """
+    Parses a single undecoded line of a Xaero's Minimap waypoint file.
+    Only the text fields are decoded, numbers are parsed from the bytes.
+
+
+    Parameters
+    ----------
+    line : bytes
+        The line from the file.
+
+
+    Returns
+    -------
+    XaerosWaypoint
+        The parsed waypoint.
+        None, if the line does not contain waypoint data or upon error.
+    """
+
+    if not line.startswith(WAYPOINT_PREFIX_BYTES):
+        return None
+
+    try:
+        (
+            _, name, initials, x, y, z, color, disabled, waypoint_type,
+            waypoint_set, rotate_on_tp, tp_yaw, visibility_type, destination
+        ) = line.rstrip(b'\r\n').split(b':')
+
+        return _new_waypoint(XaerosWaypoint, (
+            name.decode('utf-8'),
+            initials.decode('utf-8'),
+            int(x),
+            int(y),
+            int(z),
+            int(color),
+            disabled == b'true',
+            int(waypoint_type),
+            intern(waypoint_set.decode('utf-8')),
+            rotate_on_tp == b'true',
+            int(tp_yaw),
+            int(visibility_type),
+            destination == b'true'
+        ))
+
+    except ValueError:
+        return None
+
+
+def iter_waypoint_file(
+        file_path : Path,
+        unparsed_lines : UnparsedLines | None = None
+    ) -> Iterator[XaerosWaypoint]:
+    """
+    Streams the waypoints of a Xaero's Minimap waypoint file, parsing
+    each line as it is read. Large files are read through a memory map.
+
+
+    Parameters
+    ----------
+    file_path : pathlib.Path
+        The path of the waypoint file.
+
+    unparsed_lines : UnparsedLines, optional
+        If given, every line that is not parsed into a waypoint is kept
+        in it, along with where it was, so that it is written back
+        unchanged.
+
+
+    Yields
+    ------
+    XaerosWaypoint
+        The waypoints of the file, in the order they appear.
+    """
+
+    file_size = os.path.getsize(file_path)
+
+    if file_size == 0:
+        return
+
+    if file_size >= MMAP_THRESHOLD:
+        yield from _iter_waypoint_file_mmap(file_path, unparsed_lines)
+        return
+
+    # the name of the waypoint the next unparsed line follows, None
+    # before the first waypoint
+    previous_name : str | None = None
+
+    # bytes that are not valid UTF-8 are decoded as surrogate escapes,
+    # so that a single such line does not stop the file from being read
+    with open(file_path, 'r', encoding='utf-8', errors='surrogateescape') as f:
+        for line in f:
+
+            waypoint = parse_waypoint_line(line)
+
+            if waypoint is not None and (line.isascii() or _is_valid_text(line)):
+                previous_name = waypoint.name
+                yield waypoint
+                continue
+
+            if unparsed_lines is not None:
+                unparsed_lines.add(previous_name, line.rstrip('\r\n'))
+
+
+def _iter_waypoint_file_mmap(
+        file_path : Path,
+        unparsed_lines : UnparsedLines | None
+    ) -> Iterator[XaerosWaypoint]:
+    """
+    Streams the waypoints of a Xaero's Minimap waypoint file from a
+    memory map, parsing each line without decoding it as a whole.
+
+
+    Parameters
+    ----------
+    file_path : pathlib.Path
+        The path of the waypoint file.
+
+    unparsed_lines : UnparsedLines | None
+        If given, every line that is not parsed into a waypoint is kept
+        in it.
+
+
+    Yields
+    ------
+    XaerosWaypoint
+        The waypoints of the file, in the order they appear.
+    """
+
+    previous_name : str | None = None
+
+    with open(file_path, 'rb') as f, \
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+
+        for raw_line in iter(mapped_file.readline, b''):
+
+            # lines that are not valid UTF-8 fail to decode, which is a
+            # ValueError, so they are not parsed
+            waypoint = parse_waypoint_bytes(raw_line)
+
+            if waypoint is not None:
+                previous_name = waypoint.name
+                yield waypoint
+                continue
+
+            if unparsed_lines is not None:
+                unparsed_lines.add(
+                    previous_name,
+                    raw_line.decode('utf-8', 'surrogateescape').rstrip('\r\n')
+                )
+
+
+def _is_valid_text(line : str) -> bool:
+    """
+    Checks whether a line read with surrogate escapes was valid UTF-8.
+    """
+
+    try:
+        line.encode('utf-8')
+    except UnicodeEncodeError:
+        return False
+
+    return True
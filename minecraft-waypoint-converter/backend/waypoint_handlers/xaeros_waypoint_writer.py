@@ -0,0 +1,149 @@
+"""xaeros_waypoint_writer.py
+
+Contains functions that serialize typed Xaero's Minimap waypoint records
+back into a waypoint file, in a single write.
+"""
+
+import os
+from pathlib import Path
+
+from lunapyutils import print_script_message
+
+from .xaeros_waypoint_parser import (
+    WAYPOINT_PREFIX, UnparsedLines, XaerosWaypoint
+)
+
+
+from typing import Iterable
+
+
+# precompiled once, rather than building a format string per waypoint
+WAYPOINT_LINE_TEMPLATE : str = (
+    WAYPOINT_PREFIX + '%s:%s:%d:%d:%d:%d:%s:%d:%s:%s:%d:%d:%s'
+)
+
+# Xaero's writes booleans in lower case
+_BOOL_TEXT : tuple[str, str] = ('false', 'true')
+
+
+
+def format_waypoint_file(
+        unparsed_lines : UnparsedLines,
+        waypoints : Iterable[XaerosWaypoint]
+    ) -> str:
+    """
+    Formats the full contents of a Xaero's Minimap waypoint file into
+    a single buffer.
+
+
+    Parameters
+    ----------
+    unparsed_lines : UnparsedLines
+        The lines that are not parsed waypoints (sets line, header
+        comments, unreadable waypoint lines), to write unchanged where
+        they were.
+
+    waypoints : Iterable[XaerosWaypoint]
+        The waypoints to write, in order.
+
+
+    Returns
+    -------
+    str
+        The contents of the file.
+    """
+
+    template = WAYPOINT_LINE_TEMPLATE
+    bool_text = _BOOL_TEXT
+
+    following = unparsed_lines.following
+
+    if following:
+        # iterated twice, to put the unparsed lines after their waypoint
+        waypoints = list(waypoints)
+
+    waypoint_lines = [
+        template % (
+            name, initials, x, y, z, color, bool_text[disabled],
+            waypoint_type, waypoint_set, bool_text[rotate_on_tp], tp_yaw,
+            visibility_type, bool_text[destination]
+        )
+        for (
+            name, initials, x, y, z, color, disabled, waypoint_type,
+            waypoint_set, rotate_on_tp, tp_yaw, visibility_type, destination
+        ) in waypoints
+    ]
+
+    lines = unparsed_lines.headers.copy()
+
+    if not following:
+        lines.extend(waypoint_lines)
+
+    else:
+        for waypoint, waypoint_line in zip(waypoints, waypoint_lines):
+            lines.append(waypoint_line)
+            lines.extend(following.get(waypoint.name, ()))
+
+    return '\n'.join(lines) + '\n' if lines else ''
+
+
+def write_waypoint_file(
+        file_path : Path,
+        unparsed_lines : UnparsedLines,
+        waypoints : Iterable[XaerosWaypoint]
+    ) -> bool:
+    """
+    Writes a Xaero's Minimap waypoint file. The file is written to a
+    temporary file first and then renamed over the original, so the
+    mod never sees a partially written file.
+
+
+    Parameters
+    ----------
+    file_path : pathlib.Path
+        The path of the waypoint file.
+
+    unparsed_lines : UnparsedLines
+        The lines that are not parsed waypoints, to write unchanged
+        where they were.
+
+    waypoints : Iterable[XaerosWaypoint]
+        The waypoints to write, in order.
+
+
+    Returns
+    -------
+    bool
+        True,   if the file was written.
+        False,  otherwise.
+    """
+
+    file_path = Path(file_path)
+    temp_path = file_path.with_name(f'{file_path.name}.{os.getpid()}.tmp')
+
+    try:
+        contents = format_waypoint_file(unparsed_lines, waypoints)
+
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # surrogate escapes are written back as the bytes they were read
+        # from, so lines that are not valid UTF-8 are kept unchanged
+        with open(
+            temp_path, 'w',
+            encoding='utf-8', errors='surrogateescape', newline=''
+        ) as f:
+            f.write(contents)
+
+        os.replace(temp_path, file_path)
+
+    except (OSError, TypeError, ValueError) as e:
+        print_script_message(f'Error writing {file_path}: {e}')
+
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+        return False
+
+    return True
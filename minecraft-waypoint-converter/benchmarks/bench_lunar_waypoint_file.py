@@ -0,0 +1,206 @@
+"""bench_lunar_waypoint_file.py
+
+Benchmarks reading and writing a single world of a large Lunar Client
+waypoint file by parsing and serializing the whole file, as the handler
+used to, against `LunarWaypointFile`, which only parses and serializes
+that world.
+
+Times are measured without tracing, and the peak memory of each
+approach is measured in a separate run with `tracemalloc`.
+
+Run from the repository root:
+    python minecraft-waypoint-converter/benchmarks/bench_lunar_waypoint_file.py
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'backend'))
+
+from waypoint_handlers.lunar_waypoint_file import LunarWaypointFile
+
+
+
+def build_waypoint_file(
+        file_path : Path,
+        world_count : int,
+        waypoint_count : int,
+        indent : int | None,
+        seed : int = 0
+    ) -> None:
+    """
+    Writes a waypoint file with `world_count` servers, each with
+    `waypoint_count` waypoints.
+    """
+
+    rng = random.Random(seed)
+
+    document = {'version' : 1, 'waypoints' : {
+        f'mp:server{i}.example.com' : {'' : {
+            f'waypoint {j}' : {
+                'location' : {
+                    'x' : rng.uniform(-10_000, 10_000),
+                    'y' : float(rng.randint(-64, 320)),
+                    'z' : rng.uniform(-10_000, 10_000)
+                },
+                'visible' : True,
+                'dimension' : rng.choice((-1, 0, 1)),
+                'color' : {'value' : rng.randrange(16)},
+                'showBeam' : True,
+                'showText' : True
+            }
+            for j in range(waypoint_count)
+        }}
+        for i in range(world_count)
+    }}
+
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=indent)
+
+
+def read_whole_file(file_path : Path, world_key : str) -> dict:
+    """
+    Reads a world by parsing the whole file.
+    """
+
+    with open(file_path, 'rb') as f:
+        return json.load(f)['waypoints'][world_key]['']
+
+
+def read_one_world(file_path : Path, world_key : str) -> dict:
+    """
+    Lists the worlds and reads one of them with `LunarWaypointFile`, as
+    the handler does when searching for and converting a world.
+    """
+
+    waypoint_file = LunarWaypointFile(file_path)
+    waypoint_file.get_world_keys()
+
+    return waypoint_file.read_world_waypoints(world_key)
+
+
+def write_whole_file(file_path : Path, document : dict) -> None:
+    """
+    Writes a world by serializing the whole, already parsed, document
+    in a single call, compactly, and writing it through a temporary
+    file. This is the fastest a whole-file writer can be, rather than
+    how the handler used to write the file.
+    """
+
+    temp_path = file_path.with_name(f'{file_path.name}.{os.getpid()}.tmp')
+    contents = json.dumps(
+        document, ensure_ascii=False, separators=(',', ':')
+    ).encode('utf-8')
+
+    with open(temp_path, 'wb') as f:
+        f.write(contents)
+
+    os.replace(temp_path, file_path)
+
+
+def write_one_world(
+        waypoint_file : LunarWaypointFile,
+        world_key : str,
+        waypoints : dict
+    ) -> None:
+    """
+    Writes a world by splicing it into an already scanned file.
+    """
+
+    waypoint_file.write_worlds({world_key : waypoints})
+
+
+def measure(function, *args, repeat : int) -> tuple[float, float]:
+    """
+    Gets the fastest run time of `function` in seconds, and its peak
+    memory in bytes.
+    """
+
+    run_time = math.inf
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        run_time = min(run_time, time.perf_counter() - start)
+
+    tracemalloc.start()
+    function(*args)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return run_time, peak_memory
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument('--worlds', type=int, default=5_000)
+    parser.add_argument('--waypoints', type=int, default=20)
+    parser.add_argument(
+        '--indent', type=int, default=2,
+        help='indent of the file, 0 for a compact file'
+    )
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        file_path = Path(tmp_dir, 'waypoints.json')
+        build_waypoint_file(
+            file_path, args.worlds, args.waypoints, args.indent or None
+        )
+
+        world_key = f'mp:server{args.worlds // 2}.example.com'
+
+        assert read_whole_file(file_path, world_key) \
+            == read_one_world(file_path, world_key)
+
+        print(
+            f'{args.worlds:,} worlds, {args.waypoints} waypoints each, '
+            f'{file_path.stat().st_size / 1024 / 1024:.1f} MiB'
+        )
+
+        with open(file_path, 'rb') as f:
+            document = json.load(f)
+
+        waypoints = dict(document['waypoints'][world_key][''])
+        waypoints['new waypoint'] = next(iter(waypoints.values()))
+        document['waypoints'][world_key][''] = waypoints
+
+        waypoint_file = LunarWaypointFile(file_path)
+        waypoint_file.refresh()
+
+        # the whole file is written to another file, since it is written
+        # compactly, which would change how the other file is scanned
+        whole_file_path = file_path.with_name('whole_waypoints.json')
+
+        for label, function, function_args in [
+            ('read whole file ', read_whole_file, (file_path, world_key)),
+            ('read one world  ', read_one_world, (file_path, world_key)),
+            ('write whole file', write_whole_file, (whole_file_path, document)),
+            ('write one world ', write_one_world,
+                (waypoint_file, world_key, waypoints)),
+        ]:
+            run_time, peak_memory = measure(
+                function, *function_args, repeat=args.repeat
+            )
+            print(
+                f'  {label}  {run_time * 1000:>8.1f} ms  '
+                f'peak {peak_memory / 1024 / 1024:>7.1f} MiB'
+            )
+
+        # both writes leave the same waypoints behind
+        with open(file_path, 'rb') as f, open(whole_file_path, 'rb') as g:
+            assert json.load(f) == json.load(g) == document
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""bench_near_duplicates.py
+
+Benchmarks finding near duplicate waypoints with the spatial hash grid
+of `NearDuplicateFilter` against comparing every pair of waypoints, for
+worlds where some of the converted waypoints are copies of others under
+a different name, moved by less than the radius.
+
+Comparing every pair is quadratic, so it is only run for the smaller
+worlds.
+
+Run from the repository root:
+    python minecraft-waypoint-converter/benchmarks/bench_near_duplicates.py
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'backend'))
+
+from waypoint_handlers.near_duplicates import NearDuplicateFilter
+from waypoint_handlers.reporting import NullReporter, set_reporter
+from waypoint_handlers.waypoint_table import WaypointTable
+
+
+
+DIMENSIONS : tuple[str, str, str] = ('overworld', 'nether', 'end')
+
+
+def build_waypoints(
+        count : int,
+        duplicate_share : float,
+        radius : float,
+        seed : int = 0
+    ) -> WaypointTable:
+    """
+    Builds a table of waypoints spread over a world 30 000 blocks wide,
+    where `duplicate_share` of them are renamed copies of an earlier
+    waypoint, moved by less than `radius`.
+    """
+
+    rng = random.Random(seed)
+    table = WaypointTable()
+
+    for i in range(count):
+
+        if i and rng.random() < duplicate_share:
+            original = rng.randrange(len(table))
+            offset = radius / 2
+            table.append(
+                name=f'{table.names[original]} {i}',
+                dimension=table.dimension_names[table.dimension_codes[original]],
+                x=table.x[original] + rng.uniform(-offset, offset),
+                y=table.y[original],
+                z=table.z[original] + rng.uniform(-offset, offset)
+            )
+            continue
+
+        table.append(
+            name=f'waypoint {i}',
+            dimension=rng.choice(DIMENSIONS),
+            x=rng.uniform(-15_000, 15_000),
+            y=rng.uniform(-64, 320),
+            z=rng.uniform(-15_000, 15_000)
+        )
+
+    return table
+
+
+def count_pairwise(table : WaypointTable, radius : float) -> int:
+    """
+    Counts the waypoints that are near an earlier one by comparing every
+    pair, the quadratic approach the grid replaces.
+    """
+
+    rows = list(table.rows())
+    count = 0
+
+    for i, (name, dimension, x, y, z, *_) in enumerate(rows):
+        for other_name, other_dimension, other_x, other_y, other_z, *_ in rows[:i]:
+            if other_dimension == dimension and other_name != name \
+            and math.dist((x, y, z), (other_x, other_y, other_z)) <= radius:
+                count += 1
+                break
+
+    return count
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument(
+        '--counts', type=int, nargs='+', default=[1_000, 5_000, 100_000, 250_000]
+    )
+    parser.add_argument('--duplicate-share', type=float, default=0.1)
+    parser.add_argument('--radius', type=float, default=2.0)
+    parser.add_argument(
+        '--pairwise-limit', type=int, default=5_000,
+        help='largest number of waypoints to compare pairwise'
+    )
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    # only the time taken to find the duplicates is measured
+    set_reporter(NullReporter())
+
+    near_duplicate_filter = NearDuplicateFilter('skip', args.radius)
+
+    for count in args.counts:
+
+        table = build_waypoints(count, args.duplicate_share, args.radius)
+
+        kept = None
+        grid_time = math.inf
+
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            kept = near_duplicate_filter.apply(table)
+            grid_time = min(grid_time, time.perf_counter() - start)
+
+        line = (
+            f'{count:>9,} waypoints  {count - len(kept):>7,} near duplicates  '
+            f'grid {grid_time * 1000:>8.1f} ms'
+        )
+
+        if count <= args.pairwise_limit:
+            start = time.perf_counter()
+            pairwise_count = count_pairwise(table, args.radius)
+            pairwise_time = time.perf_counter() - start
+
+            line += f'  pairwise {pairwise_time * 1000:>9.1f} ms'
+
+            # skipped waypoints are not compared with later ones, so the
+            # counts can differ by chains of near duplicates
+            line += f' ({pairwise_count:,} found)'
+
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""bench_standard_formats.py
+
+Benchmarks writing and reading the standardized waypoints of a large
+world in each format they can be stored in, along with the size of the
+file each format writes.
+
+Run from the repository root:
+    python minecraft-waypoint-converter/benchmarks/bench_standard_formats.py
+"""
+
+import argparse
+import math
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'backend'))
+
+from waypoint_handlers.waypoint_serializers import SERIALIZATION_FORMATS, get_serializer
+from waypoint_handlers.waypoint_table import WaypointTable
+
+
+
+DIMENSIONS : tuple[str, str, str] = ('overworld', 'nether', 'end')
+
+
+def build_waypoints(count : int, seed : int = 0) -> WaypointTable:
+    """
+    Builds a table of waypoints with unique names, spread over the three
+    vanilla dimensions and a few waypoint sets.
+    """
+
+    rng = random.Random(seed)
+    table = WaypointTable()
+
+    for i in range(count):
+        table.append(
+            name=f'waypoint {i}',
+            dimension=DIMENSIONS[i % 3],
+            x=float(rng.randint(-30_000, 30_000)),
+            y=float(rng.randint(-64, 320)),
+            z=float(rng.randint(-30_000, 30_000)),
+            color=rng.randrange(16),
+            visible=rng.random() < 0.9,
+            set_name=f'set {i % 4}' if i % 5 else None
+        )
+
+    return table
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument(
+        '--waypoints', type=int, default=20_000,
+        help='number of waypoints, YAML takes minutes past 50 000'
+    )
+    parser.add_argument(
+        '--formats', nargs='+', choices=SERIALIZATION_FORMATS,
+        default=list(SERIALIZATION_FORMATS)
+    )
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    table = build_waypoints(args.waypoints)
+
+    print(f'{args.waypoints:,} waypoints')
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        for format_name in args.formats:
+
+            serializer = get_serializer(format_name)
+            file_path = Path(tmp_dir, f'world{serializer.file_suffix}')
+
+            write_time = read_time = math.inf
+
+            for _ in range(args.repeat):
+
+                start = time.perf_counter()
+                serializer.write(file_path, table)
+                write_time = min(write_time, time.perf_counter() - start)
+
+                start = time.perf_counter()
+                read_table = serializer.read(file_path)
+                read_time = min(read_time, time.perf_counter() - start)
+
+            # the waypoints are read back as they were written, YAML
+            # grouping them by dimension
+            round_trip = 'ok' if sorted(read_table.rows()) == sorted(table.rows()) \
+                else 'MISMATCH'
+
+            print(
+                f'  {format_name:<7}  write {write_time * 1000:>8.1f} ms  '
+                f'read {read_time * 1000:>8.1f} ms  '
+                f'size {file_path.stat().st_size / 1024:>9.1f} KiB  '
+                f'round trip {round_trip}'
+            )
+
+
+if __name__ == '__main__':
+    main()
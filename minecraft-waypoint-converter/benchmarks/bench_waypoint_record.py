@@ -0,0 +1,118 @@
+"""bench_waypoint_record.py
+
+Benchmarks the slotted `Waypoint` record against the previous nested
+dict standardized format, for building and for reading every waypoint.
+
+Run from the repository root:
+    python minecraft-waypoint-converter/benchmarks/bench_waypoint_record.py
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'backend'))
+
+from waypoint_handlers.waypoint import Waypoint
+
+
+DIMENSIONS = ('overworld', 'nether', 'end')
+
+
+
+def build_nested_dicts(count : int) -> dict:
+    """
+    The previous standardized format: dimension -> name -> dict with a
+    nested coordinates dict.
+    """
+
+    standardized = {dimension : {} for dimension in DIMENSIONS}
+
+    for i in range(count):
+        standardized[DIMENSIONS[i % 3]][f'wp {i}'] = {
+            'coordinates' : {
+                'x' : float(i),
+                'y' : float(i % 320),
+                'z' : float(-i)
+            },
+            'color' : i % 16,
+            'visible' : True
+        }
+
+    return standardized
+
+
+def build_records(count : int) -> list[Waypoint]:
+    """
+    The standardized format as a list of `Waypoint` records.
+    """
+
+    return [
+        Waypoint(
+            f'wp {i}',
+            DIMENSIONS[i % 3],
+            float(i),
+            float(i % 320),
+            float(-i),
+            i % 16,
+            True,
+            '01 Portals'
+        )
+        for i in range(count)
+    ]
+
+
+def read_nested_dicts(standardized : dict) -> float:
+
+    total = 0.0
+    for waypoints in standardized.values():
+        for wp_data in waypoints.values():
+            total += wp_data['coordinates']['x'] + wp_data['coordinates']['z']
+    return total
+
+
+def read_records(waypoints : list[Waypoint]) -> float:
+
+    total = 0.0
+    for waypoint in waypoints:
+        total += waypoint.x + waypoint.z
+    return total
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument('--count', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f'{args.count:,} waypoints')
+
+    for label, build, read in (
+        ('nested dicts', build_nested_dicts, read_nested_dicts),
+        ('Waypoint records', build_records, read_records),
+    ):
+        tracemalloc.start()
+        data = build(args.count)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del data
+
+        start = time.perf_counter()
+        data = build(args.count)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        read(data)
+        read_time = time.perf_counter() - start
+
+        print(
+            f'  {label:<18} memory {current / 2**20:>8.1f} MiB'
+            f'  build {build_time:>6.2f} s  read {read_time:>6.2f} s'
+        )
+        del data
+
+
+if __name__ == '__main__':
+    main()
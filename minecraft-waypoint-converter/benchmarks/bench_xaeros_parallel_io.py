@@ -0,0 +1,152 @@
+"""bench_xaeros_parallel_io.py
+
+Benchmarks reading, writing, and backing up the dimension files of a
+Xaero's Minimap world one file at a time against doing so on a pool of
+I/O threads, for a modded world with many dimensions.
+
+A fixed latency can be added to every file read, write, and blob copy,
+to stand in for a slow or network disk, where the threads help most.
+
+Run from the repository root:
+    python minecraft-waypoint-converter/benchmarks/bench_xaeros_parallel_io.py
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'backend'))
+
+from waypoint_handlers import backup_store, waypoint_handler_xaeros
+from waypoint_handlers.backup_store import BackupStore
+from waypoint_handlers.reporting import NullReporter, set_reporter
+from waypoint_handlers.waypoint_handler_xaeros import XaerosWaypointHandler
+
+from bench_xaeros_parser import write_dimension_file
+
+
+
+def build_world(world_path : Path, dimension_count : int, line_count : int) -> None:
+    """
+    Writes a world with the three vanilla dimensions, plus enough
+    modded `dim%N` dimensions to have `dimension_count` in total.
+    """
+
+    dimension_dirs = ['dim%0', 'dim%-1', 'dim%1'] + [
+        f'dim%{i}' for i in range(2, dimension_count - 1)
+    ]
+
+    for dimension_dir in dimension_dirs[:dimension_count]:
+        file_path = Path(world_path, dimension_dir, 'mw$default_1.txt')
+        file_path.parent.mkdir(parents=True)
+        write_dimension_file(file_path, line_count)
+
+        # so that no two files are stored as the same backup blob
+        with open(file_path, 'a', encoding='utf-8') as f:
+            f.write(f'waypoint:{dimension_dir}:D:0:64:0:0:false:0:gui.xaero_default:false:0:0:false\n')
+
+
+def add_latency(latency : float) -> None:
+    """
+    Wraps the file reads, writes, and blob copies of the handler in a
+    fixed sleep, which releases the GIL like blocking disk I/O does.
+    """
+
+    if latency <= 0:
+        return
+
+    def delayed(function):
+        def wrapper(*args, **kwargs):
+            time.sleep(latency)
+            return function(*args, **kwargs)
+        return wrapper
+
+    waypoint_handler_xaeros.iter_waypoint_file = delayed(
+        waypoint_handler_xaeros.iter_waypoint_file
+    )
+    waypoint_handler_xaeros.write_waypoint_file = delayed(
+        waypoint_handler_xaeros.write_waypoint_file
+    )
+    backup_store._copy_file = delayed(backup_store._copy_file)
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument('--dimensions', type=int, default=24)
+    parser.add_argument('--lines', type=int, default=2_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument(
+        '--latency-ms', type=float, default=20.0,
+        help='latency added to every file read, write, and blob copy'
+    )
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    add_latency(args.latency_ms / 1000)
+
+    # the events of the writes are not shown, only their time
+    set_reporter(NullReporter())
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        build_world(Path(tmp_dir, 'world'), args.dimensions, args.lines)
+
+        print(
+            f'{args.dimensions} dimensions, {args.lines:,} waypoints each, '
+            f'{args.latency_ms:g} ms added latency'
+        )
+
+        for io_workers in args.workers:
+
+            handler = XaerosWaypointHandler(
+                input_directory_path=Path(tmp_dir),
+                io_workers=io_workers
+            )
+            world = handler.make_world_ref('world')
+            waypoints = handler._get_world_waypoints(world=world)
+
+            timings = []
+
+            for label, function in [
+                ('read', lambda: handler._get_world_waypoints(world=world)),
+                ('write', lambda: handler._add_waypoints_to_mod(world, waypoints)),
+                ('backup', lambda: _back_up(handler, world, tmp_dir)),
+            ]:
+                timings.append((
+                    label,
+                    min(_time(function) for _ in range(args.repeat))
+                ))
+
+            print(f'  {io_workers} worker(s)  ' + '  '.join(
+                f'{label} {elapsed * 1000:>8.1f} ms' for label, elapsed in timings
+            ))
+
+            handler.close()
+
+
+def _back_up(handler : XaerosWaypointHandler, world, tmp_dir : str) -> None:
+    """
+    Backs up the world into an empty store, so every file is copied.
+    """
+
+    handler.backup_store = BackupStore(
+        tempfile.mkdtemp(prefix='backups-', dir=tmp_dir)
+    )
+    handler.create_backup(world=world)
+
+
+def _time(function) -> float:
+    """
+    Runs `function` once and returns its run time in seconds.
+    """
+
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    main()
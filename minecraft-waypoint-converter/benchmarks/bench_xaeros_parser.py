@@ -0,0 +1,167 @@
+"""bench_xaeros_parser.py
+
+Benchmarks the streaming Xaero's Minimap waypoint parser against the
+previous list-of-lines and dict-per-waypoint implementation.
+
+Run from the repository root:
+    python minecraft-waypoint-converter/benchmarks/bench_xaeros_parser.py
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'backend'))
+
+from waypoint_handlers import xaeros_waypoint_parser
+from waypoint_handlers.xaeros_waypoint_parser import iter_waypoint_file
+
+
+HEADER_LINES = [
+    'sets:gui.xaero_default:01 Portals:10 Caves',
+    '#',
+    '#waypoint:name:initials:x:y:z:color:disabled:type:set:rotate_on_tp:tp_yaw:visibility_type:destination',
+    '#',
+]
+
+
+
+def write_dimension_file(file_path : Path, line_count : int) -> None:
+    """
+    Writes a synthetic dimension file with `line_count` waypoints.
+    """
+
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(HEADER_LINES) + '\n')
+        for i in range(line_count):
+            f.write(
+                f'waypoint:wp {i}:W:{i * 7 - 5000}:{i % 320 - 64}:'
+                f'{5000 - i * 3}:{i % 16}:false:0:01 Portals:false:0:0:false\n'
+            )
+
+
+def parse_legacy(file_path : Path) -> dict:
+    """
+    The previous parser: reads every line into a list, then builds a
+    13-key dict of strings per waypoint.
+    """
+
+    with open(file_path, 'r') as f:
+        lines = f.readlines()
+
+    waypoints = {}
+
+    for line in lines:
+
+        if line.startswith('sets') or line.startswith('#'):
+            continue
+
+        line_data = line.split(':')
+        waypoints[line_data[1]] = {
+            'name' : line_data[1],
+            'initials' : line_data[2],
+            'x' : line_data[3],
+            'y' : line_data[4],
+            'z' : line_data[5],
+            'color' : line_data[6],
+            'disabled' : line_data[7],
+            'type' : line_data[8],
+            'set' : line_data[9],
+            'rotate_on_tp' : line_data[10],
+            'tp_yaw' : line_data[11],
+            'visibility_type' : line_data[12],
+            'destination' : line_data[13]
+        }
+
+    return waypoints
+
+
+def parse_streaming(file_path : Path) -> dict:
+    """
+    The streaming parser, building the same name-keyed dict.
+    """
+
+    return {waypoint.name : waypoint for waypoint in iter_waypoint_file(file_path)}
+
+
+def parse_streaming_count(file_path : Path) -> int:
+    """
+    The streaming parser without keeping the records, the cost of a
+    pure pass over the file.
+    """
+
+    return sum(1 for _ in iter_waypoint_file(file_path))
+
+
+def measure(function, file_path : Path) -> tuple[float, int]:
+    """
+    Runs `function` once for timing, then once under tracemalloc.
+
+    Returns
+    -------
+    tuple[float, int]
+        the run time in seconds and the peak traced memory in bytes
+    """
+
+    start = time.perf_counter()
+    function(file_path)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    function(file_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument(
+        '--lines', type=int, nargs='+', default=[10_000, 100_000, 500_000]
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        for line_count in args.lines:
+
+            file_path = Path(tmp_dir, f'mw$default_{line_count}.txt')
+            write_dimension_file(file_path, line_count)
+            size_mib = os.path.getsize(file_path) / 2**20
+
+            print(f'{line_count:,} lines ({size_mib:.1f} MiB)')
+
+            cases = [
+                ('legacy', parse_legacy),
+                ('streaming', parse_streaming),
+                ('streaming, no dict', parse_streaming_count),
+            ]
+
+            # force the memory mapped path regardless of file size
+            threshold = xaeros_waypoint_parser.MMAP_THRESHOLD
+            xaeros_waypoint_parser.MMAP_THRESHOLD = 0
+            mmap_result = measure(parse_streaming_count, file_path)
+            xaeros_waypoint_parser.MMAP_THRESHOLD = threshold
+
+            for label, function in cases:
+                elapsed, peak = measure(function, file_path)
+                print(
+                    f'  {label:<22} {line_count / elapsed:>12,.0f} lines/s'
+                    f'  peak {peak / 2**20:>8.1f} MiB'
+                )
+
+            elapsed, peak = mmap_result
+            print(
+                f'  {"mmap, no dict":<22} {line_count / elapsed:>12,.0f} lines/s'
+                f'  peak {peak / 2**20:>8.1f} MiB'
+            )
+
+
+if __name__ == '__main__':
+    main()
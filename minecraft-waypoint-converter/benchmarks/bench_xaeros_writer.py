@@ -0,0 +1,137 @@
+"""bench_xaeros_writer.py
+
+Benchmarks the single-pass Xaero's Minimap waypoint writer against the
+previous implementation, which re-read the file for its headers and
+built each line with an f-string of attribute lookups.
+
+Run from the repository root:
+    python minecraft-waypoint-converter/benchmarks/bench_xaeros_writer.py
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'backend'))
+
+from waypoint_handlers.xaeros_waypoint_parser import (
+    UnparsedLines, iter_waypoint_file
+)
+from waypoint_handlers.xaeros_waypoint_writer import write_waypoint_file
+
+from bench_xaeros_parser import write_dimension_file
+
+
+
+def write_legacy(file_path : Path, waypoints : dict) -> None:
+    """
+    The previous writer: checks whether the file is empty, reads it
+    again to keep the non-waypoint lines, formats each waypoint with an
+    f-string, and writes the lines over the file in place.
+    """
+
+    lines_to_write = []
+
+    if os.path.getsize(file_path) > 0:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            file_lines = f.readlines()
+
+        lines_to_write = [
+            line.strip() for line in file_lines
+            if not line.startswith('waypoint')
+        ]
+
+    for wp_name, wp_data in waypoints.items():
+
+        line_format = \
+            f'waypoint:{wp_name}:{wp_data.initials}:{wp_data.x}:' \
+            f'{wp_data.y}:{wp_data.z}:{wp_data.color}:' \
+            f'{str(wp_data.disabled).lower()}:{wp_data.type}:{wp_data.set}:' \
+            f'{str(wp_data.rotate_on_tp).lower()}:{wp_data.tp_yaw}:' \
+            f'{wp_data.visibility_type}:{str(wp_data.destination).lower()}'.strip()
+
+        lines_to_write.append(line_format)
+
+    with open(file_path, 'w', encoding='utf-8') as f:
+        for line in lines_to_write:
+            f.write(line + '\n')
+
+
+def write_single_pass(
+        file_path : Path,
+        waypoints : dict,
+        unparsed_lines : UnparsedLines
+    ) -> None:
+    """
+    The single-pass writer, reusing the unparsed lines captured while
+    reading.
+    """
+
+    write_waypoint_file(file_path, unparsed_lines, waypoints.values())
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument(
+        '--lines', type=int, nargs='+', default=[10_000, 100_000, 500_000]
+    )
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        for line_count in args.lines:
+
+            file_path = Path(tmp_dir, f'mw$default_{line_count}.txt')
+            write_dimension_file(file_path, line_count)
+            size_mib = os.path.getsize(file_path) / 2**20
+
+            unparsed_lines = UnparsedLines()
+            waypoints = {
+                waypoint.name : waypoint
+                for waypoint in iter_waypoint_file(file_path, unparsed_lines)
+            }
+
+            print(f'{line_count:,} lines ({size_mib:.1f} MiB)')
+
+            cases = [
+                ('legacy', lambda: write_legacy(file_path, waypoints)),
+                ('single pass', lambda: write_single_pass(file_path, waypoints, unparsed_lines)),
+            ]
+
+            outputs = []
+
+            for label, function in cases:
+
+                elapsed = min(
+                    _time(function) for _ in range(args.repeat)
+                )
+
+                with open(file_path, 'rb') as f:
+                    outputs.append(f.read())
+
+                print(
+                    f'  {label:<14} {elapsed * 1000:>9.1f} ms'
+                    f'  {line_count / elapsed:>12,.0f} lines/s'
+                )
+
+            if outputs[0] != outputs[1]:
+                print('  WARNING: the writers produced different files')
+
+
+def _time(function) -> float:
+    """
+    Runs `function` once and returns its run time in seconds.
+    """
+
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    main()
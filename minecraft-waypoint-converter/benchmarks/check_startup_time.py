@@ -0,0 +1,181 @@
+"""check_startup_time.py
+
+Checks that starting the command line script stays within its time
+budget, and that it does not import the handlers or their heavy
+dependencies before a conversion needs them.
+
+Each run starts a fresh interpreter with `-X importtime`, imports
+`convert_waypoints` and parses `--help`, which is what every scripted
+invocation pays before doing any work. The fastest of the runs is
+compared with the budget, to leave out noise from the machine.
+
+Exits with status 1 if the budget is exceeded or a deferred module was
+imported, so it can be run as a check.
+
+Run from the repository root:
+    python minecraft-waypoint-converter/benchmarks/check_startup_time.py
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+
+BACKEND_PATH : Path = Path(__file__).resolve().parents[1] / 'backend'
+
+# the startup budget, in milliseconds of import time
+DEFAULT_BUDGET_MS : float = 150.0
+
+# modules that must only be imported once a conversion needs them
+DEFERRED_MODULES : tuple[str, ...] = (
+    'amulet_nbt',
+    'asyncio',
+    'concurrent.futures',
+    'multiprocessing',
+    'numpy',
+    'pyfilehandlers',
+    'PyQt6',
+    'zipfile',
+    'waypoint_handlers.near_duplicates',
+    'waypoint_handlers.waypoint_mod_handler',
+    'waypoint_handlers.waypoint_handler_lunar',
+    'waypoint_handlers.waypoint_handler_xaeros',
+    'waypoint_handlers.standard_world_waypoints',
+)
+
+STARTUP_CODE : str = (
+    'import sys\n'
+    'import convert_waypoints\n'
+    "sys.argv[1:] = ['--help']\n"
+    'convert_waypoints.init_parser()\n'
+)
+
+_IMPORT_TIME_LINE = re.compile(
+    r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$'
+)
+
+
+
+def measure_startup() -> list[tuple[str, int, int]]:
+    """
+    Starts the script once, returning every import in the order
+    `-X importtime` reports them, which lists a module after the modules
+    it imports. Each import is its module name, its cumulative import
+    time in microseconds, and its nesting depth.
+    """
+
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_CODE],
+        cwd=BACKEND_PATH,
+        capture_output=True,
+        text=True
+    )
+
+    # --help exits with status 0
+    if process.returncode != 0:
+        raise RuntimeError(f'The script failed to start:\n{process.stderr}')
+
+    imports = []
+
+    for line in process.stderr.splitlines():
+
+        match = _IMPORT_TIME_LINE.match(line)
+
+        if match is None:
+            continue
+
+        _, cumulative, indent, module_name = match.groups()
+        imports.append((module_name, int(cumulative), len(indent) // 2))
+
+    return imports
+
+
+def get_script_imports(
+        imports : list[tuple[str, int, int]]
+    ) -> tuple[int, list[tuple[str, int, int]]]:
+    """
+    Gets the cumulative import time of `convert_waypoints`, and the
+    imports made while importing it.
+    """
+
+    script_index = next(
+        i for i, (module_name, _, depth) in enumerate(imports)
+        if module_name == 'convert_waypoints' and depth == 0
+    )
+
+    start_index = script_index
+
+    while start_index > 0 and imports[start_index - 1][2] > 0:
+        start_index -= 1
+
+    return imports[script_index][1], imports[start_index:script_index]
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument(
+        '--top', type=int, default=10,
+        help='number of slowest imports to list'
+    )
+    args = parser.parse_args()
+
+    runs = [measure_startup() for _ in range(args.repeat)]
+
+    # the cumulative time of convert_waypoints covers every import made
+    # by the script, but not the interpreter's own startup
+    startup_us, script_imports = min(
+        (get_script_imports(run) for run in runs),
+        key=lambda script: script[0]
+    )
+    startup_ms = startup_us / 1000
+
+    print(
+        f'convert_waypoints imports in {startup_ms:.1f} ms '
+        f'(budget {args.budget_ms:g} ms, fastest of {args.repeat})'
+    )
+
+    slowest = sorted(
+        (
+            (cumulative, module_name)
+            for module_name, cumulative, depth in script_imports
+            if depth == 1
+        ),
+        reverse=True
+    )[:args.top]
+
+    for cumulative, module_name in slowest:
+        print(f'  {cumulative / 1000:>7.1f} ms  {module_name}')
+
+    deferred_imports = sorted(
+        module_name for module_name, _, _ in script_imports
+        if any(
+            module_name == deferred or module_name.startswith(f'{deferred}.')
+            for deferred in DEFERRED_MODULES
+        )
+    )
+
+    failed = False
+
+    if deferred_imports:
+        print('FAIL: modules imported before they are needed:')
+        for module_name in deferred_imports:
+            print(f'  {module_name}')
+        failed = True
+
+    if startup_ms > args.budget_ms:
+        print(f'FAIL: startup exceeds the budget by {startup_ms - args.budget_ms:.1f} ms')
+        failed = True
+
+    if failed:
+        sys.exit(1)
+
+    print('OK')
+
+
+if __name__ == '__main__':
+    main()
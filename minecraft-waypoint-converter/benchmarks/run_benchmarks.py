@@ -0,0 +1,599 @@
+"""run_benchmarks.py
+
+Runs the benchmark suite: times every phase of converting a world
+between Lunar Client and Xaero's Minimap, and the read, standardize, and
+write methods of each handler, on synthetic data of growing size.
+
+Each scenario generates a Lunar Client waypoint file and a Xaero's
+Minimap directory with the same worlds, with `waypoint_generators`, in
+the `convert-here` layout of the command line script. Every benchmark is
+run on a fresh copy of them, and the fastest of its runs is kept.
+
+The timings are saved as JSON, and compared with a saved baseline, if
+there is one. Exits with status 1 if a timing is slower than the
+baseline by more than the threshold, so it can be run as a check.
+
+Run from the repository root:
+    python minecraft-waypoint-converter/benchmarks/run_benchmarks.py
+    python minecraft-waypoint-converter/benchmarks/run_benchmarks.py --save-baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'backend'))
+
+import convert_waypoints
+from waypoint_handlers.backup_store import set_backup_mode
+from waypoint_handlers.handler_registry import get_handler_registry
+from waypoint_handlers.reporting import NullReporter, set_reporter
+from waypoint_handlers.standard_world_waypoints import StandardWorldWaypoints
+
+from waypoint_generators import generate_lunar_file, generate_xaeros_tree
+
+
+from typing import Any, Callable
+
+
+
+# the number of worlds and of waypoints of all worlds together
+SCENARIOS : dict[str, tuple[int, int]] = {
+    'tiny'   : (1, 10),
+    'small'  : (10, 1_000),
+    'medium' : (100, 10_000),
+    'large'  : (1_000, 100_000),
+    'huge'   : (10_000, 1_000_000),
+}
+
+DEFAULT_SCENARIOS : tuple[str, ...] = ('tiny', 'small', 'medium', 'large')
+
+RESULTS_DIR : Path = Path(__file__).resolve().parent / 'results'
+
+# how much slower than the baseline a timing may be, as a fraction
+DEFAULT_THRESHOLD : float = 0.25
+
+# timings that differ from the baseline by less than this are noise
+NOISE_FLOOR_MS : float = 2.0
+
+RESULTS_VERSION : int = 1
+
+LUNAR : str = 'lunar client'
+XAEROS : str = "xaero's minimap"
+
+# how each mod is named in the timing keys
+MOD_KEYS : dict[str, str] = {LUNAR : 'lunar', XAEROS : 'xaeros'}
+
+# where each mod's waypoints are found when converting here
+CONVERT_HERE_DIR : Path = Path('minecraft-waypoint-converter', 'data', 'convert-here')
+
+# the methods called by `convert_waypoints`, by the phase they are
+# timed as. Methods of the handlers are timed on both handlers
+HANDLER_PHASES : dict[str, str] = {
+    'get_world_files' : 'stat_files',
+    'convert_from_mod_to_table' : 'read_source',
+    'hash_world_data' : 'hash_target',
+    'create_backup' : 'back_up',
+    'convert_from_standard_to_mod' : 'convert_to_mod',
+    'commit' : 'commit',
+}
+
+STANDARD_FILE_PHASES : dict[str, str] = {
+    'read_fingerprint' : 'read_fingerprint',
+    'write_waypoints' : 'write_standard',
+    'write_fingerprint' : 'write_fingerprint',
+}
+
+
+
+class PhaseTimer:
+    """
+    Times the phases of a conversion by wrapping the methods that make
+    them up. Only the outermost wrapped call is timed, so a phase that
+    calls another phase's method, such as a backup listing the files of
+    a world, is not counted twice.
+
+
+    Attributes
+    ----------
+    timings : dict[str, float]
+        The total time spent in each phase, in seconds.
+    """
+
+    def __init__(self) -> None:
+
+        self.timings : dict[str, float] = defaultdict(float)
+
+        self._active : bool = False
+        self._wrapped : list[tuple[Any, str, Any]] = []
+
+
+    def wrap(self, owner : Any, method_name : str, phase : str) -> None:
+        """
+        Times the calls of a method of a class or instance as a phase.
+        """
+
+        original = getattr(owner, method_name)
+
+        def timed(*args, **kwargs):
+
+            if self._active:
+                return original(*args, **kwargs)
+
+            self._active = True
+            start = time.perf_counter()
+
+            try:
+                return original(*args, **kwargs)
+
+            finally:
+                self.timings[phase] += time.perf_counter() - start
+                self._active = False
+
+        self._wrapped.append((owner, method_name, vars(owner).get(method_name)))
+        setattr(owner, method_name, timed)
+
+
+    def unwrap(self) -> None:
+        """
+        Restores every wrapped method.
+        """
+
+        for owner, method_name, original in reversed(self._wrapped):
+
+            # methods wrapped on an instance were found on its class
+            if original is None:
+                delattr(owner, method_name)
+            else:
+                setattr(owner, method_name, original)
+
+        self._wrapped.clear()
+
+
+
+########################################################################
+#####                          Workspaces                          #####
+########################################################################
+
+def generate_scenario(data_dir : Path, world_count : int, waypoint_count : int) -> None:
+    """
+    Generates the waypoints of both mods in the `convert-here` layout.
+    """
+
+    generate_lunar_file(
+        Path(data_dir, CONVERT_HERE_DIR, LUNAR, 'waypoints.json'),
+        world_count, waypoint_count, seed=1
+    )
+    generate_xaeros_tree(
+        Path(data_dir, CONVERT_HERE_DIR, XAEROS),
+        world_count, waypoint_count, seed=2
+    )
+
+
+@contextlib.contextmanager
+def fresh_workspace(data_dir : Path, root_dir : Path):
+    """
+    Copies the generated waypoints to a new directory and runs the
+    converter there, with new handlers and backup store, so that no
+    run sees the backups, fingerprints, or writes of another.
+    """
+
+    workspace = Path(tempfile.mkdtemp(dir=root_dir))
+    shutil.copytree(data_dir, workspace, dirs_exist_ok=True)
+
+    previous_dir = os.getcwd()
+    os.chdir(workspace)
+
+    try:
+        set_backup_mode('store')
+        convert_waypoints.setup_classes(convert_here=True)
+
+        yield workspace
+
+    finally:
+        os.chdir(previous_dir)
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+def get_world_file_name(mod_name : str, world_name : str) -> str:
+    """
+    Gets the name a mod stores a generated world under.
+    """
+
+    return f'sp:{world_name}' if mod_name == LUNAR else world_name
+
+
+def make_world_ref(mod_name : str, world_name : str):
+    """
+    Resolves a generated world of a mod, without searching for it.
+    """
+
+    return convert_waypoints.get_mod_handler(mod_name).make_world_ref(
+        get_world_file_name(mod_name, world_name)
+    )
+
+
+def quietly(function : Callable, *args, **kwargs) -> Any:
+    """
+    Calls a function without the messages it prints.
+    """
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args, **kwargs)
+
+
+
+########################################################################
+#####                          Benchmarks                          #####
+########################################################################
+
+def time_conversion(
+        data_dir : Path,
+        root_dir : Path,
+        from_mod : str,
+        to_mod : str,
+        world_name : str
+    ) -> dict[str, float]:
+    """
+    Times each phase of converting a world with `convert_waypoints`,
+    then converting it again without changes, which is skipped.
+    """
+
+    with fresh_workspace(data_dir, root_dir):
+
+        from_world = make_world_ref(from_mod, world_name)
+        to_world = make_world_ref(to_mod, world_name)
+
+        timer = PhaseTimer()
+
+        for handler in {
+            convert_waypoints.get_mod_handler(from_mod),
+            convert_waypoints.get_mod_handler(to_mod),
+        }:
+            for method_name, phase in HANDLER_PHASES.items():
+                timer.wrap(handler, method_name, phase)
+
+        for method_name, phase in STANDARD_FILE_PHASES.items():
+            timer.wrap(StandardWorldWaypoints, method_name, phase)
+
+        try:
+            start = time.perf_counter()
+
+            if not quietly(convert_waypoints.convert_waypoints, from_world, to_world):
+                raise RuntimeError(f'Converting {from_mod} to {to_mod} failed')
+
+            total = time.perf_counter() - start
+
+        finally:
+            timer.unwrap()
+
+        timings = dict(timer.timings)
+        timings['other'] = max(total - sum(timings.values()), 0.0)
+        timings['total'] = total
+
+        start = time.perf_counter()
+        quietly(convert_waypoints.convert_waypoints, from_world, to_world)
+        timings['unchanged_total'] = time.perf_counter() - start
+
+    return timings
+
+
+def time_handler(
+        data_dir : Path,
+        root_dir : Path,
+        mod_name : str,
+        other_mod : str,
+        world_name : str
+    ) -> dict[str, float]:
+    """
+    Times a handler reading a world's waypoints, standardizing them, and
+    writing the waypoints of the other mod's world into it.
+    """
+
+    timings = {}
+
+    with fresh_workspace(data_dir, root_dir):
+
+        other_world = make_world_ref(other_mod, world_name)
+        other_waypoints = convert_waypoints.get_mod_handler(other_mod) \
+            .convert_from_mod_to_table(world=other_world)
+
+        # the handler is created anew, so that nothing was read yet
+        start = time.perf_counter()
+        handler = get_handler_registry().create_handler(mod_name, convert_here=True)
+        world = handler.make_world_ref(get_world_file_name(mod_name, world_name))
+        handler._get_world_waypoints(world=world)
+        timings['read'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        handler.convert_from_mod_to_table(world=world)
+        timings['standardize'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+
+        if not quietly(handler.convert_from_standard_to_mod, other_waypoints, world) \
+        or not quietly(handler.commit):
+            raise RuntimeError(f'Writing {mod_name} waypoints failed')
+
+        timings['write'] = time.perf_counter() - start
+
+    return timings
+
+
+def run_scenario(
+        name : str,
+        world_count : int,
+        waypoint_count : int,
+        root_dir : Path,
+        repeat : int
+    ) -> dict[str, float]:
+    """
+    Runs every benchmark on a scenario, keeping the fastest time of
+    each phase.
+
+
+    Returns
+    -------
+    dict[str, float]
+        The time of each phase in seconds, keyed by
+        `scenario.benchmark.phase`.
+    """
+
+    data_dir = Path(root_dir, f'{name}-data')
+
+    start = time.perf_counter()
+    generate_scenario(data_dir, world_count, waypoint_count)
+
+    print(
+        f'{name}: {world_count:,} worlds, {waypoint_count:,} waypoints '
+        f'(generated in {time.perf_counter() - start:.1f} s)'
+    )
+
+    # the middle world, so that a Lunar Client world is not found at the
+    # start or the end of the file
+    world_name = f'World {world_count // 2}'
+
+    benchmarks = []
+
+    for from_mod, to_mod in ((LUNAR, XAEROS), (XAEROS, LUNAR)):
+        benchmarks.append((
+            f'convert_{MOD_KEYS[from_mod]}_to_{MOD_KEYS[to_mod]}',
+            lambda from_mod=from_mod, to_mod=to_mod : time_conversion(
+                data_dir, root_dir, from_mod, to_mod, world_name
+            )
+        ))
+
+    for mod_name, other_mod in ((LUNAR, XAEROS), (XAEROS, LUNAR)):
+        benchmarks.append((
+            MOD_KEYS[mod_name],
+            lambda mod_name=mod_name, other_mod=other_mod : time_handler(
+                data_dir, root_dir, mod_name, other_mod, world_name
+            )
+        ))
+
+    results = {}
+
+    for benchmark_name, benchmark in benchmarks:
+
+        fastest = defaultdict(lambda : math.inf)
+
+        for _ in range(repeat):
+            for phase, elapsed in benchmark().items():
+                fastest[phase] = min(fastest[phase], elapsed)
+
+        print(f'  {benchmark_name:<24}' + '  '.join(
+            f'{phase} {elapsed * 1000:.1f} ms' for phase, elapsed in fastest.items()
+            if phase in ('total', 'unchanged_total', 'read', 'standardize', 'write')
+        ))
+
+        for phase, elapsed in fastest.items():
+            results[f'{name}.{benchmark_name}.{phase}'] = elapsed
+
+    shutil.rmtree(data_dir, ignore_errors=True)
+
+    return results
+
+
+
+########################################################################
+#####                           Results                            #####
+########################################################################
+
+def save_results(file_path : Path, results : dict) -> None:
+    """
+    Writes results to a JSON file.
+    """
+
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+        f.write('\n')
+
+
+def load_results(file_path : Path) -> dict | None:
+    """
+    Reads results from a JSON file. None if there is no such file.
+    """
+
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    except FileNotFoundError:
+        return None
+
+
+def find_regressions(
+        results : dict,
+        baseline : dict,
+        threshold : float,
+        noise_floor_ms : float = NOISE_FLOOR_MS
+    ) -> list[tuple[str, float, float]]:
+    """
+    Compares the timings of two runs, printing how much each timing in
+    both changed.
+
+
+    Parameters
+    ----------
+    results : dict
+        The results of this run.
+
+    baseline : dict
+        The results to compare with.
+
+    threshold : float
+        How much slower a timing may be, as a fraction of its baseline.
+
+    noise_floor_ms : float, default=NOISE_FLOOR_MS
+        How many milliseconds slower a timing may always be.
+
+
+    Returns
+    -------
+    list[tuple[str, float, float]]
+        The key, baseline time, and time of each timing that regressed.
+    """
+
+    regressions = []
+    baseline_timings = baseline['timings']
+
+    for key, elapsed in results['timings'].items():
+
+        if key not in baseline_timings:
+            continue
+
+        baseline_elapsed = baseline_timings[key]
+        change = (elapsed - baseline_elapsed) / baseline_elapsed \
+            if baseline_elapsed > 0 else 0.0
+
+        regressed = change > threshold \
+            and (elapsed - baseline_elapsed) * 1000 > noise_floor_ms
+
+        if regressed:
+            regressions.append((key, baseline_elapsed, elapsed))
+
+        print(
+            f'  {key:<52} {baseline_elapsed * 1000:>10.1f} ms -> '
+            f'{elapsed * 1000:>10.1f} ms  {change:>+7.0%}'
+            + ('  REGRESSION' if regressed else '')
+        )
+
+    return regressions
+
+
+
+def main() -> int:
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument(
+        '--scenarios', nargs='+', choices=SCENARIOS,
+        default=list(DEFAULT_SCENARIOS),
+        help='scenarios to run, huge takes several minutes'
+    )
+    parser.add_argument(
+        '--worlds', type=int,
+        help='run a custom scenario with this many worlds, with --waypoints'
+    )
+    parser.add_argument(
+        '--waypoints', type=int,
+        help='run a custom scenario with this many waypoints, with --worlds'
+    )
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument(
+        '--output', type=Path, default=RESULTS_DIR / 'latest.json',
+        help='file the results are saved to'
+    )
+    parser.add_argument(
+        '--baseline', type=Path, default=RESULTS_DIR / 'baseline.json',
+        help='results to compare with, if the file exists'
+    )
+    parser.add_argument(
+        '--save-baseline', action='store_true',
+        help='save the results as the baseline, instead of comparing with it'
+    )
+    parser.add_argument(
+        '--threshold', type=float, default=DEFAULT_THRESHOLD,
+        help='how much slower than the baseline a timing may be, as a fraction'
+    )
+    args = parser.parse_args()
+
+    if (args.worlds is None) != (args.waypoints is None):
+        parser.error('--worlds and --waypoints must be given together')
+
+    scenarios = {name : SCENARIOS[name] for name in args.scenarios}
+
+    if args.worlds is not None:
+        scenarios = {'custom' : (args.worlds, args.waypoints)}
+
+    # the events of the conversions are not shown, only their time
+    set_reporter(NullReporter())
+
+    timings = {}
+
+    with tempfile.TemporaryDirectory() as root_dir:
+
+        # the converter finds the game's worlds through %APPDATA%, which
+        # is kept empty so that no real worlds are read
+        os.environ['APPDATA'] = str(Path(root_dir, 'appdata'))
+
+        for name, (world_count, waypoint_count) in scenarios.items():
+            timings.update(run_scenario(
+                name, world_count, waypoint_count, Path(root_dir), args.repeat
+            ))
+
+    results = {
+        'version' : RESULTS_VERSION,
+        'created' : datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python' : platform.python_version(),
+        'platform' : platform.platform(),
+        'repeat' : args.repeat,
+        'scenarios' : {
+            name : {'worlds' : world_count, 'waypoints' : waypoint_count}
+            for name, (world_count, waypoint_count) in scenarios.items()
+        },
+        'timings' : timings,
+    }
+
+    save_results(args.output, results)
+    print(f'Results saved to {args.output}')
+
+    if args.save_baseline:
+        save_results(args.baseline, results)
+        print(f'Baseline saved to {args.baseline}')
+        return 0
+
+    baseline = load_results(args.baseline)
+
+    if baseline is None:
+        print(f'No baseline at {args.baseline}, run with --save-baseline to save one')
+        return 0
+
+    print(f'Compared with the baseline of {baseline["created"]}:')
+    regressions = find_regressions(results, baseline, args.threshold)
+
+    if regressions:
+        print(
+            f'{len(regressions)} timing(s) regressed by more than '
+            f'{args.threshold:.0%}'
+        )
+        return 1
+
+    print('OK')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
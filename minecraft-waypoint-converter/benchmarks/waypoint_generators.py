@@ -0,0 +1,232 @@
+"""waypoint_generators.py
+
+Builds synthetic waypoint data for the benchmarks: Xaero's Minimap
+directory trees and Lunar Client waypoint files, with any number of
+worlds and waypoints.
+
+Both mods are given the same worlds, `World 0` to `World N-1`, so that
+the worlds of one can be converted to the other. Some waypoint names are
+shared between the mods, so conversions also skip duplicates. The files
+are written as they are generated, so that a million waypoints do not
+have to be held in memory at once.
+"""
+
+import json
+import random
+from pathlib import Path
+
+
+
+# the waypoint file of every Xaero's Minimap dimension directory
+XAEROS_WAYPOINT_FILE_NAME : str = 'mw$default_1.txt'
+
+XAEROS_HEADER_LINES : list[str] = [
+    '#',
+    '#waypoint:name:initials:x:y:z:color:disabled:type:set:rotate_on_tp:tp_yaw:visibility_type:destination',
+    '#',
+]
+
+XAEROS_SET_NAMES : tuple[str, ...] = (
+    '01 Portals', '02 Homes', '10 Caves', '20 Ocean Monuments',
+    '21 Pillager Outposts', '30 Ancient Cities', '04 Biomes', '05 Farms',
+)
+
+# one in this many waypoints has the same name in both mods
+SHARED_NAME_INTERVAL : int = 10
+
+
+
+def get_world_names(world_count : int) -> list[str]:
+    """
+    Gets the names of the generated worlds.
+    """
+
+    return [f'World {i}' for i in range(world_count)]
+
+
+def split_count(total : int, parts : int) -> list[int]:
+    """
+    Splits `total` into `parts` counts as even as possible, the larger
+    counts first.
+    """
+
+    quotient, remainder = divmod(total, parts)
+
+    return [quotient + (i < remainder) for i in range(parts)]
+
+
+def get_waypoint_name(mod_prefix : str, index : int) -> str:
+    """
+    Gets the name of a generated waypoint, which is the same in both
+    mods for one in every `SHARED_NAME_INTERVAL` waypoints.
+    """
+
+    if index % SHARED_NAME_INTERVAL == 0:
+        return f'shared {index}'
+
+    return f'{mod_prefix} {index}'
+
+
+def generate_xaeros_tree(
+        directory : Path,
+        world_count : int,
+        waypoint_count : int,
+        dimension_count : int = 3,
+        set_count : int = 4,
+        seed : int = 0
+    ) -> list[str]:
+    """
+    Writes a Xaero's Minimap waypoint directory.
+
+
+    Parameters
+    ----------
+    directory : pathlib.Path
+        The directory to write the worlds to, the equivalent of
+        `%APPDATA%/.minecraft/xaero/minimap`.
+
+    world_count : int
+        The number of worlds.
+
+    waypoint_count : int
+        The number of waypoints of all worlds together, spread evenly
+        over the worlds and over the dimensions of each world.
+
+    dimension_count : int, default=3
+        The number of dimensions of each world. The three vanilla
+        dimensions come first, then modded `dim%N` dimensions.
+
+    set_count : int, default=4
+        The number of waypoint sets besides the default one, up to
+        the length of `XAEROS_SET_NAMES`.
+
+    seed : int, default=0
+        The seed of the generated coordinates and colors.
+
+
+    Returns
+    -------
+    list[str]
+        The names of the world directories.
+    """
+
+    rng = random.Random(seed)
+
+    dimension_dirs = ['dim%0', 'dim%-1', 'dim%1'] + [
+        f'dim%{i}' for i in range(2, dimension_count - 1)
+    ]
+    dimension_dirs = dimension_dirs[:max(dimension_count, 1)]
+
+    set_names = ['gui.xaero_default', *XAEROS_SET_NAMES[:set_count]]
+    sets_line = 'sets:' + ':'.join(set_names)
+
+    world_names = get_world_names(world_count)
+
+    for world_name, world_waypoint_count in zip(
+        world_names, split_count(waypoint_count, world_count)
+    ):
+        index = 0
+
+        for dimension_dir, dimension_waypoint_count in zip(
+            dimension_dirs,
+            split_count(world_waypoint_count, len(dimension_dirs))
+        ):
+            file_path = Path(directory, world_name, dimension_dir, XAEROS_WAYPOINT_FILE_NAME)
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+
+            lines = [sets_line, *XAEROS_HEADER_LINES]
+
+            for _ in range(dimension_waypoint_count):
+                name = get_waypoint_name('xaero', index)
+                lines.append(
+                    f'waypoint:{name}:{name[0].upper()}:'
+                    f'{rng.randint(-30_000, 30_000)}:{rng.randint(-64, 320)}:'
+                    f'{rng.randint(-30_000, 30_000)}:{rng.randrange(16)}:'
+                    f'false:0:{set_names[index % len(set_names)]}:false:0:0:false'
+                )
+                index += 1
+
+            lines.append('')
+
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(lines))
+
+    return world_names
+
+
+def generate_lunar_file(
+        file_path : Path,
+        world_count : int,
+        waypoint_count : int,
+        seed : int = 0
+    ) -> list[str]:
+    """
+    Writes a Lunar Client waypoint file, laid out as the converter
+    writes it.
+
+
+    Parameters
+    ----------
+    file_path : pathlib.Path
+        The file to write, the equivalent of
+        `~/.lunarclient/settings/game/waypoints.json`.
+
+    world_count : int
+        The number of worlds.
+
+    waypoint_count : int
+        The number of waypoints of all worlds together, spread evenly
+        over the worlds.
+
+    seed : int, default=0
+        The seed of the generated coordinates, dimensions, and colors.
+
+
+    Returns
+    -------
+    list[str]
+        The keys of the worlds in the file, such as `sp:World 0`.
+    """
+
+    rng = random.Random(seed)
+
+    world_keys = [f'sp:{world_name}' for world_name in get_world_names(world_count)]
+
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(file_path, 'w', encoding='utf-8') as f:
+
+        f.write('{\n  "version": 1,\n  "waypoints": {')
+
+        for world_index, (world_key, world_waypoint_count) in enumerate(
+            zip(world_keys, split_count(waypoint_count, world_count))
+        ):
+            waypoints = {
+                get_waypoint_name('lunar', i) : {
+                    'location' : {
+                        'x' : float(rng.randint(-30_000, 30_000)),
+                        'y' : float(rng.randint(-64, 320)),
+                        'z' : float(rng.randint(-30_000, 30_000))
+                    },
+                    'visible' : True,
+                    'dimension' : rng.choice((-1, 0, 1)),
+                    'color' : {'value' : rng.randrange(16)},
+                    'showBeam' : True,
+                    'showText' : True
+                }
+                for i in range(world_waypoint_count)
+            }
+
+            # each world is written as `json.dump(document, indent=2)`
+            # would write it, nested two levels deep
+            world_json = json.dumps({'' : waypoints}, ensure_ascii=False, indent=2)
+
+            f.write(
+                (',' if world_index else '')
+                + f'\n    {json.dumps(world_key, ensure_ascii=False)}: '
+                + world_json.replace('\n', '\n    ')
+            )
+
+        f.write('\n  }\n}' if world_keys else '}\n}')
+
+    return world_keys
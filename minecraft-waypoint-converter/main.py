@@ -4,16 +4,16 @@ Driver script for Minecraft Waypoint Converter.
 """
 
 
-from PyQt6.QtWidgets import QApplication
-
-from frontend.gui import MinecraftWaypointConverterMainWindow
-
-
 
 def main() -> None:
     """
     Main function to run the Minecraft Waypoint Converter GUI.
     """
+
+    # imported here, so that importing this module does not load Qt
+    from PyQt6.QtWidgets import QApplication
+
+    from frontend.gui import MinecraftWaypointConverterMainWindow
     
     app = QApplication([])
     main_window = MinecraftWaypointConverterMainWindow()
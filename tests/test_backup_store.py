@@ -0,0 +1,159 @@
+"""test_backup_store.py
+
+Tests storing, restoring and pruning backups in a `BackupStore`.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from waypoint_handlers.backup_store import BackupStore
+
+
+# old enough for a blob to be pruned under the default grace period
+OLD_TIME : float = time.time() - 7 * 24 * 60 * 60
+
+
+
+@pytest.fixture
+def store(tmp_path : Path) -> BackupStore:
+    """
+    Creates an empty store.
+    """
+
+    return BackupStore(tmp_path / 'backups')
+
+
+@pytest.fixture
+def world_files(tmp_path : Path) -> dict[str, Path]:
+    """
+    Creates the waypoint files of a world, two of them with the same
+    contents.
+    """
+
+    world_dir = tmp_path / 'world'
+    world_dir.mkdir()
+
+    files = {}
+
+    for relative_path, contents in [
+        ('dim%0/mw$default_1.txt', b'waypoint:home\n'),
+        ('dim%-1/mw$default_1.txt', b'waypoint:portal\n'),
+        ('dim%1/mw$default_1.txt', b'waypoint:home\n'),
+    ]:
+        file_path = world_dir / relative_path
+        file_path.parent.mkdir()
+        file_path.write_bytes(contents)
+        files[relative_path] = file_path
+
+    return files
+
+
+def blob_paths(store : BackupStore) -> list[Path]:
+    """
+    Gets the blobs held in the store.
+    """
+
+    return sorted(store.objects_path.glob('*/*'))
+
+
+def age_blobs(store : BackupStore) -> None:
+    """
+    Makes every blob look like it was stored long ago.
+    """
+
+    for blob_path in blob_paths(store):
+        os.utime(blob_path, (OLD_TIME, OLD_TIME))
+
+
+
+def test_identical_contents_are_stored_once(store : BackupStore, world_files : dict):
+
+    assert store.back_up_files('run-1', 'xaero\'s minimap', 'world', world_files)
+
+    manifest, = store.list_manifests('run-1')
+    files = manifest['files']
+
+    assert list(files) == list(world_files)
+    assert files['dim%0/mw$default_1.txt'] == files['dim%1/mw$default_1.txt']
+    assert files['dim%-1/mw$default_1.txt']['size'] == len(b'waypoint:portal\n')
+    assert len(blob_paths(store)) == 2
+
+
+def test_unchanged_files_are_not_stored_again(store : BackupStore, world_files : dict):
+
+    store.back_up_files('run-1', 'xaero\'s minimap', 'world', world_files)
+    store.back_up_files('run-2', 'xaero\'s minimap', 'world', world_files)
+
+    assert store.list_runs() == ['run-1', 'run-2']
+    assert len(blob_paths(store)) == 2
+
+
+def test_back_up_on_an_executor(store : BackupStore, world_files : dict):
+
+    with ThreadPoolExecutor(max_workers=3) as io_executor:
+        assert store.back_up_files(
+            'run-1', 'xaero\'s minimap', 'world', world_files, io_executor=io_executor
+        )
+
+    assert len(blob_paths(store)) == 2
+    assert list(store.objects_path.glob('*/*.tmp')) == []
+
+
+def test_restore_file(store : BackupStore, world_files : dict, tmp_path : Path):
+
+    store.back_up_files('run-1', 'lunar client', 'waypoints', world_files)
+
+    for relative_path, file_data in store.list_manifests('run-1')[0]['files'].items():
+
+        destination = tmp_path / 'restored' / relative_path
+        store.restore_file(file_data['hash'], destination)
+
+        assert destination.read_bytes() == world_files[relative_path].read_bytes()
+
+
+def test_prune_removes_old_runs_and_their_blobs(store : BackupStore, world_files : dict):
+
+    store.back_up_files('run-1', 'xaero\'s minimap', 'world', world_files)
+
+    world_files['dim%-1/mw$default_1.txt'].write_bytes(b'waypoint:moved portal\n')
+    store.back_up_files('run-2', 'xaero\'s minimap', 'world', world_files)
+    age_blobs(store)
+
+    assert store.prune(keep_runs=1) == 1
+    assert store.list_runs() == ['run-2']
+
+    for file_data in store.list_manifests('run-2')[0]['files'].values():
+        assert store.get_blob_path(file_data['hash']).exists()
+
+
+def test_prune_keeps_recent_blobs(store : BackupStore, world_files : dict):
+
+    # a run that is still backing up has stored its blobs, but not yet
+    # written the manifest referring to them
+    for file_path in world_files.values():
+        store.add_blob(file_path)
+
+    assert store.prune(keep_runs=1) == 0
+    assert len(blob_paths(store)) == 2
+
+    age_blobs(store)
+
+    assert store.prune(keep_runs=1) == 2
+    assert blob_paths(store) == []
+
+
+def test_reused_blobs_are_renewed(store : BackupStore, world_files : dict):
+
+    store.back_up_files('run-1', 'xaero\'s minimap', 'world', world_files)
+    age_blobs(store)
+
+    store.add_blob(world_files['dim%0/mw$default_1.txt'])
+
+    # only the blob that was not reused is removed once its run is
+    assert store.prune(keep_runs=0) == 1
+    assert store.list_runs() == []
+    assert len(blob_paths(store)) == 1
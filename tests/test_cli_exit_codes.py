@@ -0,0 +1,172 @@
+"""test_cli_exit_codes.py
+
+Tests the exit codes and result lines of the command line script when it
+is run without a terminal, as a scheduled job would run it.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+SCRIPT_PATH : Path = Path(__file__).resolve().parents[1] / 'minecraft-waypoint-converter' / 'backend' / 'convert_waypoints.py'
+
+XAEROS_WAYPOINT_FILE : str = '''sets:gui.xaero_default
+#
+#waypoint:name:initials:x:y:z:color:disabled:type:set:rotate_on_tp:tp_yaw:visibility_type:destination
+#
+waypoint:home:H:10:64:-20:2:false:0:gui.xaero_default:false:0:0:false
+'''
+
+
+
+def _lunar_waypoint(x : float, dimension : int = 0) -> dict:
+    """
+    Gets a waypoint in Lunar Client's format.
+    """
+
+    return {
+        'location' : {'x' : x, 'y' : 70.0, 'z' : -x},
+        'visible' : True,
+        'dimension' : dimension,
+        'color' : {'value' : 5},
+        'showBeam' : True,
+        'showText' : True
+    }
+
+
+@pytest.fixture
+def convert_here(tmp_path : Path) -> Path:
+    """
+    Creates a directory holding the `--convert-here` files of both mods,
+    with the worlds `New World 1`, `New World 12`, and `hypixel.net`.
+    """
+
+    data_dir = tmp_path / 'minecraft-waypoint-converter' / 'data' / 'convert-here'
+
+    lunar_file = data_dir / 'lunar client' / 'waypoints.json'
+    lunar_file.parent.mkdir(parents=True)
+    lunar_file.write_text(json.dumps({
+        'version' : 1,
+        'waypoints' : {
+            'sp:New World 1' : {'' : {'Base' : _lunar_waypoint(100.0)}},
+            'sp:New World 12' : {'' : {'Farm' : _lunar_waypoint(200.0)}},
+            'mp:hypixel.net' : {'' : {'Lobby' : _lunar_waypoint(0.0)}},
+        }
+    }))
+
+    for world_name in ('New World 1', 'New World 12', 'Multiplayer_hypixel.net'):
+        dimension_dir = data_dir / 'xaero\'s minimap' / world_name / 'dim%0'
+        dimension_dir.mkdir(parents=True)
+        (dimension_dir / 'mw$default_1.txt').write_text(XAEROS_WAYPOINT_FILE)
+
+    return tmp_path
+
+
+def run_script(working_dir : Path, *args : str) -> tuple[int, dict | None]:
+    """
+    Runs the script with `--convert-here` and `--json`, without a
+    terminal, returning its exit code and its result line.
+    """
+
+    process = subprocess.run(
+        [sys.executable, str(SCRIPT_PATH), '--convert-here', '--json', '--progress', 'null', *args],
+        cwd=working_dir,
+        env={**os.environ, 'APPDATA' : str(working_dir)},
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+        timeout=120
+    )
+
+    lines = process.stdout.strip().splitlines()
+    result = json.loads(lines[-1]) if lines and lines[-1].startswith('{') else None
+
+    return process.returncode, result
+
+
+def xaeros_file(working_dir : Path, world_name : str) -> str:
+    """
+    Reads the overworld waypoint file of a Xaero's Minimap world.
+    """
+
+    return (
+        working_dir / 'minecraft-waypoint-converter' / 'data' / 'convert-here'
+        / 'xaero\'s minimap' / world_name / 'dim%0' / 'mw$default_1.txt'
+    ).read_text()
+
+
+
+CONVERT : tuple[str, ...] = ('--from', 'lunar client', '--to', 'xaero\'s minimap')
+
+
+def test_exact_world_is_converted(convert_here : Path):
+
+    exit_code, result = run_script(convert_here, *CONVERT, '--world', 'hypixel.net')
+
+    assert exit_code == 0
+    assert result['status'] == 'success'
+    assert result['source_world'] == 'mp:hypixel.net'
+    assert 'waypoint:Lobby:' in xaeros_file(convert_here, 'Multiplayer_hypixel.net')
+
+
+@pytest.mark.parametrize('ambiguity_args', [(), ('--ambiguity', 'error')])
+def test_similar_world_is_not_found_under_error(convert_here : Path, ambiguity_args : tuple):
+
+    exit_code, result = run_script(
+        convert_here, *CONVERT, '--world', 'hypixel.com', *ambiguity_args
+    )
+
+    assert exit_code == 3
+    assert result['status'] == 'world_not_found'
+    assert xaeros_file(convert_here, 'Multiplayer_hypixel.net') == XAEROS_WAYPOINT_FILE
+
+
+def test_similar_world_is_converted_under_best(convert_here : Path):
+
+    exit_code, result = run_script(
+        convert_here, *CONVERT, '--world', 'hypixel.com', '--ambiguity', 'best'
+    )
+
+    assert exit_code == 0
+    assert result['source_world'] == 'mp:hypixel.net'
+
+
+def test_ambiguous_world_under_error(convert_here : Path):
+
+    exit_code, result = run_script(
+        convert_here, *CONVERT, '--world', 'New World', '--ambiguity', 'error'
+    )
+
+    assert exit_code == 4
+    assert result['status'] == 'ambiguous_world'
+    assert sorted(result['matches']) == ['sp:New World 1', 'sp:New World 12']
+
+
+def test_ambiguous_world_under_first(convert_here : Path):
+
+    exit_code, result = run_script(
+        convert_here, *CONVERT, '--world', 'New World', '--ambiguity', 'first'
+    )
+
+    assert exit_code == 0
+    assert result['source_world'] == 'sp:New World 1'
+
+
+@pytest.mark.parametrize('args', [
+    ('--world', 'hypixel.net'),
+    ('--from', 'lunar client', '--world', 'hypixel.net'),
+    CONVERT,
+    (*CONVERT, '--world', 'hypixel.net', '--workers', '0'),
+    (*CONVERT, '--world', 'hypixel.net', '--keep-backups', '0'),
+])
+def test_invalid_arguments(convert_here : Path, args : tuple):
+
+    exit_code, result = run_script(convert_here, *args)
+
+    assert exit_code == 2
+    assert result['status'] == 'usage_error'
@@ -0,0 +1,178 @@
+"""test_lunar_waypoint_file.py
+
+Tests that `LunarWaypointFile` reads and writes single worlds the same
+as parsing and serializing the whole file would, in every layout the
+file can be written in.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from waypoint_handlers.lunar_waypoint_file import LunarWaypointFile
+
+
+DOCUMENT : dict = {
+    'version' : 1,
+    'waypoints' : {
+        'sp:New World' : {'' : {
+            'home' : {'location' : {'x' : 1.5, 'y' : 64.0, 'z' : -3.0}, 'dimension' : 0},
+        }},
+        'mp:quote"d {brace} [bracket]' : {
+            '' : {
+                'w}\n' : {'location' : {'x' : 1.0}, 'nested' : [1, [2, {}], {'a' : []}]},
+            },
+            'other' : {'k' : 'v'},
+        },
+        'mp:back\\slashé☃' : {'' : {}},
+        'sp:no waypoints' : {'settings' : []},
+        'sp:empty' : {},
+    },
+    'trailer' : {'a' : [1, 2]},
+}
+
+LAYOUTS : dict[str, str] = {
+    'indent 2' : json.dumps(DOCUMENT, indent=2),
+    'indent 4, unescaped' : json.dumps(DOCUMENT, indent=4, ensure_ascii=False),
+    'tabs' : json.dumps(DOCUMENT, indent='\t'),
+    'compact' : json.dumps(DOCUMENT),
+    'crlf' : json.dumps(DOCUMENT, indent=2).replace('\n', '\r\n'),
+}
+
+
+
+@pytest.fixture(params=list(LAYOUTS))
+def waypoint_file(request, tmp_path : Path) -> Path:
+    """
+    Writes `DOCUMENT` in each of `LAYOUTS`.
+    """
+
+    file_path = tmp_path / 'waypoints.json'
+    file_path.write_text(LAYOUTS[request.param], encoding='utf-8')
+
+    return file_path
+
+
+def load(file_path : Path) -> dict:
+    """
+    Parses the whole file.
+    """
+
+    with open(file_path, 'rb') as f:
+        return json.load(f)
+
+
+
+def test_world_keys_match_json_load(waypoint_file : Path):
+
+    assert LunarWaypointFile(waypoint_file).get_world_keys() \
+        == list(load(waypoint_file)['waypoints'])
+
+
+def test_read_world_matches_json_load(waypoint_file : Path):
+
+    world_file = LunarWaypointFile(waypoint_file)
+
+    for world_key, world in load(waypoint_file)['waypoints'].items():
+        assert world_file.read_world_waypoints(world_key) == world.get('', {})
+
+    with pytest.raises(KeyError):
+        world_file.read_world_waypoints('sp:missing')
+
+
+def test_splice_matches_json_load(waypoint_file : Path):
+
+    world_file = LunarWaypointFile(waypoint_file)
+    world_keys = world_file.get_world_keys()
+
+    written = {
+        world_key : {f'new {index}' : {'location' : {'x' : float(index)}}}
+        for index, world_key in enumerate(world_keys)
+    }
+    written['sp:brand "new"'] = {'added' : {}}
+
+    expected = load(waypoint_file)
+
+    for world_key, waypoints in written.items():
+        expected['waypoints'].setdefault(world_key, {})[''] = waypoints
+
+    world_file.write_worlds(written)
+
+    assert load(waypoint_file) == expected
+
+    # the spans are moved by the edits, rather than scanned again
+    for world_key, waypoints in written.items():
+        assert world_file.read_world_waypoints(world_key) == waypoints
+
+    assert LunarWaypointFile(waypoint_file).get_world_keys() \
+        == list(expected['waypoints'])
+
+
+def test_untouched_worlds_are_copied_unchanged(waypoint_file : Path):
+
+    original = waypoint_file.read_bytes()
+
+    LunarWaypointFile(waypoint_file).write_worlds(
+        {'sp:New World' : {'moved' : {'location' : {'x' : 2.0}}}}
+    )
+
+    written = waypoint_file.read_bytes()
+    world_start = original.index(b'"sp:New World"')
+    next_world_start = original.index(b'"mp:quote')
+
+    assert written[:world_start] == original[:world_start]
+    assert written.endswith(original[next_world_start:])
+
+
+def test_write_to_another_file(waypoint_file : Path, tmp_path : Path):
+
+    original = waypoint_file.read_bytes()
+    output_path = tmp_path / 'output.json'
+
+    world_file = LunarWaypointFile(waypoint_file)
+    world_file.write_worlds({'sp:empty' : {'a' : {}}}, output_path=output_path)
+
+    assert waypoint_file.read_bytes() == original
+    assert load(output_path)['waypoints']['sp:empty'] == {'' : {'a' : {}}}
+    assert world_file.read_world_waypoints('sp:empty') == {}
+    assert list(tmp_path.glob('*.tmp')) == []
+
+
+def test_layout_that_does_not_match_the_brackets(tmp_path : Path):
+
+    # the line closing "sp:A" at the indent of a world closes "sp:B"
+    file_path = tmp_path / 'waypoints.json'
+    file_path.write_text(
+        '{\n'
+        '  "waypoints": {\n'
+        '    "sp:A": {\n'
+        '      "": {}}, "sp:B": {"": {"x": 1}\n'
+        '    },\n'
+        '    "sp:C": {\n'
+        '      "": {"y": 2}\n'
+        '    }\n'
+        '  }\n'
+        '}'
+    )
+
+    world_file = LunarWaypointFile(file_path)
+
+    assert world_file.read_world_waypoints('sp:A') == {}
+    assert world_file.get_world_keys() == ['sp:A', 'sp:B', 'sp:C']
+    assert world_file.read_world_waypoints('sp:B') == {'x' : 1}
+
+    world_file.write_worlds({'sp:B' : {'z' : 3}})
+
+    assert load(file_path)['waypoints'] == {
+        'sp:A' : {'' : {}}, 'sp:B' : {'' : {'z' : 3}}, 'sp:C' : {'' : {'y' : 2}}
+    }
+
+
+def test_file_without_waypoints(tmp_path : Path):
+
+    file_path = tmp_path / 'waypoints.json'
+    file_path.write_text('{\n  "version": 1\n}')
+
+    with pytest.raises(ValueError):
+        LunarWaypointFile(file_path).get_world_keys()
@@ -0,0 +1,93 @@
+"""test_startup_time.py
+
+Tests that importing the command line script stays within its startup
+budget, and that the handlers and heavy dependencies are only imported
+once a conversion needs them.
+"""
+
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+
+BACKEND_PATH : Path = Path(__file__).resolve().parents[1] / 'minecraft-waypoint-converter' / 'backend'
+
+# the startup budget, in milliseconds of import time
+STARTUP_BUDGET_MS : float = 150.0
+
+# the fastest of the runs is compared with the budget, to leave out
+# noise from the machine
+STARTUP_RUNS : int = 3
+
+# modules that must only be imported once a conversion needs them
+DEFERRED_MODULES : tuple[str, ...] = (
+    'amulet_nbt',
+    'asyncio',
+    'concurrent.futures',
+    'multiprocessing',
+    'numpy',
+    'pyfilehandlers',
+    'PyQt6',
+    'zipfile',
+    'waypoint_handlers.near_duplicates',
+    'waypoint_handlers.waypoint_mod_handler',
+    'waypoint_handlers.waypoint_handler_lunar',
+    'waypoint_handlers.waypoint_handler_xaeros',
+    'waypoint_handlers.standard_world_waypoints',
+)
+
+_IMPORT_TIME_LINE = re.compile(
+    r'^import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)$'
+)
+
+
+
+def _import_script() -> dict[str, int]:
+    """
+    Imports `convert_waypoints` in a fresh interpreter, returning the
+    cumulative import time in microseconds of every module imported.
+    """
+
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import convert_waypoints'],
+        cwd=BACKEND_PATH,
+        capture_output=True,
+        text=True
+    )
+
+    assert process.returncode == 0, process.stderr
+
+    import_times = {}
+
+    for line in process.stderr.splitlines():
+
+        match = _IMPORT_TIME_LINE.match(line)
+
+        if match is not None:
+            import_times[match.group(2)] = int(match.group(1))
+
+    return import_times
+
+
+def test_startup_is_within_budget():
+
+    startup_ms = min(
+        _import_script()['convert_waypoints'] for _ in range(STARTUP_RUNS)
+    ) / 1000
+
+    assert startup_ms <= STARTUP_BUDGET_MS, \
+        f'convert_waypoints imports in {startup_ms:.1f} ms, over the {STARTUP_BUDGET_MS:g} ms budget'
+
+
+def test_heavy_modules_are_deferred():
+
+    deferred_imports = sorted(
+        module_name for module_name in _import_script()
+        if any(
+            module_name == deferred or module_name.startswith(f'{deferred}.')
+            for deferred in DEFERRED_MODULES
+        )
+    )
+
+    assert deferred_imports == []
@@ -0,0 +1,97 @@
+"""test_waypoint_serializers.py
+
+Tests that every format standardized waypoints are saved in reads back
+the waypoints it wrote, and that files are read in the format they are
+in.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from waypoint_handlers.waypoint_serializers import (
+    SERIALIZATION_FORMATS,
+    WaypointSerializer,
+    detect_serializer,
+    get_serializer
+)
+from waypoint_handlers.waypoint_table import WaypointTable
+
+
+
+@pytest.fixture(params=SERIALIZATION_FORMATS)
+def serializer(request) -> WaypointSerializer:
+    """
+    Gets the serializer of each format.
+    """
+
+    # YAML files are written through pyfilehandlers
+    if request.param == 'yaml':
+        pytest.importorskip('pyfilehandlers.file_handler')
+
+    return get_serializer(request.param)
+
+
+@pytest.fixture
+def table() -> WaypointTable:
+    """
+    Creates a table with waypoints in several dimensions.
+    """
+
+    table = WaypointTable()
+    table.append('home', 'overworld', 80.5, 64.0, -160.25, 3, True, 'gui.xaero_default')
+    table.append('Café ☃', 'overworld', -0.1, -64.0, 1e7, 0xFFFFFF, False, None)
+    table.append('portal', 'nether', 10.0, 70.0, -20.0, 5, False, 'Bases')
+    table.append('outpost', 'dim%-2', 1.0, 2.0, 3.0)
+
+    return table
+
+
+
+def test_round_trip(serializer : WaypointSerializer, table : WaypointTable, tmp_path : Path):
+
+    file_path = tmp_path / f'world{serializer.file_suffix}'
+
+    assert serializer.write(file_path, table)
+
+    read_table = serializer.read(file_path)
+
+    assert sorted(read_table.rows()) == sorted(table.rows())
+    assert list(tmp_path.iterdir()) == [file_path]
+
+    # YAML keys the waypoints by dimension and name, so only the other
+    # formats keep their order
+    if serializer.format_name != 'yaml':
+        assert read_table.content_hash() == table.content_hash()
+
+
+def test_empty_round_trip(serializer : WaypointSerializer, tmp_path : Path):
+
+    file_path = tmp_path / f'world{serializer.file_suffix}'
+
+    assert serializer.write(file_path, WaypointTable())
+    assert len(serializer.read(file_path)) == 0
+
+
+def test_format_is_detected(serializer : WaypointSerializer, table : WaypointTable, tmp_path : Path):
+
+    file_path = tmp_path / f'world{serializer.file_suffix}'
+    serializer.write(file_path, table)
+
+    assert detect_serializer(file_path) is serializer
+
+
+@pytest.mark.parametrize('format_name', ['jsonl', 'binary'])
+def test_other_formats_are_not_read(format_name : str, table : WaypointTable, tmp_path : Path):
+
+    file_path = tmp_path / 'world.waypoints'
+    get_serializer('jsonl' if format_name == 'binary' else 'binary').write(file_path, table)
+
+    with pytest.raises(ValueError):
+        get_serializer(format_name).read(file_path)
+
+
+def test_unknown_format():
+
+    with pytest.raises(ValueError):
+        get_serializer('xml')
@@ -0,0 +1,143 @@
+"""test_waypoint_table.py
+
+Tests the bulk transforms of `WaypointTable`, both through numpy and
+without it.
+"""
+
+import pytest
+
+from waypoint_handlers import waypoint_table
+from waypoint_handlers.waypoint import Waypoint
+from waypoint_handlers.waypoint_table import WaypointTable
+
+
+
+@pytest.fixture(params=['numpy', 'no numpy'])
+def numpy_mode(request, monkeypatch) -> str:
+    """
+    Runs a test with the table's numpy transforms, and again with the
+    transforms it uses when numpy is not installed.
+    """
+
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+        monkeypatch.setattr(waypoint_table, '_numpy_imported', False)
+    else:
+        monkeypatch.setattr(waypoint_table, '_numpy', None)
+        monkeypatch.setattr(waypoint_table, '_numpy_imported', True)
+
+    return request.param
+
+
+@pytest.fixture
+def table() -> WaypointTable:
+    """
+    Creates a table with waypoints in the Overworld and the Nether.
+    """
+
+    table = WaypointTable()
+    table.append('home', 'overworld', 80.0, 64.0, -160.0, 3, True, 'gui.xaero_default')
+    table.append('portal', 'nether', 10.0, 70.0, -20.0, 5, False, None)
+    table.append('farm', 'overworld', -8.25, 63.5, 16.75)
+
+    return table
+
+
+def coordinates(table : WaypointTable) -> list[tuple]:
+    """
+    Gets the name, dimension and coordinates of each waypoint.
+    """
+
+    return [
+        (name, dimension, x, y, z)
+        for name, dimension, x, y, z, *_ in table.rows()
+    ]
+
+
+
+def test_iterates_as_records(table : WaypointTable):
+
+    assert len(table) == 3
+    assert list(table)[0] == Waypoint(
+        'home', 'overworld', 80.0, 64.0, -160.0, 3, True, 'gui.xaero_default'
+    )
+    assert table.dimensions() == ['overworld', 'nether', 'overworld']
+
+
+def test_block_coordinates(numpy_mode : str, table : WaypointTable):
+
+    assert table.block_coordinates() == ([80, 10, -9], [64, 70, 63], [-160, -20, 16])
+
+
+def test_filter_dimension(table : WaypointTable):
+
+    overworld = table.filter_dimension('overworld')
+
+    assert [waypoint.name for waypoint in overworld] == ['home', 'farm']
+    assert overworld.dimensions() == ['overworld', 'overworld']
+    assert list(overworld)[1] == list(table)[2]
+    assert len(table.filter_dimension('end')) == 0
+
+
+def test_overworld_to_nether(numpy_mode : str, table : WaypointTable):
+
+    assert coordinates(table.overworld_to_nether()) == [
+        ('home', 'nether', 10.0, 64.0, -20.0),
+        ('portal', 'nether', 10.0, 70.0, -20.0),
+        ('farm', 'nether', -1.03125, 63.5, 2.09375),
+    ]
+
+
+def test_nether_to_overworld(numpy_mode : str, table : WaypointTable):
+
+    assert coordinates(table.nether_to_overworld())[1] \
+        == ('portal', 'overworld', 80.0, 70.0, -160.0)
+
+
+def test_scale_every_dimension(numpy_mode : str, table : WaypointTable):
+
+    assert [x for _, _, x, _, _ in coordinates(table.scale(2.0))] == [160.0, 20.0, -16.5]
+
+
+def test_round_to_block_center(numpy_mode : str, table : WaypointTable):
+
+    assert coordinates(table.round_to_block_center(dimension='overworld')) == [
+        ('home', 'overworld', 80.5, 64.0, -159.5),
+        ('portal', 'nether', 10.0, 70.0, -20.0),
+        ('farm', 'overworld', -8.5, 63.0, 16.5),
+    ]
+
+
+def test_offset(numpy_mode : str, table : WaypointTable):
+
+    assert coordinates(table.offset(dx=1.0, dz=-1.0, dimension='nether'))[1] \
+        == ('portal', 'nether', 11.0, 70.0, -21.0)
+    assert coordinates(table.offset(dy=2.0))[2] == ('farm', 'overworld', -8.25, 65.5, 16.75)
+
+
+def test_transform_of_missing_dimension(numpy_mode : str, table : WaypointTable):
+
+    assert coordinates(table.scale(2.0, dimension='end')) == coordinates(table)
+
+
+def test_transforms_leave_the_table_unchanged(numpy_mode : str, table : WaypointTable):
+
+    original_hash = table.content_hash()
+
+    table.overworld_to_nether()
+    table.round_to_block_center()
+    table.offset(dx=5.0)
+
+    assert table.content_hash() == original_hash
+
+
+def test_content_hash(table : WaypointTable):
+
+    copied = table.copy()
+
+    assert copied.content_hash() == table.content_hash()
+
+    copied.append('new', 'end', 0.0, 0.0, 0.0)
+
+    assert copied.content_hash() != table.content_hash()
+    assert table.offset(dx=1.0).content_hash() != table.content_hash()
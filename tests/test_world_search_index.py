@@ -0,0 +1,86 @@
+"""test_world_search_index.py
+
+Tests how `WorldSearchIndex` finds and ranks world names, and that
+names only similar to the search are kept apart from the names that
+contain it.
+"""
+
+import pytest
+
+from waypoint_handlers.world_search_index import WorldSearchIndex
+
+
+WORLD_NAMES : list[str] = [
+    'sp:New World 12',
+    'sp:New World 1',
+    'mp:hypixel.net',
+    'mp:play.hypixel.net',
+    'sp:Countries and Kingdoms',
+    'sp:new world 1',
+]
+
+
+
+@pytest.fixture
+def index() -> WorldSearchIndex:
+    """
+    Indexes `WORLD_NAMES`, with one of them given twice.
+    """
+
+    return WorldSearchIndex(WORLD_NAMES + ['sp:New World 1'])
+
+
+
+def test_names_are_kept_once_in_order(index : WorldSearchIndex):
+
+    assert index.world_names == WORLD_NAMES
+
+
+def test_exact_matches_ignore_case(index : WorldSearchIndex):
+
+    assert index.exact_matches('SP:NEW WORLD 1') == ['sp:New World 1', 'sp:new world 1']
+    assert index.exact_matches('sp:New World') == []
+
+
+def test_tiers_are_ranked(index : WorldSearchIndex):
+
+    # the exact matches, then names starting with the search, then names
+    # containing it, shorter names first within a tier
+    assert index.search('sp:new world 1') == [
+        'sp:New World 1', 'sp:new world 1', 'sp:New World 12'
+    ]
+    assert index.search('hypixel.net') == ['mp:hypixel.net', 'mp:play.hypixel.net']
+    assert index.search('mp:') == ['mp:hypixel.net', 'mp:play.hypixel.net']
+
+
+def test_fuzzy_matches_come_last(index : WorldSearchIndex):
+
+    assert index.search('hypixel.com') == ['mp:hypixel.net', 'mp:play.hypixel.net']
+    assert index.search('Countries and Kingdom') == ['sp:Countries and Kingdoms']
+    assert index.search('Kingdoms and Countries') == ['sp:Countries and Kingdoms']
+
+
+def test_fuzzy_matches_can_be_left_out(index : WorldSearchIndex):
+
+    assert index.search('hypixel.com', fuzzy=False) == []
+    assert index.search('Kingdoms and Countries', fuzzy=False) == []
+    assert index.search('hypixel', fuzzy=False) == ['mp:hypixel.net', 'mp:play.hypixel.net']
+
+
+def test_unrelated_names_do_not_match(index : WorldSearchIndex):
+
+    assert index.search('skyblock') == []
+    assert index.best_match('skyblock') is None
+
+
+def test_best_match(index : WorldSearchIndex):
+
+    assert index.best_match('new world') == 'sp:New World 1'
+    assert index.best_match('hypixel.com') == 'mp:hypixel.net'
+
+
+def test_short_searches(index : WorldSearchIndex):
+
+    # searches too short to have trigrams only match names containing them
+    assert index.search('12') == ['sp:New World 12']
+    assert sorted(index.search('')) == sorted(WORLD_NAMES)
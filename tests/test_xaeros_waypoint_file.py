@@ -0,0 +1,132 @@
+"""test_xaeros_waypoint_file.py
+
+Tests reading and writing Xaero's Minimap waypoint files, and that the
+lines that are not read as waypoints are written back unchanged, where
+they were.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from waypoint_handlers import reporting, xaeros_waypoint_parser
+from waypoint_handlers.reporting import NullReporter
+from waypoint_handlers.waypoint_handler_xaeros import XaerosWaypointHandler
+from waypoint_handlers.xaeros_waypoint_parser import (
+    UnparsedLines,
+    XaerosWaypoint,
+    iter_waypoint_file,
+    parse_waypoint_line
+)
+from waypoint_handlers.xaeros_waypoint_writer import write_waypoint_file
+
+
+WAYPOINT_FILE : bytes = (
+    b'sets:gui.xaero_default:Bases\n'
+    b'#\n'
+    b'#waypoint:name:initials:x:y:z:color:disabled:type:set:rotate_on_tp:tp_yaw:visibility_type:destination\n'
+    b'#\n'
+    b'waypoint:Farm:F:10:64:-20:2:false:0:gui.xaero_default:false:0:0:false\n'
+    b'waypoint:Weird:W:1:~:2:3:false:0:gui.xaero_default:false:0:0:false\n'
+    b'waypoint:home:H:-5:70:6:1:true:1:Bases:true:90:2:true\n'
+    b'waypoint:Caf\xe9:C:5:70:6:1:false:0:gui.xaero_default:false:0:0:false\n'
+    b'waypoint:End:E:9:70:9:1:false:0:gui.xaero_default:false:0:0:false\n'
+)
+
+
+
+@pytest.fixture(params=['text', 'mmap'])
+def waypoint_file(request, monkeypatch, tmp_path : Path) -> Path:
+    """
+    Writes `WAYPOINT_FILE`, read as text, and again through a memory map
+    as large files are.
+    """
+
+    if request.param == 'mmap':
+        monkeypatch.setattr(xaeros_waypoint_parser, 'MMAP_THRESHOLD', 1)
+
+    file_path = tmp_path / 'mw$default_1.txt'
+    file_path.write_bytes(WAYPOINT_FILE)
+
+    return file_path
+
+
+
+def test_parse_waypoint_line():
+
+    assert parse_waypoint_line(
+        'waypoint:home:H:-5:70:6:1:true:1:Bases:true:90:2:true\n'
+    ) == XaerosWaypoint('home', 'H', -5, 70, 6, 1, True, 1, 'Bases', True, 90, 2, True)
+
+    assert parse_waypoint_line('waypoint:Weird:W:1:~:2:3:false:0:x:false:0:0:false') is None
+    assert parse_waypoint_line('sets:gui.xaero_default') is None
+
+
+def test_unreadable_lines_are_kept_in_place(waypoint_file : Path):
+
+    unparsed_lines = UnparsedLines()
+    waypoints = list(iter_waypoint_file(waypoint_file, unparsed_lines))
+
+    assert [waypoint.name for waypoint in waypoints] == ['Farm', 'home', 'End']
+    assert len(unparsed_lines.headers) == 4
+    assert list(unparsed_lines.following) == ['Farm', 'home']
+    assert len(list(unparsed_lines.unreadable_lines())) == 2
+
+
+def test_round_trip_is_unchanged(waypoint_file : Path, tmp_path : Path):
+
+    unparsed_lines = UnparsedLines()
+    waypoints = list(iter_waypoint_file(waypoint_file, unparsed_lines))
+
+    output_path = tmp_path / 'output.txt'
+
+    assert write_waypoint_file(output_path, unparsed_lines, waypoints)
+    assert output_path.read_bytes() == WAYPOINT_FILE
+
+
+def test_added_waypoints_keep_unreadable_lines_in_place(waypoint_file : Path):
+
+    unparsed_lines = UnparsedLines()
+    waypoints = list(iter_waypoint_file(waypoint_file, unparsed_lines))
+    waypoints.append(waypoints[0]._replace(name='New', initials='N'))
+
+    assert write_waypoint_file(waypoint_file, unparsed_lines, waypoints)
+
+    names = [
+        line.split(b':')[1]
+        for line in waypoint_file.read_bytes().splitlines()
+        if line.startswith(b'waypoint:')
+    ]
+
+    assert names == [b'Farm', b'Weird', b'home', b'Caf\xe9', b'End', b'New']
+
+
+def test_unreadable_lines_are_reported_once(monkeypatch, tmp_path : Path):
+
+    reporter = NullReporter()
+    monkeypatch.setattr(reporting, '_reporter', reporter)
+
+    file_path = tmp_path / 'world' / 'dim%0' / 'mw$default_1.txt'
+    file_path.parent.mkdir(parents=True)
+    file_path.write_bytes(WAYPOINT_FILE)
+
+    handler = XaerosWaypointHandler(input_directory_path=tmp_path)
+
+    try:
+        handler._read_waypoint_file(str(file_path))
+        handler._read_waypoint_file(str(file_path))
+    finally:
+        handler.close()
+
+    assert reporter.counters['unreadable_line'] == 2
+
+
+def test_empty_file(tmp_path : Path):
+
+    file_path = tmp_path / 'empty.txt'
+    file_path.write_bytes(b'')
+
+    unparsed_lines = UnparsedLines()
+
+    assert list(iter_waypoint_file(file_path, unparsed_lines)) == []
+    assert unparsed_lines == UnparsedLines()